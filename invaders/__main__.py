@@ -17,12 +17,65 @@ In addition, you should have the following subfolders
 
 Moving any of these folders or files will prevent the game from working properly
 
+To record the keys pressed in a game, start it with the option --record and a
+file name. The option --replay plays a recorded game back, without a window and
+as fast as possible, and reports how long it took:
+
+    python invaders --record game.log
+    python invaders --replay game.log
+
+The option --profile times the phases of every wave, and prints their
+percentiles when the wave is over ('-') or appends them to a file as JSON:
+
+    python invaders --replay game.log --profile timings.jsonl
+
 Author: Walker M. White (wmw2)
 Date:   November 1, 2017 (Python 3 Version)
 """
+import os
+import sys
+import time
+
+# Kivy reads the command line too, and stops at options it does not know
+if '--record' in sys.argv or '--replay' in sys.argv or '--profile' in sys.argv:
+    os.environ['KIVY_NO_ARGS'] = '1'
+
 from consts import *
 from app import *
 
+
+def option(name):
+    """
+    Returns the value of a command line option, or None if it is not given
+    """
+    if name in sys.argv[1:-1]:
+        return sys.argv[sys.argv.index(name)+1]
+    return None
+
+
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    replay = option('--replay')
+    record = option('--record')
+    profile = option('--profile')
+    if replay != None:
+        log = GInputLog.load(replay)
+        game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,backend='null')
+        game.profile = profile
+        start = time.perf_counter()
+        frames = game.replay(log)
+        elapsed = time.perf_counter() - start
+        print('Replayed %d frames in %.2f seconds (%.0f frames per second)' %
+              (frames, elapsed, frames / max(elapsed, 1e-9)))
+    else:
+        game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,
+                        tickrate=GAME_TICK_RATE,maxsteps=GAME_MAX_STEPS,
+                        atlas=True)
+        game.profile = profile
+        if record != None:
+            game.log = GInputLog()
+        try:
+            game.run()
+        finally:
+            if record != None:
+                game.log.save(record)
@@ -13,6 +13,7 @@ December 4th, 2018
 from consts import *
 from game2d import *
 from wave import *
+import random
  
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via get/setters
@@ -69,7 +70,67 @@ class Invaders(GameApp):
     they need to be documented here.
 
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+        _seed:  the seed of the random numbers of the game
+                [int >= 0, or None for a different game each time]
+        _rng:   the generator of the seeds of the waves [random.Random]
+        _profile: where to report how long the phases of each wave take
+                [None for no timing, '-' to print, or a file name]
+
+    If the game has a log (see GameApp.log), start stores the seed and the
+    size and speed of the aliens in it, so that replay plays the same game.
     """
+    _seed = GAME_SEED
+    _profile = None
+
+    # GETTERS AND SETTERS
+    @property
+    def seed(self):
+        """
+        The seed of the random numbers of the game
+
+        Every new wave is seeded from a generator with this seed, so a game
+        with the same seed and the same player input is played the same way.
+        Set it before the game starts. It is GAME_SEED by default.
+        """
+        return self._seed
+
+    @seed.setter
+    def seed(self,value):
+        """
+        Setter for seed
+
+        Parameter value: The seed of the game
+        Precondition value: type of value is int,
+                0 <= value < GAME_SEED_LIMIT, or None
+        Return: None
+        """
+        assert value == None or (type(value) == int and value >= 0 and
+                                 value < GAME_SEED_LIMIT)
+        self._seed = value
+
+    @property
+    def profile(self):
+        """
+        Where to report how long the phases of each wave take
+
+        If this is not None, the update of every wave is timed (see
+        Wave.timer). When a wave is over, the percentiles of its phases are
+        printed if this is '-', and otherwise appended as a line of JSON to
+        the file with this name.
+        """
+        return self._profile
+
+    @profile.setter
+    def profile(self,value):
+        """
+        Setter for profile
+
+        Parameter value: Where to report the timings
+        Precondition value: type of value is str, or None for no timing
+        Return: None
+        """
+        assert value == None or type(value) == str
+        self._profile = value
 
     def start(self):
         """
@@ -92,6 +153,11 @@ class Invaders(GameApp):
         # <Extension: Multiple Waves>
         self._level = 1
         self._backup_score = 0
+        seed = self._seed if self._seed != None else random.getrandbits(32)
+        self._rng = random.Random(seed)
+        if self.log != None:
+            self.log.info.update(seed=seed, rows=ALIEN_ROWS,
+                                 cols=ALIENS_IN_ROW, speed=ALIEN_SPEED)
         self._text = GLabel(text=GAME_TEXT_LEVEL + str(self._level),
                     linecolor=GAME_TEXT_COLOR,
                     font_size=72, font_name='Arcade.ttf',
@@ -113,6 +179,28 @@ class Invaders(GameApp):
         #<Extension: Defense Barriers>
         self.lastkeys_spacebar = 0
 
+    def replay(self,log,draw=False):
+        """
+        Plays back a recorded game without a window, see GameApp.replay
+
+        The game is played with the seed it was recorded with.
+
+        Parameter log: the recorded game
+        Precondition log: a GInputLog recorded by Invaders, with the same
+                ALIEN_ROWS, ALIENS_IN_ROW and ALIEN_SPEED as now
+
+        Parameter draw: whether to draw each frame
+        Precondition draw: type is bool
+        Return: the number of frames played [int]
+        """
+        info = log.info
+        assert 'seed' in info, 'the log was not recorded by Invaders'
+        assert (info['rows'], info['cols'], info['speed']) == \
+               (ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED), \
+               'the log was recorded with other aliens: %s' % repr(info)
+        self.seed = info['seed']
+        return GameApp.replay(self, log, draw)
+
     def update(self,dt):
         """
         Animates a single frame in the game.
@@ -173,14 +261,16 @@ class Invaders(GameApp):
 
         elif self._state == STATE_INACTIVE:
             #<Extension: Multiple Waves>
-            self._text.text = GAME_TEXT_LEVEL + str(self._level)
+            self._setText(GAME_TEXT_LEVEL + str(self._level))
 
         elif self._state == STATE_NEWWAVE:
             self._wave = Wave()
             #<Extension: Multiple Waves>
             self._wave.score = self._backup_score
             self._backup_score = 0
-            self._wave.newwave(self._level)
+            self._wave.newwave(self._level, self._rng.getrandbits(32))
+            if self._profile != None:
+                self._wave.timer = GPhaseTimer()
             #<Extension: Multiple Waves>
             self._state = STATE_ACTIVE
 
@@ -188,7 +278,7 @@ class Invaders(GameApp):
             self._updateStateActive(dt)
 
         elif self._state == STATE_PAUSED:
-            self._text.text = GAME_TEXT_CONTINUE
+            self._setText(GAME_TEXT_CONTINUE)
 
         elif self._state == STATE_CONTINUE:
             self._state = STATE_ACTIVE
@@ -213,10 +303,10 @@ class Invaders(GameApp):
         if self._state == STATE_INTRO:
             self._introAnimation()
         elif self._state == STATE_PAUSED:
-            self._text.draw(self.view)
+            self._text.draw(self._hud())
         elif self._state == STATE_INACTIVE or self._state == STATE_COMPLETE:
-            self._text.draw(self.view)
-            self._text_continue.draw(self.view)
+            self._text.draw(self._hud())
+            self._text_continue.draw(self._hud())
         else:
              if self._wave != None:
                  self._wave.draw(self.view)
@@ -314,6 +404,7 @@ class Invaders(GameApp):
         return: None
         """
         if self._wave != None:
+            self._reportTimer()
             if self._wave.gamestate == WAVE_STATE_CLEAR:
                 self._text.text = GAME_TEXT_GAMECLEAR
                 #<Extension: Multiple Waves>
@@ -326,6 +417,50 @@ class Invaders(GameApp):
             del self._wave
             self._wave = None
 
+    def _hud(self):
+        """
+        Helper function for the static layer of the view with the messages,
+        which is only drawn again when a message changes
+
+        parameter: None
+        precondition: None
+        return: the layer GAME_LAYER_HUD of the view [GLayer]
+        """
+        return self.view.layer(GAME_LAYER_HUD, static=True, depth=1)
+
+    def _setText(self, text):
+        """
+        Helper function for setting the message, which is only rendered
+        again if it changes
+
+        parameter text: the message
+        precondition: text is a string
+        return: None
+        """
+        if self._text.text != text:
+            self._text.text = text
+
+    def _reportTimer(self):
+        """
+        Helper function for reporting the phase timings of a wave that is
+        over, see profile
+
+        parameter: None
+        precondition: the wave is over
+        return: None
+        """
+        timer = self._wave.timer
+        if timer == None or self._profile == None:
+            return
+        state = 'clear' if self._wave.gamestate == WAVE_STATE_CLEAR else 'gameover'
+        if self._profile == '-':
+            print(GAME_TEXT_LEVEL + str(self._level) + ' (' + state + ')')
+            print(timer)
+        else:
+            with open(self._profile, 'a') as file:
+                timer.dump(file, level=self._level, state=state,
+                           score=self._wave.score)
+
     def _introAnimation(self):
         """
         Helper function for drawing intro animation
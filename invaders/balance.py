@@ -0,0 +1,331 @@
+"""
+Balance runner for Alien Invaders
+
+This module plays many waves without a window to measure how hard the game
+is. It sweeps the game constants (like ALIEN_SPEED_RATIO or BOLT_RATE) and the
+levels, plays a number of waves for every combination with a scripted ship,
+and reports how often the waves are cleared, how long they take to clear and
+how many lives they cost.
+
+The waves are simulated with WaveBatch, in jobs of a few hundred waves that
+are spread over a pool of processes, one per core. Each finished job is
+appended to a CSV file as soon as it is done. If the runner is stopped, run it
+again with the same file and it only plays the jobs that are not in the file.
+Every job has its own seed, so the results do not depend on the number of
+processes or on how often the runner was resumed.
+
+Run it from the command line, for example
+
+    python invaders/balance.py --levels 1-5 --set ALIEN_SPEED_RATIO=0.4,0.5 \\
+        --set BOLT_RATE=3,5 --waves 2000 --out balance.csv
+
+Use --help for all options.
+"""
+import sys
+
+# consts reads the size of the formation from the command line, which holds
+# the options of this runner instead, so they are put aside before importing
+ARGV = sys.argv[1:]
+del sys.argv[1:]
+
+from consts import *
+import batch
+import argparse
+import csv
+import itertools
+import multiprocessing
+import numpy as np
+import os
+
+#: the columns of the results file, after the swept constants
+RESULT_FIELDS = ('level', 'chunk', 'seed', 'ship', 'limit', 'waves', 'cleared',
+                 'gameover', 'clear_frames', 'frames', 'lives_lost', 'score')
+
+#: the columns that identify a job, after the swept constants
+JOB_FIELDS = RESULT_FIELDS[:6]
+
+#: the constants that may be swept; the ones that WaveBatch uses for the rules
+SWEEPABLE = ('ALIEN_SPEED', 'ALIEN_SPEED_RATIO', 'ALIEN_H_WALK', 'ALIEN_V_WALK',
+             'BOLT_RATE', 'BOLT_SPEED', 'SHIP_MOVEMENT', 'SHIP_LIVES',
+             'DEFENSE_BARRIERS_FRAMES')
+
+
+def playWaves(size, level, seed, ship='ai', frames=36000):
+    """
+    Play waves with a scripted ship until they are cleared or over
+
+    The ship 'ai' moves under the nearest alien that can fire and fires
+    whenever it can. The ship 'random' wanders left and right, and fires
+    now and then. The ship 'idle' never moves or fires.
+
+    Parameter size: the number of waves
+    Precondition size: type is int, size > 0
+
+    Parameter level: the game level of the waves
+    Precondition level: type is int, level >= 1
+
+    Parameter seed: the seed of the waves and the ship
+    Precondition seed: type is int >= 0
+
+    Parameter ship: the script of the ship
+    Precondition ship: one of 'ai', 'random' or 'idle'
+
+    Parameter frames: the most frames to play, at GAME_TICK_RATE per second
+    Precondition frames: type is int, frames > 0
+    Return: the WaveBatch after the waves were played
+    """
+    assert ship in ('ai', 'random', 'idle')
+    assert type(frames) == int and frames > 0
+    waves = batch.WaveBatch(size, level=level, seed=seed)
+    rng = np.random.default_rng(seed)
+    right = rng.random(size) < 0.5
+    dt = 1.0/GAME_TICK_RATE
+    fire = ship != 'idle'
+    for frame in range(frames):
+        if waves.done.all():
+            break
+        move = None
+        if ship == 'ai':
+            x = waves.ship
+            d = np.abs(waves.shooters - x[:,None])
+            d[np.isnan(d)] = np.inf
+            j = np.argmin(d, axis=1)
+            gap = np.nan_to_num(waves.shooters[np.arange(size), j] - x)
+            move = np.where(np.abs(gap) > batch.SHIP_MOVEMENT/2, np.sign(gap), 0)
+        elif ship == 'random':
+            right ^= rng.random(size) < 0.02
+            move = np.where(right, 1, -1)
+            fire = rng.random(size) < 0.3
+        waves.update(dt, move=move, fire=fire)
+    return waves
+
+
+def runJob(job):
+    """
+    Play one job of the sweep and total its results
+
+    The constants of the job are set in the module batch for the job, and
+    are set back afterwards, so that a process can run many jobs.
+
+    Parameter job: (constants, level, chunk, size, seed, ship, frames)
+    Precondition job: constants is a tuple of (name, value) pairs of names in
+            SWEEPABLE; the others are as in playWaves, chunk is an int >= 0
+    Return: the row of the job in the results file [dict]
+    """
+    constants, level, chunk, size, seed, ship, frames = job
+    saved = dict((name, getattr(batch, name)) for name, value in constants)
+    try:
+        for name, value in constants:
+            setattr(batch, name, value)
+        waves = playWaves(size, level, seed, ship, frames)
+        cleared = waves.gamestate == WAVE_STATE_CLEAR
+        row = dict(constants)
+        row.update(level=level, chunk=chunk, seed=seed, ship=ship,
+                   limit=frames, waves=size,
+                   cleared=int(cleared.sum()),
+                   gameover=int((waves.gamestate == WAVE_STATE_GAMEOVER).sum()),
+                   clear_frames=int(waves.frames[cleared].sum()),
+                   frames=int(waves.frames.sum()),
+                   lives_lost=int((batch.SHIP_LIVES - waves.lives).sum()),
+                   score=int(waves.score.sum()))
+        return row
+    finally:
+        for name in saved:
+            setattr(batch, name, saved[name])
+
+
+def makeJobs(sweep, levels, waves, chunk, seed, ship, frames):
+    """
+    List the jobs of a sweep, every combination of constants and levels
+
+    Parameter sweep: the values of each swept constant
+    Precondition sweep: list of (name, list of values) pairs
+
+    Parameter levels: the levels to play
+    Precondition levels: list of int >= 1
+
+    Parameter waves, chunk: the waves per combination, and per job
+    Precondition: both are int > 0
+
+    Parameter seed: the seed of the sweep
+    Precondition seed: type is int >= 0
+
+    Parameter ship, frames: as in playWaves
+    Return: list of jobs, see runJob
+    """
+    names = [name for name, values in sweep]
+    jobs = []
+    for n, values in enumerate(itertools.product(*[v for k, v in sweep])):
+        constants = tuple(zip(names, values))
+        for level in levels:
+            for c in range((waves + chunk - 1) // chunk):
+                size = min(chunk, waves - c * chunk)
+                key = [seed, n, level, c]
+                s = int(np.random.SeedSequence(key).generate_state(1)[0])
+                jobs.append((constants, level, c, size, s, ship, frames))
+    return jobs
+
+
+def jobKey(names, row):
+    """
+    The key of a job in the results file
+
+    Parameter names: the names of the swept constants
+    Precondition names: list of str
+
+    Parameter row: a row of the results file, or the job of a row
+    Precondition row: dict with a value for each name and JOB_FIELDS,
+            or a job (see runJob)
+    Return: the key [tuple of str]
+    """
+    if type(row) == tuple:
+        constants, level, chunk, size, seed, ship, frames = row
+        row = dict(constants, level=level, chunk=chunk, seed=seed, ship=ship,
+                   limit=frames, waves=size)
+    return tuple(str(row[name]) for name in names + list(JOB_FIELDS))
+
+
+def summarize(names, rows):
+    """
+    Totals the rows of the results file for each combination and level
+
+    Parameter names: the names of the swept constants
+    Precondition names: list of str
+
+    Parameter rows: the rows of the results file
+    Precondition rows: list of dict, with the fields of RESULT_FIELDS
+    Return: list of rows [dict] with the clear rate, the mean seconds to
+            clear, and the mean lives lost per wave
+    """
+    totals = {}
+    for row in rows:
+        key = tuple(str(row[name]) for name in names + ['level'])
+        total = totals.setdefault(key, dict.fromkeys(RESULT_FIELDS[5:], 0))
+        for field in RESULT_FIELDS[5:]:
+            total[field] += int(row[field])
+    result = []
+    for key in sorted(totals, key=lambda k: [float(v) for v in k]):
+        t = totals[key]
+        row = dict(zip(names + ['level'], key))
+        row['waves'] = t['waves']
+        row['clear_rate'] = t['cleared'] / t['waves']
+        row['clear_time'] = (t['clear_frames'] / t['cleared'] / GAME_TICK_RATE
+                             if t['cleared'] else float('nan'))
+        row['lives_lost'] = t['lives_lost'] / t['waves']
+        row['score'] = t['score'] / t['waves']
+        result.append(row)
+    return result
+
+
+def parseSweep(settings):
+    """
+    Parse the --set options of the command line
+
+    Parameter settings: the options, each NAME=value,value,...
+    Precondition settings: list of str
+    Return: list of (name, list of values) pairs; the values are int if the
+            constant is an int, float otherwise
+    """
+    sweep = []
+    for setting in settings:
+        name, sep, values = setting.partition('=')
+        if name not in SWEEPABLE or sep == '' or values == '':
+            raise argparse.ArgumentTypeError('bad --set %s, expected NAME=v1,v2 '
+                                             'with NAME in %s' % (setting, ', '.join(SWEEPABLE)))
+        kind = type(getattr(batch, name))
+        sweep.append((name, [kind(v) for v in values.split(',')]))
+    return sweep
+
+
+def parseLevels(text):
+    """
+    Parse the --levels option of the command line
+
+    Parameter text: levels like 1,3 or 1-5 or 1-3,7
+    Precondition text: type is str
+    Return: the levels [list of int]
+    """
+    levels = []
+    for part in text.split(','):
+        first, sep, last = part.partition('-')
+        levels.extend(range(int(first), int(last or first) + 1))
+    if len(levels) == 0 or min(levels) < 1:
+        raise argparse.ArgumentTypeError('bad --levels %s' % text)
+    return levels
+
+
+def main(argv=None):
+    """
+    Run a balance sweep from the command line
+
+    Parameter argv: the command line arguments, or None for those of the
+            command line (see ARGV)
+    Precondition argv: list of str, or None
+    Return: None
+    """
+    parser = argparse.ArgumentParser(description='Measure how hard the waves '
+                                     'of Alien Invaders are.')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help='values of a constant to sweep; may be repeated')
+    parser.add_argument('--levels', type=parseLevels, default=[1], help='levels to play (1-5)')
+    parser.add_argument('--waves', type=int, default=1000,
+                        help='waves per combination and level')
+    parser.add_argument('--chunk', type=int, default=250, help='waves per job')
+    parser.add_argument('--ship', choices=('ai', 'random', 'idle'), default='ai')
+    parser.add_argument('--frames', type=int, default=36000,
+                        help='most frames per wave, unfinished waves count as not cleared')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='processes')
+    parser.add_argument('--out', default='balance.csv',
+                        help='results file, resumed if it exists; rows of '
+                        'other sweeps with the same constants are kept but ignored')
+    args = parser.parse_args(ARGV if argv == None else argv)
+    try:
+        sweep = parseSweep(args.set)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.waves < 1 or args.chunk < 1 or args.frames < 1 or args.jobs < 1:
+        parser.error('--waves, --chunk, --frames and --jobs must be positive')
+
+    names = [name for name, values in sweep]
+    fields = names + list(RESULT_FIELDS)
+    jobs = makeJobs(sweep, args.levels, args.waves, args.chunk, args.seed,
+                    args.ship, args.frames)
+
+    rows = []
+    resume = os.path.exists(args.out) and os.path.getsize(args.out) > 0
+    if resume:
+        with open(args.out, newline='') as file:
+            reader = csv.DictReader(file)
+            if reader.fieldnames != fields:
+                parser.error('%s sweeps other constants' % args.out)
+            rows = list(reader)
+    keys = set(jobKey(names, job) for job in jobs)
+    rows = [row for row in rows if jobKey(names, row) in keys]
+    done = set(jobKey(names, row) for row in rows)
+    todo = [job for job in jobs if jobKey(names, job) not in done]
+    print('%d jobs, %d already in %s' % (len(jobs), len(jobs) - len(todo), args.out))
+
+    with open(args.out, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        if not resume:
+            writer.writeheader()
+        if len(todo) > 0:
+            with multiprocessing.Pool(min(args.jobs, len(todo))) as pool:
+                for n, row in enumerate(pool.imap_unordered(runJob, todo)):
+                    writer.writerow(row)
+                    file.flush()
+                    rows.append(row)
+                    print('\rjob %d/%d' % (n + 1, len(todo)), end='', flush=True)
+            print()
+
+    summary = summarize(names, rows)
+    columns = names + ['level', 'waves', 'clear_rate', 'clear_time', 'lives_lost', 'score']
+    print('  '.join('%12s' % c for c in columns))
+    for row in summary:
+        print('  '.join('%12.3f' % row[c] if type(row[c]) == float else '%12s' % row[c]
+                        for c in columns))
+
+
+if __name__ == '__main__':
+    main()
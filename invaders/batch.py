@@ -0,0 +1,635 @@
+"""
+Batched simulation module for Alien Invaders
+
+This module contains a model of many independent waves that are played in
+lockstep. It follows the rules of Wave.update, but instead of one Wave object
+per game, the state of every wave (the formation, the ship, the bolts, the
+barriers, the lives and the score) is held in NumPy arrays with one entry per
+wave. A single call to update advances all of the waves by one frame, so
+simulating a thousand games costs about as much Python as simulating one.
+
+This is meant for balancing and testing the game: playing many waves to see
+how often they are cleared, how long they take and how many lives they cost.
+It never draws or plays sounds. To play the game, use Wave.
+
+Whenever the rules of Wave or of WaveBatch change, run checkbatch.py to check
+that they still play the same waves.
+"""
+from consts import *
+import numpy as np
+
+# PRIMARY RULE: WaveBatch only uses consts.py. It is a model of Wave, not a
+# controller, so it does not use models.py or game2d.
+
+
+class WaveBatch(object):
+    """
+    A class representing many waves of Alien Invaders played in lockstep.
+
+    Every wave follows the rules of Wave. The ship moves and fires first, then
+    the aliens step (when their time is up) and may fire, then the bolts move
+    and are tested against the aliens and the ship, then the aliens and the
+    bolts are tested against the barriers, and finally the breaking ship is
+    animated. The only differences from Wave are:
+
+        Each wave is only updated one frame at a time.
+        The random numbers come from one NumPy generator for the whole batch,
+        so a batch does not reproduce the games of Wave for the same seed.
+
+    A wave whose ship broke is continued right away, as if the player pressed
+    'C' (its gamestate is WAVE_STATE_SHIP_BREAKING until the next update).
+    A wave that is cleared or over is no longer updated.
+
+    The formation of each wave is a lattice like in Formation: the position of
+    every alien follows from the origin (the bottom left alien) and the pitch.
+    Killed aliens are removed at once, as their breaking animation does not
+    change the game.
+
+    Each wave has at most one player bolt, as Wave does not let the ship fire
+    while its bolt is on screen. The alien bolts of each wave are kept in a
+    row of slots, which grows when a wave runs out of free slots.
+
+    INSTANCE ATTRIBUTES:
+        _size: the number of waves [int > 0]
+        _rng: the random number generator [numpy.random.Generator]
+        _live: whether each alien is alive [bool array, size x rows x cols]
+        _row_score: the score for destroying an alien of each row [int array]
+        _origin_x: x of the bottom left alien of each wave [float array]
+        _origin_y: y of the bottom left alien of each wave [float array]
+        _walk_dir: the direction of the aliens [bool array, True is right]
+        _time: the time since the last alien step [float array]
+        _alien_speed: the time between alien steps [float array]
+        _penalty_speed: the penalty speed of the level [float array]
+        _boltstep: the alien steps until the next alien bolt [int array]
+        _killed: the number of aliens destroyed [int array]
+        _score: the score of each wave [int array]
+        _lives: the number of lives left [int array]
+        _gamestate: the state of each wave [int array of state constants]
+        _frames: the number of frames each wave was played [int array]
+        _ship_x: x of the ship [float array]
+        _ship_live: whether the ship is alive [bool array]
+        _ship_frame: animation frame of the ship [int array]
+        _barrier_frame: animation frame of each barrier; a barrier is gone
+                        when its frame is above DEFENSE_BARRIERS_FRAMES
+                        [int array, size x DEFENSE_BARRIERS_NUM]
+        _player: whether each wave has a player bolt [bool array]
+        _player_x: x of the player bolt [float array]
+        _player_y: y of the player bolt [float array]
+        _player_fired: the frame the player bolt was fired [int array]
+        _bolt: whether each alien bolt slot is in use
+               [bool array, size x slots]
+        _bolt_x: x of each alien bolt [float array, size x slots]
+        _bolt_y: y of each alien bolt [float array, size x slots]
+        _bolt_fired: the frame each alien bolt was fired
+                     [int array, size x slots]
+    """
+
+    def __init__(self, size, level=1, seed=None, slots=8):
+        """
+        Initializer for class WaveBatch
+
+        Creates size new waves, as Wave.newwave does for a single wave
+
+        Parameter size: the number of waves
+        Precondition size: type is int, size > 0
+
+        Parameter level: the game level of the waves, or of each wave
+        Precondition level: int >= 1, or a sequence of size ints >= 1
+
+        Parameter seed: the seed of the random number generator
+        Precondition seed: type is int >= 0, or None for a random seed
+
+        Parameter slots: the number of alien bolt slots to start with
+        Precondition slots: type is int, slots > 0
+        """
+        assert(ALIEN_ROWS >= 1 and ALIEN_ROWS <= ALIEN_ROWS_MAX)
+        assert(ALIENS_IN_ROW >= 1 and ALIENS_IN_ROW <= ALIENS_IN_ROW_MAX)
+        assert type(size) == int and size > 0
+        assert seed == None or (type(seed) == int and seed >= 0)
+        assert type(slots) == int and slots > 0
+        level = np.broadcast_to(np.asarray(level), (size,))
+        assert level.dtype.kind in 'iu' and (level >= 1).all()
+
+        self._size = size
+        self._rng = np.random.default_rng(seed)
+
+        sz = (ALIEN_HEIGHT + ALIEN_V_SEP) * (ALIEN_ROWS - 1)
+        sy = (GAME_HEIGHT - ALIEN_CEILING) - sz
+        self._live = np.ones((size, ALIEN_ROWS, ALIENS_IN_ROW), dtype=bool)
+        self._row_score = np.array([ALIEN_SCORE[int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])]
+                                    for i in range(ALIEN_ROWS)])
+        self._origin_x = np.full(size, ALIEN_H_SEP + ALIEN_WIDTH/2)
+        self._origin_y = np.full(size, sy + ALIEN_HEIGHT/2)
+        self._walk_dir = np.ones(size, dtype=bool)
+
+        #<Extension: Multiple Waves>
+        penalty = (ALIEN_SPEED * 0.1) * np.minimum(level - 1, 9)
+        self._penalty_speed = np.where(level == 1, 0.0, penalty)
+        assert (ALIEN_SPEED > self._penalty_speed).all()
+        self._time = np.zeros(size)
+        self._alien_speed = np.full(size, float(ALIEN_SPEED))
+        self._boltstep = self._rng.integers(1, BOLT_RATE+1, size=size)
+        self._killed = np.zeros(size, dtype=int)
+        self._score = np.zeros(size, dtype=int)
+        self._lives = np.full(size, SHIP_LIVES, dtype=int)
+        self._gamestate = np.full(size, WAVE_STATE_INIT, dtype=int)
+        self._frames = np.zeros(size, dtype=int)
+
+        self._ship_x = np.full(size, (GAME_WIDTH - SHIP_WIDTH)/2)
+        self._ship_live = np.ones(size, dtype=bool)
+        self._ship_frame = np.zeros(size, dtype=int)
+
+        #<Extension: Defense Barriers>
+        self._barrier_frame = np.zeros((size, DEFENSE_BARRIERS_NUM), dtype=int)
+
+        self._player = np.zeros(size, dtype=bool)
+        self._player_x = np.zeros(size)
+        self._player_y = np.zeros(size)
+        self._player_fired = np.zeros(size, dtype=int)
+        self._bolt = np.zeros((size, slots), dtype=bool)
+        self._bolt_x = np.zeros((size, slots))
+        self._bolt_y = np.zeros((size, slots))
+        self._bolt_fired = np.zeros((size, slots), dtype=int)
+
+    # GETTERS (COPIES OF THE ARRAYS, ONE ENTRY PER WAVE)
+    @property
+    def size(self):
+        """
+        The number of waves
+        """
+        return self._size
+
+    @property
+    def score(self):
+        """
+        The score of each wave [int array]
+        """
+        return self._score.copy()
+
+    @property
+    def lives(self):
+        """
+        The number of lives left in each wave [int array]
+        """
+        return self._lives.copy()
+
+    @property
+    def gamestate(self):
+        """
+        The state of each wave [int array of WAVE_STATE constants]
+        """
+        return self._gamestate.copy()
+
+    @property
+    def done(self):
+        """
+        Whether each wave is cleared or over [bool array]
+        """
+        return ((self._gamestate == WAVE_STATE_CLEAR) |
+                (self._gamestate == WAVE_STATE_GAMEOVER))
+
+    @property
+    def frames(self):
+        """
+        The number of frames each wave was played [int array]
+        """
+        return self._frames.copy()
+
+    @property
+    def living(self):
+        """
+        The number of living aliens in each wave [int array]
+        """
+        return ALIEN_ROWS * ALIENS_IN_ROW - self._killed
+
+    @property
+    def ship(self):
+        """
+        The x of the ship of each wave [float array]
+        """
+        return self._ship_x.copy()
+
+    @property
+    def shooters(self):
+        """
+        The x of the aliens that can fire, the lowest living alien of each
+        column [float array, size x ALIENS_IN_ROW, nan if the column has no
+        living alien]
+        """
+        x = self._origin_x[:,None] + np.arange(ALIENS_IN_ROW) * self._pitchX()
+        return np.where(self._live.any(axis=1), x, np.nan)
+
+    # UPDATE METHOD
+    def update(self, dt, move=None, fire=None):
+        """
+        Animates a single frame in every wave that is not cleared or over.
+
+        The ship of each wave is moved and fired before the wave is updated,
+        as Invaders does with the keys of the player.
+
+        Parameter dt: The time in seconds since last update
+        Precondition dt: dt is a number (int or float) >= 0
+
+        Parameter move: the movement of the ship of each wave, -1 for left,
+                0 to stay and 1 for right, or None to keep every ship still
+        Precondition move: None, or a sequence of size ints in -1..1
+
+        Parameter fire: whether the ship of each wave fires, or None to not
+                fire; a ship only fires if its bolt is no longer on screen
+        Precondition fire: None, or a bool or a sequence of size bools
+        Return: None
+        """
+        assert type(dt) in [int,float] and dt >= 0
+        state = self._gamestate
+        state[state == WAVE_STATE_SHIP_BREAKING] = WAVE_STATE_INIT
+        active = state == WAVE_STATE_INIT
+        if not active.any():
+            return
+        self._frames += active
+        self._time[active] += dt
+
+        if move is not None:
+            move = np.asarray(move)
+            assert move.shape == (self._size,)
+            x = self._ship_x + np.where(active, move, 0) * SHIP_MOVEMENT
+            np.clip(x, SHIP_WIDTH/2, GAME_WIDTH - SHIP_WIDTH/2, out=self._ship_x)
+        if fire is not None:
+            fired = np.broadcast_to(np.asarray(fire), (self._size,))
+            assert fired.dtype == bool
+            fired = fired & active & ~self._player
+            self._player |= fired
+            self._player_x[fired] = self._ship_x[fired]
+            self._player_y[fired] = SHIP_BOTTOM + SHIP_HEIGHT
+            self._player_fired[fired] = self._frames[fired]
+
+        self._stepAliens(np.flatnonzero(active & (self._time >= self._alien_speed)))
+
+        if self._player.any() or self._bolt.any():
+            self._moveBolts(active)
+            self._collisionBolts(active)
+        #<Extension: Defense Barriers>
+        self._collisionAliensBarriers(active)
+        if self._player.any() or self._bolt.any():
+            self._collisionBoltsBarriers()
+            self._cullBolts()
+        self._breakinAnimation(active)
+
+    # HELPER METHODS FOR THE ALIENS
+    def _pitchX(self):
+        """
+        Horizontal distance between the centers of two aliens in a row
+
+        Parameter: None
+        Precondition: None
+        Return: the pitch [int]
+        """
+        return ALIEN_WIDTH + ALIEN_H_SEP
+
+    def _pitchY(self):
+        """
+        Vertical distance between the centers of two aliens in a column
+
+        Parameter: None
+        Precondition: None
+        Return: the pitch [int]
+        """
+        return ALIEN_HEIGHT + ALIEN_V_SEP
+
+    def _stepAliens(self, w):
+        """
+        Step the aliens of some waves, as Wave.update does when the time of
+        the wave is up, and fire their bolts
+
+        Parameter w: the waves whose aliens step
+        Precondition w: int array of distinct waves
+        Return: None
+        """
+        if len(w) == 0:
+            return
+        live = self._live[w]
+        cols = live.any(axis=1)
+        any_live = cols.any(axis=1)
+        j0 = np.argmax(cols, axis=1)
+        j1 = ALIENS_IN_ROW - 1 - np.argmax(cols[:, ::-1], axis=1)
+        i0 = np.argmax(live.any(axis=2), axis=1)
+        ox = self._origin_x[w]
+        oy = self._origin_y[w]
+        right = ox + j1 * self._pitchX() + ALIEN_WIDTH/2
+        left = ox + j0 * self._pitchX() - ALIEN_WIDTH/2
+        bottom = oy + i0 * self._pitchY() - ALIEN_HEIGHT/2
+
+        walk_dir = self._walk_dir[w]
+        end = any_live & np.where(walk_dir,
+                                  right + ALIEN_H_WALK > GAME_WIDTH - ALIEN_H_SEP,
+                                  left - ALIEN_H_WALK < ALIEN_H_SEP)
+        over = ~end & any_live & (bottom <= DEFENSE_LINE)
+        self._gamestate[w[over]] = WAVE_STATE_GAMEOVER
+        self._walk_dir[w[end]] = ~walk_dir[end]
+        self._origin_y[w[end]] -= ALIEN_V_WALK
+        self._origin_x[w] += np.where(end, 0, np.where(walk_dir, ALIEN_H_WALK,
+                                                       -ALIEN_H_WALK))
+        self._time[w] = 0
+
+        self._boltstep[w] -= 1
+        ready = self._boltstep[w] == 0
+        shoot = w[ready & any_live]
+        if len(shoot) > 0:
+            cols = self._live[shoot].any(axis=1)
+            count = cols.sum(axis=1)
+            k = (self._rng.random(len(shoot)) * count).astype(int)
+            j = np.argmax(np.cumsum(cols, axis=1) > k[:,None], axis=1)
+            i = np.argmax(self._live[shoot, :, j], axis=1)
+            x = self._origin_x[shoot] + j * self._pitchX()
+            y = self._origin_y[shoot] + i * self._pitchY() - ALIEN_HEIGHT/2
+            self._fireAlienBolts(shoot, x, y)
+        w = w[ready]
+        self._boltstep[w] = self._rng.integers(1, BOLT_RATE+1, size=len(w))
+
+    def _kill(self, w, i, j):
+        """
+        Destroy aliens and add their scores
+
+        Parameter w, i, j: the wave, row and column of each alien
+        Precondition: int arrays of the same length, the aliens are alive
+                and no alien appears twice
+        Return: None
+        """
+        self._live[w, i, j] = False
+        np.add.at(self._score, w, self._row_score[i])
+        np.add.at(self._killed, w, 1)
+
+    def _checkClearAliens(self, w):
+        """
+        Update the speed of the aliens of some waves, and clear the waves
+        whose aliens are all destroyed, as Wave._checkClearAlien does
+
+        Parameter w: the waves that destroyed an alien
+        Precondition w: int array of distinct waves
+        Return: None
+        """
+        total = ALIEN_ROWS * ALIENS_IN_ROW
+        ar = (self._killed[w] + 1) / total
+        speed = (ALIEN_SPEED - self._penalty_speed[w]) * (1.0 - ar * ALIEN_SPEED_RATIO)
+        self._alien_speed[w] = speed
+        clear = w[self._killed[w] == total]
+        self._gamestate[clear] = WAVE_STATE_CLEAR
+        self._clearBolts(clear)
+
+    # HELPER METHODS FOR THE BOLTS
+    def _fireAlienBolts(self, w, x, y):
+        """
+        Add an alien bolt to each of some waves, in its first free slot
+
+        Parameter w: the waves that fire
+        Precondition w: int array of distinct waves
+
+        Parameter x, y: the center of each new bolt
+        Precondition: float arrays of the same length as w
+        Return: None
+        """
+        free = ~self._bolt[w]
+        if not free.any(axis=1).all():
+            self._growBolts()
+            free = ~self._bolt[w]
+        k = np.argmax(free, axis=1)
+        self._bolt[w, k] = True
+        self._bolt_x[w, k] = x
+        self._bolt_y[w, k] = y
+        self._bolt_fired[w, k] = self._frames[w]
+
+    def _growBolts(self):
+        """
+        Double the number of alien bolt slots of every wave
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        self._bolt = np.concatenate([self._bolt, np.zeros_like(self._bolt)], axis=1)
+        self._bolt_x = np.concatenate([self._bolt_x, np.zeros_like(self._bolt_x)], axis=1)
+        self._bolt_y = np.concatenate([self._bolt_y, np.zeros_like(self._bolt_y)], axis=1)
+        self._bolt_fired = np.concatenate([self._bolt_fired,
+                                           np.zeros_like(self._bolt_fired)], axis=1)
+
+    def _clearBolts(self, w):
+        """
+        Remove all bolts of some waves
+
+        Parameter w: the waves
+        Precondition w: int array or bool mask of waves
+        Return: None
+        """
+        self._player[w] = False
+        self._bolt[w] = False
+
+    def _moveBolts(self, active):
+        """
+        Move the bolts of the active waves by one frame
+
+        Parameter active: whether each wave is played [bool array]
+        Precondition active: bool array of size entries
+        Return: None
+        """
+        self._player_y += np.where(self._player & active, BOLT_SPEED, 0)
+        self._bolt_y -= np.where(self._bolt & active[:,None], BOLT_SPEED, 0)
+
+    def _cullBolts(self):
+        """
+        Remove the bolts that left the screen
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        self._player &= (self._player_y - BOLT_HEIGHT/2) <= GAME_HEIGHT
+        self._bolt &= (self._bolt_y + BOLT_HEIGHT/2) > 0
+
+    # HELPER METHODS FOR COLLISION DETECTION
+    #<Extension: Defense Barriers>
+    def _barrierBoxes(self):
+        """
+        The collision boxes of the barriers, as in Wave
+
+        Parameter: None
+        Precondition: None
+        Return: (left, bottom, right, top); left and right are float arrays of
+                DEFENSE_BARRIERS_NUM entries, bottom and top are floats
+        """
+        sx = DEFENSE_BARRIERS_SEP + np.arange(DEFENSE_BARRIERS_NUM) * \
+             (DEFENSE_BARRIERS_WIDTH + DEFENSE_BARRIERS_SEP)
+        gap = DEFENSE_BARRIERS_COLLIDES_GAP
+        bottom = DEFENSE_BARRIERS_LINE - DEFENSE_BARRIERS_HEIGHT/2 - gap
+        return (sx.astype(float), bottom, sx + float(DEFENSE_BARRIERS_WIDTH),
+                bottom + DEFENSE_BARRIERS_HEIGHT)
+
+    def _collisionBoltsBarriers(self):
+        """
+        Check for collision between bolts and defense barriers
+        Each barrier absorbs at most one bolt a frame, the first one fired
+        that hits it, and weakens; the barriers are taken from the left, and
+        a bolt is only absorbed once. The ship fires before the aliens in a
+        frame, so the player bolt is first when both were fired together
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        left, bottom, right, top = self._barrierBoxes()
+        x = np.concatenate([self._player_x[:,None], self._bolt_x], axis=1)
+        y = np.concatenate([self._player_y[:,None], self._bolt_y], axis=1)
+        used = np.concatenate([self._player[:,None], self._bolt], axis=1)
+        near = used & (y + BOLT_HEIGHT/2 >= bottom) & (y - BOLT_HEIGHT/2 <= top)
+        w = np.flatnonzero(near.any(axis=1))
+        if len(w) == 0:
+            return
+        x = x[w][:,:,None]
+        hit = (near[w][:,:,None] &
+               (x + BOLT_WIDTH/2 >= left) & (x - BOLT_WIDTH/2 <= right) &
+               (self._barrier_frame[w][:,None,:] <= DEFENSE_BARRIERS_FRAMES))
+        fired = np.concatenate([self._player_fired[w][:,None],
+                                self._bolt_fired[w]], axis=1)
+        last = np.iinfo(fired.dtype).max
+        spent = np.zeros(hit.shape[:2], dtype=bool)
+        for b in range(DEFENSE_BARRIERS_NUM):
+            free = hit[:,:,b] & ~spent
+            wb = np.flatnonzero(free.any(axis=1))
+            first = np.argmin(np.where(free[wb], fired[wb], last), axis=1)
+            spent[wb, first] = True
+            self._barrier_frame[w[wb], b] += 1
+        self._player[w] &= ~spent[:,0]
+        self._bolt[w] &= ~spent[:,1:]
+
+    def _collisionAliensBarriers(self, active):
+        """
+        Check for collision between aliens and defense barriers
+        Each barrier destroys the first living alien it overlaps and weakens
+        As in Wave, this does not update the speed of the aliens
+
+        Parameter active: whether each wave is played [bool array]
+        Precondition active: bool array of size entries
+        Return: None
+        """
+        left, bottom, right, top = self._barrierBoxes()
+        low = self._origin_y - ALIEN_HEIGHT/2 <= top
+        w = np.flatnonzero(active & low &
+                           (self._killed < ALIEN_ROWS * ALIENS_IN_ROW))
+        if len(w) == 0:
+            return
+        x = self._origin_x[w][:,None] + np.arange(ALIENS_IN_ROW) * self._pitchX()
+        y = self._origin_y[w][:,None] + np.arange(ALIEN_ROWS) * self._pitchY()
+        xo = ((x[:,None,:] + ALIEN_WIDTH/2 >= left[:,None]) &
+              (x[:,None,:] - ALIEN_WIDTH/2 <= right[:,None]))
+        yo = (y + ALIEN_HEIGHT/2 >= bottom) & (y - ALIEN_HEIGHT/2 <= top)
+        present = self._barrier_frame[w] <= DEFENSE_BARRIERS_FRAMES
+        hit = (self._live[w][:,None,:,:] & yo[:,None,:,None] &
+               xo[:,:,None,:] & present[:,:,None,None])
+        hit = hit.reshape(len(w), DEFENSE_BARRIERS_NUM, -1)
+        wb, b = np.nonzero(hit.any(axis=2))
+        if len(wb) == 0:
+            return
+        i, j = np.divmod(np.argmax(hit[wb, b], axis=1), ALIENS_IN_ROW)
+        self._kill(w[wb], i, j)
+        self._barrier_frame[w[wb], b] += 1
+
+    def _collisionBolts(self, active):
+        """
+        Check for collision between bolts
+        The player bolt checks collision with the aliens, and the alien
+        bolts check collision with the ship
+
+        Every alien bolt that hits the ship is spent, and a ship that is
+        already breaking starts its animation over. A player bolt is spent
+        on the first living alien it hits, in the order of Formation.hits.
+
+        Parameter active: whether each wave is played [bool array]
+        Precondition active: bool array of size entries
+        Return: None
+        """
+        # alien bolts against the ship
+        sy = SHIP_BOTTOM + SHIP_HEIGHT/2
+        bx = self._bolt_x
+        by = self._bolt_y
+        contact = (self._bolt & active[:,None] &
+                   (self._ship_x[:,None] + SHIP_WIDTH/2 >= bx - BOLT_WIDTH/2) &
+                   (self._ship_x[:,None] - SHIP_WIDTH/2 <= bx + BOLT_WIDTH/2) &
+                   (sy + SHIP_HEIGHT/2 >= by - BOLT_HEIGHT/2) &
+                   (sy - SHIP_HEIGHT/2 <= by + BOLT_HEIGHT/2))
+        ship_hit = contact.any(axis=1)
+
+        # the player bolt against the aliens
+        w = np.flatnonzero(self._player & active)
+        if len(w) > 0:
+            self._collisionPlayerBolts(w)
+
+        if ship_hit.any():
+            self._bolt &= ~contact
+            #<Extension: Animate the Aliens>
+            self._ship_live[ship_hit] = False
+            self._ship_frame[ship_hit] = 1
+
+    def _collisionPlayerBolts(self, w):
+        """
+        Check for collision between the player bolts and the aliens
+        Only the cells of the lattice under each bolt are checked
+
+        Parameter w: the waves with a player bolt
+        Precondition w: int array of distinct waves
+        Return: None
+        """
+        px = self._pitchX()
+        py = self._pitchY()
+        hw = ALIEN_WIDTH/2
+        hh = ALIEN_HEIGHT/2
+        left = self._player_x[w] - BOLT_WIDTH/2
+        right = self._player_x[w] + BOLT_WIDTH/2
+        bottom = self._player_y[w] - BOLT_HEIGHT/2
+        top = self._player_y[w] + BOLT_HEIGHT/2
+        ox = self._origin_x[w]
+        oy = self._origin_y[w]
+        # the bolt is narrower than the gap between columns, but may touch
+        # two rows at once; the lower row is hit first
+        j = np.maximum(np.ceil((left - ox - hw) / px), 0).astype(int)
+        i0 = np.maximum(np.ceil((bottom - oy - hh) / py), 0).astype(int)
+        i1 = np.minimum(np.floor((top - oy + hh) / py), ALIEN_ROWS-1).astype(int)
+        jc = np.minimum(j, ALIENS_IN_ROW-1)
+        x = ox + jc * px
+        inside = ((j < ALIENS_IN_ROW) & (x + hw >= left) & (x - hw <= right))
+        cell = np.full(len(w), -1)
+        for row in (i0 + 1, i0):
+            ic = np.minimum(row, ALIEN_ROWS-1)
+            y = oy + ic * py
+            alive = (inside & (row <= i1) & self._live[w, ic, jc] &
+                     (y + hh >= bottom) & (y - hh <= top))
+            cell = np.where(alive, ic, cell)
+        hit = cell >= 0
+        if not hit.any():
+            return
+        w = w[hit]
+        self._kill(w, cell[hit], jc[hit])
+        self._player[w] = False
+        self._checkClearAliens(w)
+
+    #<Extension: Animate the Aliens>
+    def _breakinAnimation(self, active):
+        """
+        Animate the broken ships, and take a life when the animation is over
+
+        Parameter active: whether each wave is played [bool array]
+        Precondition active: bool array of size entries
+        Return: None
+        """
+        broken = active & ~self._ship_live
+        if not broken.any():
+            return
+        frame = self._ship_frame
+        breaking = np.flatnonzero(broken & (frame >= 5))
+        frame[broken & (frame < 5)] += 1
+        if len(breaking) == 0:
+            return
+        self._lives[breaking] -= 1
+        self._ship_live[breaking] = True
+        self._ship_frame[breaking] = 0
+        self._gamestate[breaking] = np.where(self._lives[breaking] > 0,
+                                             WAVE_STATE_SHIP_BREAKING,
+                                             WAVE_STATE_GAMEOVER)
+        self._clearBolts(breaking)
@@ -0,0 +1,201 @@
+"""
+Regression check of WaveBatch against Wave
+
+WaveBatch is a second copy of the rules of Wave, written for speed, and the
+balance runner (balance.py) is only as right as that copy. This script plays
+single waves with both, with the same ship and the same random numbers, and
+checks that they agree at every frame: the gamestate, the score, the lives,
+the ship, the number of bolts and the strength of every barrier. Run it after
+changing the rules of either of them, for example
+
+    python invaders/checkbatch.py --seeds 30 --levels 1-3
+
+It prints the first frame where a wave differs, and exits with status 1 if any
+wave does.
+"""
+import sys
+
+# consts reads the size of the formation from the command line, which holds
+# the options of this script instead, so they are put aside before importing
+ARGV = sys.argv[1:]
+del sys.argv[1:]
+
+import os
+os.environ.setdefault('GAME2D_BACKEND', 'null')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from consts import *
+from wave import Wave
+from batch import WaveBatch
+from balance import parseLevels
+import argparse
+import numpy as np
+import random
+
+
+class RandomStream(object):
+    """
+    A class representing a fixed sequence of random numbers.
+
+    Wave draws its random numbers from a random.Random, and WaveBatch from a
+    numpy.random.Generator, so the same seed does not give the same games.
+    Two streams with the same seed hand out the same numbers instead, one
+    to each of them: the alien steps until the next bolt (randrange and
+    integers) and the choice of the alien that fires (choice and random).
+    Only the methods that Wave and WaveBatch call are provided.
+
+    INSTANCE ATTRIBUTES:
+        _steps: the generator of the alien steps [random.Random]
+        _picks: the generator of the firing aliens [random.Random]
+    """
+
+    def __init__(self, seed):
+        """
+        Initializer for class RandomStream
+
+        Parameter seed: the seed of the numbers
+        Precondition seed: type is int, seed >= 0
+        """
+        self._steps = random.Random(seed)
+        self._picks = random.Random(seed + 1)
+
+    def randrange(self, start, stop):
+        """
+        Return: the next number of alien steps, like random.randrange
+        """
+        return self._steps.randrange(start, stop)
+
+    def choice(self, seq):
+        """
+        Return: the next column to fire from seq, like random.choice
+        """
+        return seq[int(self._picks.random() * len(seq))]
+
+    def integers(self, low, high, size):
+        """
+        Return: the next numbers of alien steps, like Generator.integers
+        """
+        return np.array([self.randrange(low, high) for k in range(size)])
+
+    def random(self, size):
+        """
+        Return: the next numbers to pick the firing aliens, like
+                Generator.random
+        """
+        return np.array([self._picks.random() for k in range(size)])
+
+
+def compare(wave, waves):
+    """
+    Compare a Wave with the only wave of a WaveBatch
+
+    Parameter wave: the wave
+    Precondition wave: type is Wave
+
+    Parameter waves: the batch
+    Precondition waves: type is WaveBatch, of size 1
+    Return: the names of the values that differ [list of str]
+    """
+    barriers = [DEFENSE_BARRIERS_FRAMES + 1 if d == None else d.frame
+                for d in wave._defense_barriers]
+    values = (('gamestate', wave.gamestate, int(waves.gamestate[0])),
+              ('score', wave.score, int(waves.score[0])),
+              ('lives', wave._lives, int(waves.lives[0])),
+              ('ship', wave._ship.x, float(waves.ship[0])),
+              ('bolts', len(wave._bolts),
+               int(waves._player[0]) + int(waves._bolt[0].sum())),
+              ('barriers', barriers, waves._barrier_frame[0].tolist()))
+    return [name for name, a, b in values if a != b]
+
+
+def check(seed, level, frames=20000, lives=SHIP_LIVES):
+    """
+    Play one wave with Wave and with WaveBatch and compare them every frame
+
+    The ship wanders left and right and fires now and then, like the ship
+    'random' of the balance runner. When the ship of the Wave breaks, it is
+    continued at once, as WaveBatch does.
+
+    Parameter seed: the seed of the random numbers and the ship
+    Precondition seed: type is int, seed >= 0
+
+    Parameter level: the game level of the wave
+    Precondition level: type is int, level >= 1
+
+    Parameter frames: the most frames to play
+    Precondition frames: type is int, frames > 0
+
+    Parameter lives: the lives of the ship
+    Precondition lives: type is int, lives > 0
+    Return: (frame, names) of the first frame where the waves differ, or
+            (frames played, []) if they never do
+    """
+    wave = Wave(headless=True)
+    wave.newwave(level, seed=seed)
+    wave._rng = RandomStream(seed)
+    wave._boltstep = wave._rng.randrange(1, BOLT_RATE+1)
+    wave._lives = lives
+    waves = WaveBatch(1, level=level)
+    waves._rng = RandomStream(seed)
+    waves._boltstep[:] = waves._rng.integers(1, BOLT_RATE+1, size=1)
+    waves._lives[:] = lives
+
+    dt = 1.0/GAME_TICK_RATE
+    ship = random.Random(seed)
+    right = True
+    for frame in range(frames):
+        right ^= ship.random() < 0.02
+        fire = ship.random() < 0.3
+        wave.time = wave.time + dt
+        wave.moveShip(right)
+        if fire:
+            wave.firePlayerBolt()
+        wave.update()
+        if wave.gamestate == WAVE_STATE_SHIP_BREAKING:
+            wave.gamestate = WAVE_STATE_INIT
+        waves.update(dt, move=[1 if right else -1], fire=[fire])
+        if waves.gamestate[0] == WAVE_STATE_SHIP_BREAKING:
+            waves._gamestate[0] = WAVE_STATE_INIT
+        names = compare(wave, waves)
+        if len(names) > 0:
+            return (frame, names)
+        if wave.gamestate in (WAVE_STATE_CLEAR, WAVE_STATE_GAMEOVER):
+            return (frame + 1, [])
+    return (frames, [])
+
+
+def main(argv=None):
+    """
+    Run the check from the command line
+
+    Parameter argv: the command line arguments, or None for those of the
+            command line (see ARGV)
+    Precondition argv: list of str, or None
+    Return: the exit status, 0 if every wave agrees and 1 if not [int]
+    """
+    parser = argparse.ArgumentParser(description='Check that WaveBatch plays '
+                                     'the same waves as Wave.')
+    parser.add_argument('--seeds', type=int, default=30, help='waves per level')
+    parser.add_argument('--levels', type=parseLevels, default=[1, 2, 3],
+                        help='levels to play (1-3)')
+    parser.add_argument('--frames', type=int, default=20000, help='most frames per wave')
+    parser.add_argument('--lives', type=int, default=SHIP_LIVES, help='lives of the ship')
+    args = parser.parse_args(ARGV if argv == None else argv)
+    if args.seeds < 1 or args.frames < 1 or args.lives < 1:
+        parser.error('--seeds, --frames and --lives must be positive')
+
+    failed = 0
+    for level in args.levels:
+        for seed in range(args.seeds):
+            frame, names = check(seed, level, args.frames, args.lives)
+            if len(names) > 0:
+                failed += 1
+                print('level %d seed %d: %s differ at frame %d' %
+                      (level, seed, ', '.join(names), frame))
+    total = args.seeds * len(args.levels)
+    print('%d of %d waves agree' % (total - failed, total))
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Regression check of Wave.update with several frames at once
+
+Wave.update(steps, dt) plays the frames between two alien steps in one move
+of the bolts when nothing can happen in them, and every other frame on its
+own. This script plays single waves twice, once with an update for every
+frame and once with an update for every few frames, with the same ship, and
+checks that the snapshots of the two waves are the same after every update.
+Run it after changing update or the collisions, for example
+
+    python invaders/checksteps.py --seeds 20 --steps 5 10
+
+It prints the first frame where a wave differs, and exits with status 1 if any
+wave does.
+"""
+import sys
+
+# consts reads the size of the formation from the command line, which holds
+# the options of this script instead, so they are put aside before importing
+ARGV = sys.argv[1:]
+del sys.argv[1:]
+
+import os
+os.environ.setdefault('GAME2D_BACKEND', 'null')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from consts import *
+from wave import Wave
+from balance import parseLevels
+import argparse
+import random
+
+
+def compare(single, multi):
+    """
+    Compare the wave played frame by frame with the one played in steps
+
+    Parameter single: the wave updated every frame
+    Precondition single: type is Wave
+
+    Parameter multi: the wave updated every few frames
+    Precondition multi: type is Wave
+    Return: the names of the values that differ [list of str]
+    """
+    values = (('gamestate', single.gamestate, multi.gamestate),
+              ('score', single.score, multi.score),
+              ('lives', single._lives, multi._lives),
+              ('aliens', single._formation.getState()[:3],
+               multi._formation.getState()[:3]),
+              ('bolts', single._bolts.getState()[1].tolist(),
+               multi._bolts.getState()[1].tolist()))
+    names = []
+    for name, a, b in values:
+        if (name == 'aliens' and (a[0] != b[0] or a[1] != b[1] or
+                                  (a[2] != b[2]).any())) or \
+           (name != 'aliens' and a != b):
+            names.append(name)
+    if len(names) == 0 and single.snapshot() != multi.snapshot():
+        names.append('snapshot')
+    return names
+
+
+def check(seed, level, steps, frames=20000, lives=SHIP_LIVES):
+    """
+    Play one wave frame by frame and in steps, and compare them every update
+
+    The ship wanders left and right and fires now and then, but only moves
+    between two updates of the wave played in steps. Both waves stop an
+    update at the frame that changes the game state; when the ship breaks,
+    it is continued at once.
+
+    Parameter seed: the seed of the wave and the ship
+    Precondition seed: type is int, seed >= 0
+
+    Parameter level: the game level of the wave
+    Precondition level: type is int, level >= 1
+
+    Parameter steps: the frames of an update of the wave played in steps
+    Precondition steps: type is int, steps > 0
+
+    Parameter frames: the most frames to play
+    Precondition frames: type is int, frames > 0
+
+    Parameter lives: the lives of the ship
+    Precondition lives: type is int, lives > 0
+    Return: (frame, names) of the first update where the waves differ, or
+            (frames played, []) if they never do
+    """
+    single = Wave(headless=True)
+    single.newwave(level, seed=seed)
+    single._lives = lives
+    multi = Wave(headless=True)
+    multi.newwave(level, seed=seed)
+    multi._lives = lives
+
+    dt = 1.0/GAME_TICK_RATE
+    ship = random.Random(seed)
+    right = True
+    frame = 0
+    while frame < frames:
+        right ^= ship.random() < 0.1
+        fire = ship.random() < 0.5
+        for wave in (single, multi):
+            wave.moveShip(right)
+            if fire:
+                wave.firePlayerBolt()
+
+        played = 0
+        while played < steps and single.gamestate == WAVE_STATE_INIT:
+            single.time = single.time + dt
+            single.update()
+            played += 1
+        multi.update(steps, dt)
+        frame += played
+
+        names = compare(single, multi)
+        if len(names) > 0:
+            return (frame, names)
+        if single.gamestate in (WAVE_STATE_CLEAR, WAVE_STATE_GAMEOVER):
+            return (frame, [])
+        for wave in (single, multi):
+            if wave.gamestate == WAVE_STATE_SHIP_BREAKING:
+                wave.gamestate = WAVE_STATE_INIT
+    return (frame, [])
+
+
+def main(argv=None):
+    """
+    Run the check from the command line
+
+    Parameter argv: the command line arguments, or None for those of the
+            command line (see ARGV)
+    Precondition argv: list of str, or None
+    Return: the exit status, 0 if every wave agrees and 1 if not [int]
+    """
+    parser = argparse.ArgumentParser(description='Check that Wave plays the '
+                                     'same waves with several frames an update.')
+    parser.add_argument('--seeds', type=int, default=20, help='waves per level')
+    parser.add_argument('--levels', type=parseLevels, default=[1, 2, 3],
+                        help='levels to play (1-3)')
+    parser.add_argument('--steps', type=int, nargs='+', default=[5, 10],
+                        help='frames an update')
+    parser.add_argument('--frames', type=int, default=20000, help='most frames per wave')
+    parser.add_argument('--lives', type=int, default=SHIP_LIVES, help='lives of the ship')
+    args = parser.parse_args(ARGV if argv == None else argv)
+    if (args.seeds < 1 or args.frames < 1 or args.lives < 1 or
+        min(args.steps) < 1):
+        parser.error('--seeds, --steps, --frames and --lives must be positive')
+
+    failed = 0
+    for steps in args.steps:
+        for level in args.levels:
+            for seed in range(args.seeds):
+                frame, names = check(seed, level, steps, args.frames, args.lives)
+                if len(names) > 0:
+                    failed += 1
+                    print('steps %d level %d seed %d: %s differ at frame %d' %
+                          (steps, level, seed, ', '.join(names), frame))
+    total = args.seeds * len(args.levels) * len(args.steps)
+    print('%d of %d waves agree' % (total - failed, total))
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
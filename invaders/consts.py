@@ -19,6 +19,10 @@ import sys
 GAME_WIDTH  = 800
 #: the height of the game display
 GAME_HEIGHT = 700
+#: the number of updates per second; the speeds below are in pixels per update
+GAME_TICK_RATE = 60
+#: the most updates to run in one frame when the game falls behind
+GAME_MAX_STEPS = 5
 
 
 ### SHIP CONSTANTS ###
@@ -102,6 +106,10 @@ ALIEN_ROWS_MAX = 10
 ALIENS_IN_ROW_MAX = 15
 
 
+# the size of a cell in the spatial hash used for collision queries
+SPATIAL_CELL_SIZE = 64
+
+
 ### BOLT CONSTANTS ###
 
 # the width of a laser bolt
@@ -157,6 +165,12 @@ GAME_TEXT_SCORE_COLOR = [1,1,0,1]
 # color of text for lives
 GAME_TEXT_LIVES_COLOR = [1,1,0,1]
 
+# the static layer of the view under the aliens, with the defense line
+GAME_LAYER_BACKDROP = 'backdrop'
+# the static layer of the view over the aliens, with the score, the lives
+# and the messages
+GAME_LAYER_HUD = 'hud'
+
 # score earned for destroying alien_0
 SCORE_ALIEN_0 = 10
 # score earned for destroying alien_1
@@ -178,6 +192,12 @@ WAVE_STATE_CLEAR = 2
 # wave state game over
 WAVE_STATE_GAMEOVER = 3
 
+# the seed of the random numbers of the game, None for a different game each time
+GAME_SEED = None
+# the seeds of the game and of the waves are below this (a snapshot of a wave
+# stores its seed in 8 bytes)
+GAME_SEED_LIMIT = 2**64
+
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
 """
@@ -188,7 +208,7 @@ arguments are everything after the word python. So if you start the game typing
 
 Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take
 advantage of this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and
-ALIEN_SPEED.
+ALIEN_SPEED. A fourth argument sets GAME_SEED, to play the same game again.
 """
 try:
     rows = int(sys.argv[1])
@@ -211,4 +231,11 @@ try:
 except:
     pass # Use original value
 
+try:
+    seed = int(sys.argv[4])
+    if seed >= 0 and seed < GAME_SEED_LIMIT:
+        GAME_SEED = seed
+except:
+    pass # Use original value
+
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
@@ -9,8 +9,14 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
+from .gsprite import GSprite, GFrames
+from .gtext import GFont, GText
+from .gbatch import GSpriteBatch
 from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
+from .gview import GInput, GView, GLayer
+from .gnull import NullInput, NullView
+from .gspatial import GSpatialHash
+from .greplay import GInputLog
+from .gtimer import GPhaseTimer
 from .sound import Sound, SoundLibrary
 from .app import GameApp
\ No newline at end of file
@@ -39,6 +39,18 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for tracking the frames of filmstrips, by file name and format
+    FRAME_CACHE = {}
+    
+    # The file extensions of the images that can be packed into an atlas
+    ATLAS_EXTENSIONS = ('.png','.jpg','.jpeg','.gif','.bmp')
+    
+    # Class attribute for tracking glyph atlases, by font name and size
+    FONT_CACHE = {}
+    
+    # Class attribute for the backend: 'kivy' to display the game, 'null' for no window
+    BACKEND = os.environ.get('GAME2D_BACKEND','kivy')
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -58,9 +70,74 @@ class GameApp(kivy.app.App):
     def fps(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value > 0, 'value %s is not positive' % repr(value)
+        if self.is_null():
+            self._fps = value
+            return
         Clock.unschedule(self._refresh)
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
+
+    @property
+    def tickrate(self):
+        """
+        The number of simulation updates per second, or None to update once per frame
+        
+        By default this value is None, and ``update`` is called once for each frame 
+        with the time since the last frame.  Otherwise, the time of each frame is 
+        added to an accumulator, and ``update`` is called once for every ``1/tickrate`` 
+        seconds in the accumulator, always with ``dt`` equal to ``1/tickrate``.  The 
+        game then behaves the same however fast the machine draws, and ``draw`` is 
+        still called at most once per frame.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tickrate
+    
+    @tickrate.setter
+    def tickrate(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._tickrate = value
+        self._accumulator = 0.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of updates in a single frame when ``tickrate`` is set
+        
+        If a frame takes so long that the game falls more than this many updates 
+        behind, the remaining time is dropped and the game slows down instead.  
+        Otherwise, a slow machine would spend every frame catching up on the last one.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    @property
+    def log(self):
+        """
+        The log recording the input of this game, or None if it is not recorded.
+        
+        While this is a :class:`GInputLog`, the keys held down and the time passed are 
+        added to it before every call to :meth:`update`.  The log can be played back 
+        later with :meth:`replay`.
+        
+        **Invariant**: Must be a :class:`GInputLog` or ``None``.
+        """
+        return self._log
+    
+    @log.setter
+    def log(self,value):
+        from .greplay import GInputLog
+        assert value is None or isinstance(value,GInputLog), \
+            '%s is not an input log' % repr(value)
+        self._log = value
     
     
     # IMMUTABLE PROPERTIES
@@ -107,6 +184,20 @@ class GameApp(kivy.app.App):
         return self._input
     
     # CLASS METHODS
+    @classmethod
+    def is_null(cls):
+        """
+        Checks if the game uses the null backend
+        
+        With the null backend there is no window, no sound and no Kivy Clock.  The view 
+        and input are a :class:`NullView` and a :class:`NullInput`, and the game runs 
+        as fast as it can.  See the module ``gnull`` for more information.
+        
+        :return: True if the game uses the null backend; False otherwise
+        :rtype:  ``bool``
+        """
+        return cls.BACKEND == 'null'
+    
     @classmethod
     def is_image(cls,name):
         """
@@ -176,6 +267,8 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
+        if cls.is_null():
+            return None
         if name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
         
@@ -188,6 +281,101 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_frames(cls,name,format):
+        """
+        Returns: The frames of the filmstrip in the given file, or None if it cannot be loaded
+        
+        The ``name`` must refer to the file in the **Images** folder, and ``format`` is
+        the grid size of the filmstrip as (rows, columns).  If the frames of this file and
+        format have already been loaded, it will return the cached :class:`GFrames`, which
+        is shared by every sprite with the same file and format.  Otherwise, it will load 
+        the texture and cache its frames before returning them.  The frames are only cut 
+        from the texture when they are first used.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param format: The grid size of the filmstrip
+        :type format:  2-element tuple of ints > 0
+        """
+        key = (name,format)
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = cls.load_texture(name)
+        if texture is None:
+            return None
+        
+        from .gsprite import GFrames
+        frames = GFrames(texture,format)
+        cls.FRAME_CACHE[key] = frames
+        return frames
+    
+    @classmethod
+    def load_atlas(cls,name=None,size=1024):
+        """
+        Returns: The texture atlas with the given file name, or with every image if None
+        
+        If ``name`` is None, every image file in the **Images** folder is packed into a 
+        new texture of ``size`` by ``size`` pixels.  Otherwise ``name`` must refer to an 
+        atlas file in the **Images** folder, made by the Kivy tool ``kivy.atlas``.
+        
+        From then on, :meth:`load_texture` returns the region of the atlas for each file 
+        in the atlas instead of loading the file, and so every :class:`GImage` and 
+        :class:`GSprite` created afterwards draws from the atlas.  With the null backend 
+        there are no textures, and this method does nothing and returns None.
+        
+        :param name: The atlas file name, or None to pack every image
+        :type name:  ``str`` or ``None``
+        
+        :param size: The size of the texture to pack the images into
+        :type size:  ``int`` > 0
+        """
+        assert name is None or cls.is_image(name), '%s is not an atlas file' % repr(name)
+        if cls.is_null():
+            return None
+        
+        from .gatlas import GAtlas
+        files = [file for file in sorted(os.listdir(cls.images))
+                 if os.path.splitext(file)[1].lower() in cls.ATLAS_EXTENSIONS]
+        if name is None:
+            atlas = GAtlas.pack([os.path.join(cls.images,file) for file in files],size)
+        else:
+            atlas = GAtlas.load(os.path.join(cls.images,name))
+        
+        for file in files:
+            if file in atlas:
+                cls.unload_texture(file)
+                cls.TEXTURE_CACHE[file] = atlas[file]
+        return atlas
+    
+    @classmethod
+    def load_font(cls,name,size):
+        """
+        Returns: The glyph atlas for the given font name and point size
+        
+        The ``name`` must refer to a file in the **Fonts** folder, or be None for the
+        default Kivy font.  If the font has already been loaded at this size, it will
+        return the cached atlas.  Otherwise, it will render the atlas (see 
+        :class:`GFont`) and cache it before returning it.
+        
+        :param name: The file name
+        :type name:  ``str`` or ``None``
+        
+        :param size: The point size
+        :type size:  ``int`` or ``float`` > 0
+        """
+        assert name is None or cls.is_font(name), '%s is not a font name' % repr(name)
+        key = (name,size)
+        if key in cls.FONT_CACHE:
+            return cls.FONT_CACHE[key]
+        
+        from .gtext import GFont
+        font = GFont(name,size)
+        cls.FONT_CACHE[key] = font
+        return font
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -204,6 +392,8 @@ class GameApp(kivy.app.App):
         if name in cls.TEXTURE_CACHE:
             texture = cls.TEXTURE_CACHE[name]
             del cls.TEXTURE_CACHE[name]
+            for key in [key for key in cls.FRAME_CACHE if key[0] == name]:
+                del cls.FRAME_CACHE[key]
             return texture
         
         return None
@@ -223,6 +413,10 @@ class GameApp(kivy.app.App):
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
+        The keyword ``atlas`` packs the images into a texture atlas when the game starts,
+        before ``start`` is called: True packs every image in the **Images** folder, and 
+        a file name loads that atlas file instead (see :meth:`load_atlas`).
+        
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
@@ -232,6 +426,10 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('tickrate', None)
+        m = keywords.pop('maxsteps', 5)
+        b = keywords.pop('backend', None)
+        a = keywords.pop('atlas', None)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -241,6 +439,14 @@ class GameApp(kivy.app.App):
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self.tickrate = t
+        self.maxsteps = m
+        self._log = None
+        assert a is None or type(a) in [bool,str], 'atlas %s is not valid' % repr(a)
+        self._atlas = a
+        if not b is None:
+            assert b in ['kivy','null'], 'backend %s is not a valid backend' % repr(b)
+            GameApp.BACKEND = b
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -258,6 +464,13 @@ class GameApp(kivy.app.App):
         This is a Kivy reserved method.  It is part of the Kivy application process.  
         It should **never** be overridden.
         """
+        if self.is_null():
+            from .gnull import NullInput, NullView
+            self._view = NullView()
+            self._input = NullInput()
+            self._input._register(self._view)
+            return self.view
+        
         from .gview import GInput, GView
         self._view = GView()
         self._view.size_hint = (1,1)
@@ -265,23 +478,86 @@ class GameApp(kivy.app.App):
         self._input._register(self._view)
         return self.view
     
-    def run(self):
+    def run(self,frames=None):
         """
         Displays the game window and starts the game.
         
         This is a Kivy reserved method.  It is part of the Kivy application process.  
         It should **never** be overridden.
-        """
+        
+        With the null backend, there is no window.  The game is instead run in a loop, 
+        as fast as possible, until :meth:`stop` is called or ``frames`` animation frames 
+        have passed.  Each frame counts as ``1/fps`` seconds.
+        
+        :param frames: The number of frames to run with the null backend, or None
+        :type frames:  ``int`` >= 0 or ``None``
+        """
+        if self.is_null():
+            assert frames is None or (type(frames) == int and frames >= 0), \
+                '%s is not a valid number of frames' % repr(frames)
+            self.build()
+            self._running = True
+            self.start()
+            count = 0
+            while self._running and (frames is None or count < frames):
+                self._refresh(1.0/self.fps)
+                count += 1
+            return
         Clock.schedule_once(self._bootstrap,-1)
         kivy.app.App.run(self)
     
+    def replay(self,log,draw=False):
+        """
+        Plays back the input recorded in a log, as fast as possible.
+        
+        This only works with the null backend.  The game is started as in :meth:`run`, 
+        and then, for each frame of the log, the keys of the frame are held down and 
+        :meth:`update` is called with the time of the frame.  The game is not drawn, 
+        unless ``draw`` is True.  Playback stops early if :meth:`stop` is called.
+        
+        A game plays the same way as when it was recorded only if it depends on nothing 
+        but its input, so any random numbers must come from a seeded generator.
+        
+        :param log: The recorded input
+        :type log:  :class:`GInputLog`
+        
+        :param draw: Whether to draw each frame
+        :type draw:  ``bool``
+        
+        :return: The number of frames played
+        :rtype:  ``int``
+        """
+        from .greplay import GInputLog
+        assert self.is_null(), 'replay needs the null backend'
+        assert isinstance(log,GInputLog), '%s is not an input log' % repr(log)
+        self.build()
+        self._running = True
+        self.start()
+        count = 0
+        for keys, dt in log:
+            if not self._running:
+                break
+            self.input.hold(keys)
+            self._update(dt)
+            if draw:
+                self.view.clear()
+                self.draw()
+                self.view._commit()
+            count += 1
+        return count
+    
     def stop(self):
         """
         Closes the game window and exit Python.
         
         This is a Kivy reserved method.  It is part of the Kivy application process.  
         It should **never** be overridden.
+        
+        With the null backend, this only ends the loop in :meth:`run`.
         """
+        if self.is_null():
+            self._running = False
+            return
         import sys
         kivy.app.App.stop(self)
         sys.exit(0)
@@ -310,6 +586,9 @@ class GameApp(kivy.app.App):
         that represent the current animation state, so that they can persist across
         animation frames.  These attributes should be initialized in `start`.
         
+        If ``tickrate`` is set, this method may be called several times (or not at 
+        all) in one animation frame, and ``dt`` is always ``1/tickrate``.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
@@ -337,6 +616,8 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        if self._atlas:
+            self.load_atlas(None if self._atlas is True else self._atlas)
         self.start()
     
     def _refresh(self,dt):
@@ -346,12 +627,44 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        If ``tickrate`` is set, this runs the fixed updates owed by the accumulator, and 
+        only redraws if at least one of them ran.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._tickrate is None:
+            self.view.clear()
+            self._update(dt)
+            self.draw()
+            self.view._commit()
+            return
+        
+        step = 1.0/self._tickrate
+        self._accumulator += dt
+        steps = 0
+        while self._accumulator >= step and steps < self._maxsteps:
+            self._update(step)
+            self._accumulator -= step
+            steps += 1
+        if self._accumulator >= step:
+            # Too far behind; drop the time we cannot catch up on
+            self._accumulator %= step
+        if steps > 0:
+            self.view.clear()
+            self.draw()
+            self.view._commit()
+    
+    def _update(self,dt):
+        """
+        Updates the game one animation frame, recording the input if there is a log.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
+        if not self._log is None:
+            self._log.record(self.input.keys,dt)
         self.update(dt)
-        self.draw()
     
     def _setpaths(self):
         """
@@ -0,0 +1,183 @@
+"""
+Texture atlases for 2D game support.
+
+Every image file is normally its own texture, and drawing a sprite from a different
+file means switching textures.  An atlas packs many images into one texture, so that
+they can all be drawn without a switch.  Once an atlas is loaded with
+:meth:`GameApp.load_atlas`, :meth:`GameApp.load_texture` returns the region of the
+atlas for each packed file instead of loading the file, and so :class:`GImage` and
+:class:`GSprite` (and its frames) use the atlas without any change.
+
+An atlas can be packed when the game starts, or made beforehand with the Kivy tool::
+
+    python -m kivy.atlas sprites 1024 Images/*.png
+"""
+import os.path
+import numpy as np
+
+
+class GAtlas(object):
+    """
+    A class representing images packed into textures.
+
+    An atlas is a mapping from image names to texture regions.  The name of an image
+    is its file name; the extension does not matter, so ``'ship.png'`` and ``'ship'``
+    are the same image.
+
+    You should not need to create atlases yourself.  Use :meth:`GameApp.load_atlas`.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def textures(self):
+        """
+        The textures the images are packed into.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of Kivy ``Texture``.
+        """
+        return self._textures
+
+    @property
+    def names(self):
+        """
+        The names of the images in this atlas, without extension.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of ``str``.
+        """
+        return tuple(self._regions)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,textures,regions):
+        """
+        Creates an atlas from textures that are already packed.
+
+        :param textures: The textures the images are packed into
+        :type textures:  iterable of Kivy ``Texture``
+
+        :param regions: The region of each image, by name without extension
+        :type regions:  ``dict`` of ``str`` to Kivy ``TextureRegion``
+        """
+        self._textures = tuple(textures)
+        self._regions  = dict(regions)
+
+    def __len__(self):
+        """
+        :return: The number of images in this atlas.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._regions)
+
+    def __contains__(self,name):
+        """
+        :return: True if the image is in this atlas.
+        :rtype:  ``bool``
+
+        :param name: The image name, with or without extension
+        :type name:  ``str``
+        """
+        return os.path.splitext(name)[0] in self._regions
+
+    def __getitem__(self,name):
+        """
+        :return: The texture region of an image.
+        :rtype:  Kivy ``TextureRegion``
+
+        :param name: The image name, with or without extension
+        :type name:  ``str``, in this atlas
+        """
+        return self._regions[os.path.splitext(name)[0]]
+
+
+    # CREATING ATLASES
+    @classmethod
+    def pack(cls,filenames,size=1024,padding=2):
+        """
+        Packs image files into a single new texture.
+
+        The images are placed on shelves, tallest first, with ``padding`` empty pixels
+        around each of them so that they do not bleed into each other when scaled.
+
+        :param filenames: The paths of the image files
+        :type filenames:  iterable of ``str``
+
+        :param size: The width and height of the texture
+        :type size:  ``int`` > 0
+
+        :param padding: The number of empty pixels around each image
+        :type padding:  ``int`` >= 0
+
+        :return: The atlas
+        :rtype:  :class:`GAtlas`
+        """
+        assert type(size) == int and size > 0, '%s is not a valid size' % repr(size)
+        assert type(padding) == int and padding >= 0, '%s is not a valid padding' % repr(padding)
+        from kivy.core.image import Image
+        from kivy.graphics.texture import Texture
+
+        images = {}
+        for filename in filenames:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            images[name] = cls._pixels(Image(filename,nocache=True).texture)
+
+        pixels = np.zeros((size,size,4),dtype=np.uint8)
+        places = {}
+        x = y = padding
+        shelf = 0
+        for name in sorted(images,key=lambda name: -images[name].shape[0]):
+            height, width = images[name].shape[:2]
+            if x+width+padding > size:
+                x = padding
+                y += shelf+padding
+                shelf = 0
+            assert x+width+padding <= size and y+height+padding <= size, \
+                'the images do not fit in an atlas of size %d' % size
+            pixels[y:y+height,x:x+width] = images[name]
+            places[name] = (x,y,width,height)
+            x += width+padding
+            shelf = max(shelf,height)
+
+        texture = Texture.create(size=(size,size),colorfmt='rgba')
+        texture.blit_buffer(pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+        regions = {}
+        for name in places:
+            regions[name] = texture.get_region(*places[name])
+        return cls((texture,),regions)
+
+    @classmethod
+    def load(cls,filename):
+        """
+        Reads an atlas made by the Kivy tool ``kivy.atlas``.
+
+        :param filename: The path of the ``.atlas`` file
+        :type filename:  ``str``
+
+        :return: The atlas
+        :rtype:  :class:`GAtlas`
+        """
+        from kivy.atlas import Atlas
+        atlas = Atlas(filename)
+        return cls(atlas.original_textures,atlas.textures)
+
+
+    # HIDDEN METHODS
+    @classmethod
+    def _pixels(cls,texture):
+        """
+        Returns the pixels of a texture as RGBA, bottom row first.
+
+        The pixels are read back in the order they are stored, so the rows of a
+        texture that is drawn upside down (as loaded images are) are reversed.
+
+        Parameter texture: The texture to read
+        Precondition: texture is a Kivy ``Texture``
+        """
+        width, height = texture.size
+        pixels = np.frombuffer(texture.pixels,dtype=np.uint8).reshape(height,width,4)
+        if texture.tex_coords[1] > texture.tex_coords[5]:
+            pixels = pixels[::-1]
+        return pixels
@@ -0,0 +1,254 @@
+"""
+Sprite batching for 2D game support.
+
+Every :class:`GSprite` draws itself with its own group of Kivy instructions: a matrix,
+a transform, a color and a rectangle.  With a hundred sprites on screen, that is several
+hundred instructions every frame.  A sprite batch instead draws many sprites, without
+rotation or scaling, as the quads of a single ``Mesh`` for each texture and color.  With
+a texture atlas (see :meth:`GameApp.load_atlas`) the sprites all share one texture, and
+are drawn by one mesh.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import is_color
+from .app import GameApp
+
+
+class _GBatchGroup(object):
+    """
+    The sprites of a batch with the same texture and color.
+
+    Each sprite is a tuple ``(x, y, width, height, region)``, kept in :attr:`quads` in
+    the order they were added in the last frame.  The vertices of sprite ``k`` are the
+    16 numbers of :attr:`vertices` starting at ``16*k``.
+    """
+
+    def __init__(self,texture,rgba):
+        """
+        Creates an empty group.
+
+        :param texture: The texture of the sprites, or None for solid rectangles
+        :type texture:  Kivy ``Texture`` or ``None``
+
+        :param rgba: The color of the sprites
+        :type rgba:  4-element tuple of floats in 0..1
+        """
+        self.texture  = texture
+        self.rgba     = rgba
+        self.quads    = []
+        self.vertices = []
+        self.used     = 0
+        self.dirty    = False
+        self.resized  = False
+        self.mesh     = None
+
+
+# #mark -
+class GSpriteBatch(object):
+    """
+    A class representing sprites drawn as one Mesh for each texture and color.
+
+    A batch is filled again at every animation frame: call :meth:`begin`, then
+    :meth:`add` for each sprite, then :meth:`draw`.  The batch compares each sprite
+    with the one added in the same place the frame before, and only computes the
+    vertices of the sprites that changed.  A mesh where nothing changed is not sent to
+    the graphics card again.  (Kivy replaces the whole vertex buffer of a mesh when it
+    changes, so a mesh with a single change is still sent in full.)
+
+    The sprites are grouped by texture and color, and the groups are drawn in the order
+    they were first used.  Within a group, each sprite is drawn over the sprites added
+    before it.  With the null backend, the batch only keeps track of the sprites.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of sprites added since the last call to :meth:`begin`.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return sum(group.used for group in self._order)
+
+    @property
+    def meshes(self):
+        """
+        The number of meshes (groups of sprites with the same texture and color).
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._order)
+
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new, empty batch.
+        """
+        self._groups = {}
+        self._order  = []
+        self._colors = {}
+        self._frames = {}
+        self._cache  = None if GameApp.is_null() else InstructionGroup()
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this batch.
+        :rtype:  ``str``
+        """
+        return '[sprites=%d,meshes=%d]' % (self.count,self.meshes)
+
+
+    # PUBLIC METHODS
+    def begin(self):
+        """
+        Starts the sprites of a new animation frame.
+        """
+        for group in self._order:
+            group.used = 0
+
+    def add(self,x,y,width,height,source=None,format=(1,1),frame=0,color=(1,1,1,1)):
+        """
+        Adds a sprite to draw in this animation frame.
+
+        The sprite is a frame of a filmstrip, with the same meaning as the attributes of
+        :class:`GSprite`.  Without a ``source``, the sprite is a solid rectangle.
+
+        :param x: The horizontal coordinate of the sprite center
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical coordinate of the sprite center
+        :type y:  ``int`` or ``float``
+
+        :param width: The width of the sprite
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: The height of the sprite
+        :type height:  ``int`` or ``float`` > 0
+
+        :param source: The image file of the filmstrip, or None for a solid rectangle
+        :type source:  ``str`` referring to a file in the Images folder, or ``None``
+
+        :param format: The grid size of the filmstrip, as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+
+        :param frame: The frame of the filmstrip
+        :type frame:  ``int`` 0..rows*columns-1
+
+        :param color: The color of a solid rectangle, or the tint of an image
+        :type color:  a color (see :class:`GObject`)
+        """
+        region = None
+        if source is not None and not self._cache is None:
+            key = (source,format)
+            if key in self._frames:
+                frames = self._frames[key]
+            else:
+                frames = GameApp.load_frames(source,format)
+                self._frames[key] = frames
+            if frames:
+                region = frames[frame]
+
+        rgba = self._colors.get(color) if type(color) in [str,tuple] else None
+        if rgba is None:
+            rgba = self._rgba(color)
+        key = (None if region is None else region.id,rgba)
+        group = self._groups.get(key)
+        if group is None:
+            group = _GBatchGroup(region,rgba)
+            self._groups[key] = group
+            self._order.append(group)
+
+        quad = (x,y,width,height,region)
+        k = group.used
+        group.used += 1
+        if k == len(group.quads):
+            group.quads.append(quad)
+            group.vertices.extend((0.0,)*16)
+            group.resized = True
+        elif group.quads[k] == quad:
+            return
+        group.quads[k] = quad
+        group.dirty = True
+        if self._cache is None:
+            return
+
+        left   = x-width/2.0
+        bottom = y-height/2.0
+        right  = left+width
+        top    = bottom+height
+        if region is None:
+            u0 = v0 = u1 = v1 = u2 = v2 = u3 = v3 = 0.0
+        else:
+            u0, v0, u1, v1, u2, v2, u3, v3 = region.tex_coords
+        group.vertices[16*k:16*k+16] = (left,bottom,u0,v0, right,bottom,u1,v1,
+                                        right,top,u2,v2, left,top,u3,v3)
+
+    def draw(self,view):
+        """
+        Draws the sprites added since the last call to :meth:`begin` to the view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        for group in self._order:
+            if group.used < len(group.quads):
+                del group.quads[group.used:]
+                del group.vertices[16*group.used:]
+                group.dirty = group.resized = True
+            if not group.dirty or self._cache is None:
+                group.dirty = group.resized = False
+                continue
+
+            if group.mesh is None:
+                group.mesh = Mesh(mode='triangles',texture=group.texture)
+                self._cache.add(Color(*group.rgba))
+                self._cache.add(group.mesh)
+            group.mesh.vertices = group.vertices
+            if group.resized:
+                indices = []
+                for k in range(0,4*len(group.quads),4):
+                    indices.extend((k,k+1,k+2,k+2,k+3,k))
+                group.mesh.indices = indices
+            group.dirty = group.resized = False
+        view.draw(self._cache)
+
+    def clear(self):
+        """
+        Removes every sprite and mesh from this batch.
+        """
+        self._groups = {}
+        self._order  = []
+        self._frames = {}
+        if not self._cache is None:
+            self._cache.clear()
+
+
+    # HIDDEN METHODS
+    def _rgba(self,color):
+        """
+        Returns a color as an RGBA tuple, and remembers it.
+
+        Parameter color: The color to convert
+        Precondition: color is a color (see :class:`GObject`)
+        """
+        import introcs
+        assert is_color(color), '%s is not a valid color' % repr(color)
+        value = color
+        if type(value) in [introcs.RGB, introcs.HSV]:
+            value = value.glColor()
+        elif type(value) == str:
+            if value[0] == '#':
+                value = introcs.RGB.CreateWebColor(value).glColor()
+            else:
+                value = introcs.RGB.CreateName(value).glColor()
+        rgba = tuple(float(c) for c in value)
+        if len(rgba) == 3:
+            rgba = rgba+(1.0,)
+        if type(color) in [str,tuple]:
+            self._colors[color] = rgba
+        return rgba
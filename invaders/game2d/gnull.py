@@ -0,0 +1,324 @@
+"""
+The null backend for 2D game support.
+
+Normally a :class:`GameApp` opens a Kivy window, draws with OpenGL, plays sounds on
+the audio device and is driven by the Kivy Clock.  None of that is available on a
+machine without a display or a sound card, and none of it is needed to test or
+benchmark a game.  This module provides stand-ins that do nothing, so that the whole
+game (``start``, ``update`` and ``draw``) can run without a window, as fast as the
+machine allows.
+
+You never create these classes yourself.  Select the null backend instead, either
+with the keyword ``backend='null'`` when creating the :class:`GameApp`, or by setting
+the environment variable ``GAME2D_BACKEND`` to ``null``.  The application then uses
+a :class:`NullView` and a :class:`NullInput` for its ``view`` and ``input``, sounds do
+not load their files, labels do not render their text, and no textures or drawing
+commands are created.
+"""
+from .gview import GInput
+
+
+class NullView(object):
+    """
+    A class representing a view that draws nothing.
+
+    This view has the same :meth:`draw` and :meth:`clear` methods as :class:`GView`.
+    It only counts the drawing commands it was given, which is useful for testing.
+    It is also its own layers, so shapes drawn to a layer are counted the same way.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def drawn(self):
+        """
+        The number of drawing commands since the view was last cleared.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._drawn
+
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new view that draws nothing.
+        """
+        self._drawn = 0
+
+
+    # PUBLIC METHODS
+    def draw(self,cmd):
+        """
+        Ignores the given Kivy graphics command.
+
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        self._drawn += 1
+
+    def clear(self):
+        """
+        Clears the contents of the view.
+        """
+        self._drawn = 0
+
+    def layer(self,name,static=False,depth=1):
+        """
+        Returns this view, which stands in for all of its layers.
+
+        :param name: The name of the layer
+        :type name:  ``str``
+
+        :param static: Whether the layer is drawn into a texture kept between frames
+        :type static:  ``bool``
+
+        :param depth: The position of the layer in the view
+        :type depth:  ``int``
+        """
+        return self
+
+    def invalidate(self):
+        """
+        Does nothing; there is no texture to draw again.
+        """
+        pass
+
+    def attach(self,cmd):
+        """
+        Ignores the given Kivy graphics command.
+
+        :param cmd: the command to attach
+        :type cmd:  A Kivy graphics command
+        """
+        pass
+
+    def detach(self,cmd):
+        """
+        Ignores the given Kivy graphics command.
+
+        :param cmd: the command to detach
+        :type cmd:  A Kivy graphics command
+        """
+        pass
+
+    def _commit(self):
+        """
+        Does nothing; there is no canvas.
+        """
+        pass
+
+
+# #mark -
+
+class NullInput(GInput):
+    """
+    A class representing an input handler with no keyboard or mouse.
+
+    No key is ever held down unless a program presses it with :meth:`press` or
+    :meth:`hold`.  This lets a test (or a recorded game) drive the input of a game.
+    """
+
+    # PUBLIC METHODS
+    def press(self,key):
+        """
+        Holds a key down, as if the user pressed it.
+
+        :param key: the key to press
+        :type key:  ``str``
+        """
+        assert type(key) == str, '%s is not a key name' % repr(key)
+        self._capture_key(None,(0,key),None,[])
+
+    def release(self,key):
+        """
+        Releases a key, as if the user let it go.
+
+        Releasing a key that is not held down does nothing.
+
+        :param key: the key to release
+        :type key:  ``str``
+        """
+        assert type(key) == str, '%s is not a key name' % repr(key)
+        if self.is_key_down(key):
+            self._release_key(None,(0,key))
+
+    def hold(self,keys):
+        """
+        Holds down exactly the given keys, releasing all others.
+
+        :param keys: the keys to hold down
+        :type keys:  iterable of ``str``
+        """
+        for key in self.keys:
+            if not key in keys:
+                self.release(key)
+        for key in keys:
+            if not self.is_key_down(key):
+                self.press(key)
+
+
+    # HIDDEN METHODS
+    def _register(self,view):
+        """
+        Registers the view with this input handler.
+
+        There is no window, so this does not listen for any events.
+
+        :param view: the view to register.
+        :type view:  ``NullView``
+        """
+        self._view = view
+
+
+# #mark -
+
+class NullAudio(object):
+    """
+    A class representing a sound that makes no noise.
+
+    This has the attributes and methods of a Kivy sound that :class:`Sound` uses, so
+    that a :class:`Sound` can wrap it in place of a sound loaded from a file.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new silent sound.
+        """
+        self.volume = 1
+        self.loop   = False
+        self.state  = 'stop'
+
+
+    # PUBLIC METHODS
+    def play(self):
+        """
+        Does nothing; the sound is never playing.
+        """
+        pass
+
+    def stop(self):
+        """
+        Does nothing; the sound is never playing.
+        """
+        pass
+
+
+# #mark -
+
+class NullLabel(object):
+    """
+    A class representing a text label that renders nothing.
+
+    This has the attributes and methods of a Kivy label that :class:`GLabel` uses, so
+    that a :class:`GLabel` can wrap it in place of a Kivy label.  A Kivy label cannot be
+    used, as creating one opens the window.  The text is never rendered, so the label
+    takes up no space.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def size(self):
+        """
+        The (width, height) of this label.
+        """
+        return (self.width,self.height)
+
+    @size.setter
+    def size(self,value):
+        self.width, self.height = value
+
+    @property
+    def center(self):
+        """
+        The (x, y) center of this label.
+        """
+        return (self.x+self.width/2.0,self.y+self.height/2.0)
+
+    @center.setter
+    def center(self,value):
+        self.x = value[0]-self.width/2.0
+        self.y = value[1]-self.height/2.0
+
+    @property
+    def right(self):
+        """
+        The right edge of this label.
+        """
+        return self.x+self.width
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width
+
+    @property
+    def top(self):
+        """
+        The top edge of this label.
+        """
+        return self.y+self.height
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of this label.
+        """
+        return self.y
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture_size(self):
+        """
+        The size of the rendered text, which is always empty.
+        """
+        return (0,0)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new label that renders nothing.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are Kivy label attributes
+        """
+        self.text = ''
+        self.font_size = 15
+        self.font_name = 'Roboto'
+        self.bold   = False
+        self.color  = [1,1,1,1]
+        self.halign = 'left'
+        self.valign = 'bottom'
+        self.size_hint = (1,1)
+        self.canvas = None
+        self.x = 0
+        self.y = 0
+        self.width  = 0
+        self.height = 0
+        for key in keywords:
+            setattr(self,key,keywords[key])
+
+
+    # PUBLIC METHODS
+    def bind(self,**keywords):
+        """
+        Does nothing; the label never changes on its own.
+        """
+        pass
+
+    def texture_update(self):
+        """
+        Does nothing; there is no text to render.
+        """
+        pass
@@ -88,7 +88,13 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+
+    An object can also be attached to a view with :meth:`attach`, instead of being
+    drawn every animation frame.  It then stays on screen, and shows every change to
+    it, until it is detached with :meth:`detach`.
     """
+    # The drawing cache, which keeps its identity when it is reset
+    _cache = None
 
     # MUTABLE PROPERTIES
     @property
@@ -598,12 +604,39 @@ class GObject(object):
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
+    def attach(self, view):
+        """
+        Attaches this shape to the provided view, so that it is drawn every frame.
+
+        The shape is drawn under the shapes given to :meth:`draw`, in the order shapes
+        were attached.  It does not need to be drawn again after a change.
+
+        :param view: view to attach to
+        :type view:  :class:`GView`
+        """
+        view.attach(self._cache)
+
+    def detach(self, view):
+        """
+        Detaches this shape from the provided view, removing it from the screen.
+
+        :param view: view to detach from
+        :type view:  :class:`GView`
+        """
+        view.detach(self._cache)
+
     # HIDDEN METHODS
     def _reset(self):
         """
         Resets the drawing cache.
+
+        The cache is emptied rather than replaced, so that a view or a scene holding
+        it shows the new drawing.
         """
-        self._cache = InstructionGroup()
+        if self._cache is None:
+            self._cache = InstructionGroup()
+        else:
+            self._cache.clear()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
@@ -11,6 +11,7 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .gobject import GObject
+from .app import GameApp
 
 
 def same_side(p1, p2, a, b):
@@ -255,6 +256,8 @@ class GPath(GObject):
         Resets the drawing cache
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         if not self._linecolor is None:
             self._cache.add(self._linecolor)
             line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
@@ -354,6 +357,8 @@ class GTriangle(GPath):
         Resets the drawing cache
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         
         vertices = ()
         for x in range(3):
@@ -576,6 +581,8 @@ class GPolygon(GPath):
         Resets the drawing cache
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         self._make_mesh()
         
         self._cache.add(self._fillcolor)
@@ -81,6 +81,8 @@ class GRectangle(GObject):
         Resets the drawing cache
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
@@ -167,6 +169,8 @@ class GEllipse(GRectangle):
         Resets the drawing cache.
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
@@ -254,6 +258,8 @@ class GImage(GRectangle):
         Resets the drawing cache.
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
@@ -312,7 +318,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
         self._label.font_size = value
-        self._label.texture_update()
+        self._update()
     
     @property
     def font_name(self):
@@ -327,7 +333,7 @@ class GLabel(GRectangle):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
         self._label.font_name = value
-        self._label.texture_update()
+        self._update()
     
     @property
     def bold(self):
@@ -345,7 +351,7 @@ class GLabel(GRectangle):
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
         self._label.bold = value
-        self._label.texture_update()
+        self._update()
 
     @property
     def text(self):
@@ -363,7 +369,7 @@ class GLabel(GRectangle):
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
         self._label.text = value
-        self._label.texture_update()
+        self._update()
     
     @property
     def halign(self):
@@ -600,7 +606,11 @@ class GLabel(GRectangle):
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        if GameApp.is_null():
+            from .gnull import NullLabel
+            self._label = NullLabel(**sanitized)
+        else:
+            self._label = Label(**sanitized)
         self._label.size_hint = (None,None)
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
@@ -627,6 +637,13 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
+    def _update(self):
+        """
+        Renders the text again after a change, unless there is nothing to render to
+        """
+        if not GameApp.is_null():
+            self._label.texture_update()
+    
     def _callback(self,instance=None,value=None):
         """
         A workaround to deal with parameter requirements for callbacks
@@ -675,6 +692,8 @@ class GLabel(GRectangle):
             self._label.bottom = -self.height/2.0
         
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
@@ -0,0 +1,196 @@
+"""
+Input recording for 2D game support.
+
+A game that only depends on its input (and on seeded random numbers) plays the same
+way every time it is given the same input.  This module provides a log of that input:
+the keys held down and the time passed at every animation frame.  A :class:`GameApp`
+adds a frame to its log before every update, and can play a log back without a window.
+
+Most frames have the same keys and the same time as the frame before, so the log is
+stored as runs of identical frames.  A game of several minutes takes up a few
+kilobytes.
+"""
+import json
+import struct
+
+
+class GInputLog(object):
+    """
+    A class representing the recorded input of a game.
+
+    The log is a sequence of frames.  Each frame is a pair ``(keys, dt)`` of the keys
+    held down during the frame, as a sorted tuple of key names, and the time in seconds
+    since the last frame.  Iterating over the log produces its frames in order.
+
+    The log also has a dictionary :attr:`info`, where the game may store whatever it
+    needs to play the log back, such as its random seed.  It must be convertible to
+    JSON.
+    """
+    # The first bytes of a log file
+    MAGIC = b'G2DI'
+    # The version of the log file format
+    VERSION = 1
+
+    # struct formats of the parts of a log file
+    _HEADER = struct.Struct('<4sHI')
+    _RUN = struct.Struct('<IHd')
+
+    # MUTABLE PROPERTIES
+    @property
+    def info(self):
+        """
+        The information the game needs to play back this log.
+
+        **Invariant**: Must be a ``dict`` that can be converted to JSON.
+        """
+        return self._info
+
+    @info.setter
+    def info(self,value):
+        assert type(value) == dict, '%s is not a dictionary' % repr(value)
+        self._info = value
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def runs(self):
+        """
+        The number of runs of identical frames in this log.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._runs)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,info=None):
+        """
+        Creates a new, empty log.
+
+        :param info: The information the game needs to play back this log
+        :type info:  ``dict`` or ``None``
+        """
+        self.info = {} if info is None else info
+        self._keysets = []
+        self._index = {}
+        self._runs = []
+        self._frames = 0
+
+    def __len__(self):
+        """
+        :return: The number of frames in this log.
+        :rtype:  ``int`` >= 0
+        """
+        return self._frames
+
+    def __iter__(self):
+        """
+        :return: An iterator over the frames ``(keys, dt)`` of this log.
+        """
+        for count, keys, dt in self._runs:
+            keys = self._keysets[keys]
+            for frame in range(count):
+                yield (keys, dt)
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this log.
+        :rtype:  ``str``
+        """
+        return '[frames=%d,runs=%d,info=%s]' % (self._frames,len(self._runs),
+                                                repr(self._info))
+
+
+    # PUBLIC METHODS
+    def record(self,keys,dt):
+        """
+        Adds a frame to the end of this log.
+
+        :param keys: The keys held down during the frame
+        :type keys:  iterable of ``str``
+
+        :param dt: The time in seconds since the last frame
+        :type dt:  ``int`` or ``float``
+        """
+        keys = tuple(sorted(keys))
+        k = self._index.get(keys)
+        if k is None:
+            assert all(type(key) == str for key in keys), '%s are not keys' % repr(keys)
+            k = len(self._keysets)
+            self._keysets.append(keys)
+            self._index[keys] = k
+        runs = self._runs
+        if runs and runs[-1][1] == k and runs[-1][2] == dt:
+            runs[-1][0] += 1
+        else:
+            runs.append([1,k,float(dt)])
+        self._frames += 1
+
+    def tobytes(self):
+        """
+        :return: This log as a compact binary string.
+        :rtype:  ``bytes``
+        """
+        info = json.dumps(self._info).encode('utf-8')
+        keysets = json.dumps(self._keysets).encode('utf-8')
+        parts = [self._HEADER.pack(self.MAGIC,self.VERSION,len(info)),info,
+                 struct.pack('<I',len(keysets)),keysets,
+                 struct.pack('<I',len(self._runs))]
+        parts.extend(self._RUN.pack(*run) for run in self._runs)
+        return b''.join(parts)
+
+    @classmethod
+    def frombytes(cls,data):
+        """
+        Creates a log from a binary string made by :meth:`tobytes`.
+
+        :param data: The binary string
+        :type data:  ``bytes``
+
+        :return: The log
+        :rtype:  :class:`GInputLog`
+        """
+        magic, version, size = cls._HEADER.unpack_from(data)
+        assert magic == cls.MAGIC, 'data is not an input log'
+        assert version == cls.VERSION, 'input log version %d is not %d' % (version,cls.VERSION)
+        at = cls._HEADER.size
+        log = cls(json.loads(data[at:at+size].decode('utf-8')))
+        at += size
+        size = struct.unpack_from('<I',data,at)[0]
+        at += 4
+        for keys in json.loads(data[at:at+size].decode('utf-8')):
+            log._index[tuple(keys)] = len(log._keysets)
+            log._keysets.append(tuple(keys))
+        at += size
+        count = struct.unpack_from('<I',data,at)[0]
+        at += 4
+        for run in cls._RUN.iter_unpack(data[at:at+count*cls._RUN.size]):
+            log._runs.append(list(run))
+            log._frames += run[0]
+        return log
+
+    def save(self,filename):
+        """
+        Writes this log to a file.
+
+        :param filename: The name of the file
+        :type filename:  ``str``
+        """
+        with open(filename,'wb') as file:
+            file.write(self.tobytes())
+
+    @classmethod
+    def load(cls,filename):
+        """
+        Reads a log from a file written by :meth:`save`.
+
+        :param filename: The name of the file
+        :type filename:  ``str``
+
+        :return: The log
+        :rtype:  :class:`GInputLog`
+        """
+        with open(filename,'rb') as file:
+            return cls.frombytes(file.read())
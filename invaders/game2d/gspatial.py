@@ -0,0 +1,203 @@
+"""
+Broadphase collision support for 2D games.
+
+This module provides a uniform-grid spatial hash.  Objects are bucketed by the grid
+cells that their bounding box touches, so that the question "what overlaps this box?"
+only has to look at the handful of objects near the box, rather than every object in
+the game.  The hash only answers which objects *might* collide; you should still call
+the precise collision method on each object it returns.
+"""
+import math
+
+
+class GSpatialHash(object):
+    """
+    A class representing a uniform-grid spatial hash.
+
+    The hash divides the plane into square cells of size ``cellsize``.  Any object
+    with the attributes ``left``, ``right``, ``bottom`` and ``top`` (such as a
+    :class:`GObject`) may be inserted into the hash.  Each object is stored in every
+    cell that its bounding box overlaps.
+
+    Objects inserted into the hash remember it, in the attribute ``_spatial``.  An
+    object that moves must call :meth:`update` after it moves, so that only the cells
+    that the object enters or leaves are touched.  An object that moves often can do
+    this in its own setters, whenever ``_spatial`` is not None.
+
+    An object may belong to at most one hash at a time.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width (and height) of a single grid cell.
+
+        For best performance this should be a little larger than the typical object
+        in the hash.
+
+        **Immutable**: This value cannot be altered after creation.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._cellsize
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize=64):
+        """
+        Creates a new, empty spatial hash.
+
+        :param cellsize: The size of a grid cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], '%s is not a number' % repr(cellsize)
+        assert cellsize > 0, '%s is not positive' % repr(cellsize)
+        self._cellsize = float(cellsize)
+        self._cells  = {}
+        self._ranges = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects in this hash.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._ranges)
+
+    def __contains__(self,obj):
+        """
+        :return: True if obj is stored in this hash.
+        :rtype:  ``bool``
+        """
+        return obj in self._ranges
+
+
+    # PUBLIC METHODS
+    def insert(self,obj):
+        """
+        Adds an object to this hash.
+
+        :param obj: The object to add
+        :type obj:  any object with a bounding box, not already in a hash
+        """
+        assert not obj in self._ranges, '%s is already in this hash' % repr(obj)
+        assert getattr(obj,'_spatial',None) is None, '%s is already in a hash' % repr(obj)
+        span = self._span(obj.left,obj.bottom,obj.right,obj.top)
+        self._ranges[obj] = span
+        self._add(obj,span)
+        obj._spatial = self
+
+    def remove(self,obj):
+        """
+        Removes an object from this hash.
+
+        Removing an object that is not in the hash does nothing.
+
+        :param obj: The object to remove
+        :type obj:  any object with a bounding box
+        """
+        if not obj in self._ranges:
+            return
+        span = self._ranges.pop(obj)
+        self._discard(obj,span)
+        obj._spatial = None
+
+    def update(self,obj):
+        """
+        Rehashes an object after its bounding box has changed.
+
+        This only moves the object between buckets if it has entered or left a cell.
+
+        :param obj: The object that moved
+        :type obj:  any object with a bounding box in this hash
+        """
+        old = self._ranges[obj]
+        new = self._span(obj.left,obj.bottom,obj.right,obj.top)
+        if new != old:
+            self._discard(obj,old)
+            self._add(obj,new)
+            self._ranges[obj] = new
+
+    def clear(self):
+        """
+        Removes all objects from this hash.
+        """
+        for obj in self._ranges:
+            obj._spatial = None
+        self._cells.clear()
+        self._ranges.clear()
+
+    def query(self,left,bottom,right,top):
+        """
+        Returns the objects whose bounding boxes may overlap the given box.
+
+        The objects are returned in the order that they were inserted into each cell,
+        so the result is deterministic.  Each object appears at most once.
+
+        :param left: The left edge of the box
+        :type left:  ``int`` or ``float``
+
+        :param bottom: The bottom edge of the box
+        :type bottom:  ``int`` or ``float``
+
+        :param right: The right edge of the box
+        :type right:  ``int`` or ``float`` >= left
+
+        :param top: The top edge of the box
+        :type top:  ``int`` or ``float`` >= bottom
+
+        :return: The objects near the box
+        :rtype:  ``list``
+        """
+        x0, y0, x1, y1 = self._span(left,bottom,right,top)
+        cells = self._cells
+        if x0 == x1 and y0 == y1:
+            bucket = cells.get((x0,y0))
+            return [] if bucket is None else list(bucket)
+
+        result = []
+        seen = set()
+        for cx in range(x0,x1+1):
+            for cy in range(y0,y1+1):
+                bucket = cells.get((cx,cy))
+                if bucket:
+                    for obj in bucket:
+                        if not id(obj) in seen:
+                            seen.add(id(obj))
+                            result.append(obj)
+        return result
+
+
+    # HIDDEN METHODS
+    def _span(self,left,bottom,right,top):
+        """
+        Returns the range of cells (x0,y0,x1,y1) covered by the given box.
+        """
+        size = self._cellsize
+        return (int(math.floor(left/size)),   int(math.floor(bottom/size)),
+                int(math.floor(right/size)),  int(math.floor(top/size)))
+
+    def _add(self,obj,span):
+        """
+        Adds obj to every cell in span.
+        """
+        cells = self._cells
+        for cx in range(span[0],span[2]+1):
+            for cy in range(span[1],span[3]+1):
+                bucket = cells.get((cx,cy))
+                if bucket is None:
+                    cells[(cx,cy)] = [obj]
+                else:
+                    bucket.append(obj)
+
+    def _discard(self,obj,span):
+        """
+        Removes obj from every cell in span, deleting any cells left empty.
+        """
+        cells = self._cells
+        for cx in range(span[0],span[2]+1):
+            for cy in range(span[1],span[3]+1):
+                bucket = cells[(cx,cy)]
+                bucket.remove(obj)
+                if not bucket:
+                    del cells[(cx,cy)]
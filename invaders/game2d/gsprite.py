@@ -14,6 +14,86 @@ from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
 from .app import GameApp
 
+# #mark -
+class GFrames(object):
+    """
+    A class representing the frames of a filmstrip.
+    
+    This is an immutable sequence of texture regions, one for each frame of the image,
+    numbered left-to-right, top-to-bottom as in :class:`GSprite`.  A frame is only cut 
+    from the texture the first time it is used, and is then kept.
+    
+    Every sprite with the same image and format can share the same frames, so you should
+    not create this object yourself.  Use :meth:`GameApp.load_frames` instead.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture of the whole filmstrip.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a Kivy ``Texture``.
+        """
+        return self._texture
+    
+    @property
+    def format(self):
+        """
+        The grid size of the filmstrip, as (rows, columns).
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a 2-element tuple of ints > 0.
+        """
+        return self._format
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,texture,format):
+        """
+        Creates the frames of a filmstrip, without cutting any of them.
+        
+        :param texture: The texture of the whole filmstrip
+        :type texture:  Kivy ``Texture``
+        
+        :param format: The grid size of the filmstrip, as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+        """
+        self._texture = texture
+        self._format  = format
+        self._width   = texture.width/format[1]
+        self._height  = texture.height/format[0]
+        self._regions = [None]*(format[0]*format[1])
+    
+    def __len__(self):
+        """
+        :return: The number of frames in the filmstrip.
+        :rtype:  ``int`` > 0
+        """
+        return len(self._regions)
+    
+    def __getitem__(self,frame):
+        """
+        :return: The texture region of a frame, cut from the texture if needed.
+        :rtype:  Kivy ``TextureRegion``
+        
+        :param frame: The frame number
+        :type frame:  ``int`` 0..len(self)-1
+        """
+        region = self._regions[frame]
+        if region is None:
+            row, col = divmod(frame,self._format[1])
+            height = int(self._height)
+            region = self._texture.get_region(int(col*self._width),
+                                              self._texture.height-int(row*self._height)-height,
+                                              int(self._width),height)
+            self._regions[frame] = region
+        return region
+
+
 # #mark -
 class GSprite(GRectangle):
     """
@@ -75,7 +155,7 @@ class GSprite(GRectangle):
         assert type(value) == int, '%s is not an int' % repr(value)
         assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
-        if self._bounds:
+        if self._bounds and self._images:
             self._texture = self._images[self._frame]
             self._bounds.texture = self._texture
     
@@ -103,7 +183,7 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = None
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -127,25 +207,18 @@ class GSprite(GRectangle):
         Resets the drawing cache.
         """
         GObject._reset(self)
+        if GameApp.is_null():
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+        self._images = GameApp.load_frames(self.source,self._format)
+        if self._images:
+            self._texture = self._images[self._frame]
         else:
             print('Failed to load',repr(self.source))
+            self._texture = None
         
-        self._texture = self._images[self._frame]
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
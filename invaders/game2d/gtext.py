@@ -0,0 +1,401 @@
+"""
+Glyph atlas text for 2D game support.
+
+A :class:`GLabel` is a full Kivy label, which renders its whole text through the font
+engine every time the text changes.  That is fine for a title, but costly for a score
+that changes many times a game.  This module renders a font once, at one point size,
+into a single texture (the glyph atlas).  A :class:`GText` then draws its text as one
+quad per character, cut from that atlas, so that changing the text only rewrites a few
+vertices.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .grectangle import GRectangle
+from .gobject import GObject
+from .app import GameApp
+
+
+class GFont(object):
+    """
+    A class representing a font rendered into a glyph atlas.
+
+    The atlas holds every printable ASCII character (:attr:`CHARSET`) of the font at one
+    point size, side by side.  It is rendered once, when the font is created; after that
+    text is laid out by looking up the glyphs in the atlas.  Characters that are not in
+    the atlas are drawn as spaces.
+
+    You should not need to create fonts yourself.  Use :meth:`GameApp.load_font`, which
+    keeps one font for each name and size.
+
+    With the null backend nothing is rendered.  Every glyph is then :attr:`NULL_ADVANCE`
+    times the point size wide, so that text still has a size.
+    """
+    # The characters in the atlas
+    CHARSET = ''.join(map(chr,range(32,127)))
+    # The width of a glyph with the null backend, as a fraction of the point size
+    NULL_ADVANCE = 0.6
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def name(self):
+        """
+        The file name of the .ttf file of this font, or None for the default font.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts, or None.
+        """
+        return self._name
+
+    @property
+    def size(self):
+        """
+        The point size of this font.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a positive number (int or float).
+        """
+        return self._size
+
+    @property
+    def height(self):
+        """
+        The height of a line of text in this font.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._height
+
+    @property
+    def texture(self):
+        """
+        The glyph atlas of this font.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a Kivy ``Texture``, or None with the null backend.
+        """
+        return self._texture
+
+
+    # BUILT-IN METHODS
+    def __init__(self,name=None,size=15):
+        """
+        Renders a font into a new glyph atlas.
+
+        :param name: The file name of the .ttf file, or None for the default font
+        :type name:  ``str`` referring to a file in folder Fonts, or ``None``
+
+        :param size: The point size
+        :type size:  ``int`` or ``float`` > 0
+        """
+        assert name is None or GameApp.is_font(name), '%s is not a font name' % repr(name)
+        assert type(size) in [int,float] and size > 0, '%s is not a valid size' % repr(size)
+        self._name = name
+        self._size = size
+        self._glyphs = {}
+        if GameApp.is_null():
+            self._texture = None
+            self._height = float(size)
+            for ch in self.CHARSET:
+                self._glyphs[ch] = (size*self.NULL_ADVANCE,None)
+            return
+
+        from kivy.core.text import Label as CoreLabel
+        keywords = {'text': self.CHARSET, 'font_size': size}
+        if name is not None:
+            keywords['font_name'] = name
+        label = CoreLabel(**keywords)
+        label.refresh()
+        texture = label.texture
+        self._texture = texture
+        self._height = float(texture.height)
+
+        # Each glyph ends where the text up to and including it ends
+        left = 0
+        for pos in range(len(self.CHARSET)):
+            right = label.get_extents(self.CHARSET[:pos+1])[0]
+            coords = None
+            if right > left:
+                coords = tuple(texture.get_region(left,0,right-left,texture.height).tex_coords)
+            self._glyphs[self.CHARSET[pos]] = (float(right-left),coords)
+            left = right
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this font.
+        :rtype:  ``str``
+        """
+        return '[name=%s,size=%s]' % (repr(self._name),repr(self._size))
+
+
+    # PUBLIC METHODS
+    def measure(self,text):
+        """
+        Returns the width of a line of text in this font.
+
+        :param text: The text to measure
+        :type text:  ``str``
+
+        :return: The width of the text
+        :rtype:  ``float``
+        """
+        space = self._glyphs[' ']
+        return sum(self._glyphs.get(ch,space)[0] for ch in text)
+
+    def layout(self,text,x=0.0,y=0.0):
+        """
+        Returns the quads that draw a line of text in this font.
+
+        The quads are in the format of a Kivy ``Mesh`` in ``'triangles'`` mode, with
+        the atlas as its texture.  Each vertex is ``x, y, u, v``, and each quad has two
+        triangles.  Characters with nothing to draw, like spaces, have no quad.
+
+        :param text: The text to lay out
+        :type text:  ``str``
+
+        :param x: The left edge of the text
+        :type x:  ``int`` or ``float``
+
+        :param y: The bottom edge of the text
+        :type y:  ``int`` or ``float``
+
+        :return: The vertices and indices of the quads
+        :rtype:  ``tuple`` of two ``list``
+        """
+        space = self._glyphs[' ']
+        top = y+self._height
+        vertices = []
+        indices  = []
+        quad = 0
+        for ch in text:
+            width, coords = self._glyphs.get(ch,space)
+            if coords is not None:
+                u0, v0, u1, v1, u2, v2, u3, v3 = coords
+                vertices.extend((x,y,u0,v0, x+width,y,u1,v1, x+width,top,u2,v2, x,top,u3,v3))
+                indices.extend((quad,quad+1,quad+2, quad+2,quad+3,quad))
+                quad += 4
+            x += width
+        return (vertices,indices)
+
+
+# #mark -
+class GText(GRectangle):
+    """
+    A class representing a line of (uneditable) text drawn from a glyph atlas.
+
+    This object is like a :class:`GLabel` with a single line of text, except that the
+    font is rendered only once (see :class:`GFont`).  Changing the text only lays out
+    the glyphs again, which makes this class the right choice for text that changes
+    often, such as a score.  The price is that only printable ASCII characters can be
+    shown.
+
+    The size of this rectangle is the size of the text, and changes with it.  The text
+    keeps the edge that was last positioned: if you set ``left``, the text grows to the
+    right, if you set ``right`` it grows to the left, and otherwise it stays centered.
+    As with a :class:`GLabel`, ``linecolor`` is the color of the text and ``fillcolor``
+    the color of the background.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text of this object.
+
+        **Invariant**: Must be a string with no newlines.
+        """
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str and not '\n' in value, 'value %s is not a line of text' % repr(value)
+        if value != self._text:
+            self._text = value
+            if self._defined:
+                self._layout()
+
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file to use as a font, or None for the default font.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts, or None.
+        """
+        return self._font.name
+
+    @font_name.setter
+    def font_name(self,value):
+        assert value is None or GameApp.is_font(value), 'value %s is not a font name' % repr(value)
+        self._font = GameApp.load_font(value,self._font.size)
+        if self._defined:
+            self._reset()
+            self._layout()
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Invariant**: Must be a positive number (int or float).
+        """
+        return self._font.size
+
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float] and value > 0, 'value %s is not a valid size' % repr(value)
+        self._font = GameApp.load_font(self._font.name,value)
+        if self._defined:
+            self._reset()
+            self._layout()
+
+
+    # REDEFINED PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the object center.
+
+        **Invariant**: Must be an int or float.
+        """
+        return self._trans.x
+
+    @x.setter
+    def x(self,value):
+        GObject.x.fset(self,value)
+        self._hanchor = 'center'
+
+    @property
+    def left(self):
+        """
+        The left edge of this text.
+
+        **Invariant**: Must be an int or float.
+        """
+        return self.x-self.width/2.0
+
+    @left.setter
+    def left(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        GObject.x.fset(self,value+self.width/2.0)
+        self._hanchor = 'left'
+
+    @property
+    def right(self):
+        """
+        The right edge of this text.
+
+        **Invariant**: Must be an int or float.
+        """
+        return self.x+self.width/2.0
+
+    @right.setter
+    def right(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        GObject.x.fset(self,value-self.width/2.0)
+        self._hanchor = 'right'
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new line of text.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show a
+        score in the font ``Arcade.ttf``, use the constructor call::
+
+            GText(text='0',font_name='Arcade.ttf',font_size=48,left=10,bottom=10)
+
+        This class supports the all same keywords as :class:`GRectangle`, except for
+        ``width`` and ``height``, which follow from the text.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._hanchor = 'center'
+        self._text = ''
+        self._mesh = None
+        font_name = keywords['font_name'] if 'font_name' in keywords else None
+        font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        assert font_name is None or GameApp.is_font(font_name), 'value %s is not a font name' % repr(font_name)
+        assert type(font_size) in [int,float] and font_size > 0, 'value %s is not a valid size' % repr(font_size)
+        self._font = GameApp.load_font(font_name,font_size)
+        self.text = keywords['text'] if 'text' in keywords else ''
+
+        sanitized = dict(keywords)
+        sanitized['width']  = max(self._font.measure(self._text),1.0)
+        sanitized['height'] = self._font.height
+        if sanitized.get('linecolor') is None:
+            sanitized['linecolor'] = (0,0,0,1)
+        GRectangle.__init__(self,**sanitized)
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+
+    # HIDDEN METHODS
+    def _layout(self):
+        """
+        Resizes this object to fit the text and moves the glyphs, keeping the anchor.
+        """
+        width = max(self._font.measure(self._text),1.0)
+        if width != self.width:
+            edge = self.left if self._hanchor == 'left' else self.right
+            # Do not rebuild the drawing cache for the new size
+            self._defined = False
+            self.width = width
+            if self._hanchor == 'left':
+                GObject.x.fset(self,edge+width/2.0)
+            elif self._hanchor == 'right':
+                GObject.x.fset(self,edge-width/2.0)
+            self._defined = True
+            if not self._fillcolor is None or self.linewidth > 0:
+                self._reset()
+                return
+        if not self._mesh is None:
+            vertices, indices = self._font.layout(self._text,-self.width/2.0,-self.height/2.0)
+            self._mesh.vertices = vertices
+            self._mesh.indices  = indices
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._mesh = None
+        if GameApp.is_null():
+            return
+        x = -self.width/2.0
+        y = -self.height/2.0
+
+        if not self._fillcolor is None:
+            fill = Rectangle(pos=(x,y), size=(self.width,self.height))
+            self._cache.add(self._fillcolor)
+            self._cache.add(fill)
+
+        vertices, indices = self._font.layout(self._text,x,y)
+        self._mesh = Mesh(vertices=vertices,indices=indices,mode='triangles',
+                          texture=self._font.texture)
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+
+        if not self._linecolor is None and self.linewidth > 0:
+            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                        close=True,width=self.linewidth)
+            self._cache.add(line)
+
+        self._cache.add(PopMatrix())
@@ -0,0 +1,187 @@
+"""
+Phase timing for 2D game support.
+
+An animation frame usually does several things in turn: move the player, move the
+enemies, test for collisions, and so on.  When a frame takes too long, the question
+is which of these is to blame.  This module provides a timer that measures each phase
+of a frame, and keeps the most recent measurements of each phase so that it can
+report their percentiles.
+"""
+import json
+import time
+
+import numpy as np
+
+
+class GPhaseTimer(object):
+    """
+    A class representing a stopwatch for the phases of an animation frame.
+
+    Call :meth:`start` at the start of a frame, :meth:`lap` at the end of each phase
+    (with the name of the phase), and :meth:`stop` at the end of the frame.  Each lap
+    is the time since the last lap (or the start), measured with ``time.perf_counter``.
+    The time of the whole frame is recorded as the phase :attr:`TOTAL`.
+
+    The timer keeps the last :attr:`window` measurements of each phase, so that the
+    statistics follow the recent frames.  Older measurements are only counted.
+
+    A timer does cost a little time.  To measure nothing, do not call it at all; code
+    that is timed should test whether it has a timer instead of using one that is off.
+    """
+    # The name of the phase for the time of whole frames
+    TOTAL = 'total'
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def window(self):
+        """
+        The number of recent measurements kept for each phase.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._window
+
+    @property
+    def phases(self):
+        """
+        The names of the phases measured, in the order they were first seen.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a tuple of ``str``.
+        """
+        return tuple(self._samples)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,window=4096):
+        """
+        Creates a new timer with no measurements.
+
+        :param window: The number of recent measurements to keep for each phase
+        :type window:  ``int`` > 0
+        """
+        assert type(window) == int and window > 0, '%s is not a valid window' % repr(window)
+        self._window = window
+        self._samples = {}
+        self._counts = {}
+        self._start = None
+        self._last = None
+
+    def __str__(self):
+        """
+        :return: The statistics of every phase as a table, in microseconds.
+        :rtype:  ``str``
+        """
+        lines = ['%-20s %8s %9s %9s %9s %9s' % ('phase','count','mean','p50','p95','p99')]
+        for name, stats in self.stats().items():
+            lines.append('%-20s %8d %9.1f %9.1f %9.1f %9.1f' %
+                         (name,stats['count'],stats['mean']*1e6,stats['p50']*1e6,
+                          stats['p95']*1e6,stats['p99']*1e6))
+        return '\n'.join(lines)
+
+
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts timing a frame.
+        """
+        self._start = self._last = time.perf_counter()
+
+    def lap(self,name):
+        """
+        Records the time since the last lap (or the start) as a phase.
+
+        :param name: The name of the phase that just ended
+        :type name:  ``str``
+        """
+        now = time.perf_counter()
+        self.record(name,now-self._last)
+        self._last = now
+
+    def stop(self):
+        """
+        Stops timing a frame, and records its time as the phase :attr:`TOTAL`.
+        """
+        now = time.perf_counter()
+        self.record(self.TOTAL,now-self._start)
+        self._start = self._last = None
+
+    def record(self,name,seconds):
+        """
+        Records a measurement of a phase.
+
+        :param name: The name of the phase
+        :type name:  ``str``
+
+        :param seconds: The time the phase took
+        :type seconds:  ``int`` or ``float``
+        """
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = np.zeros(self._window)
+            self._samples[name] = samples
+            self._counts[name] = 0
+        count = self._counts[name]
+        samples[count % self._window] = seconds
+        self._counts[name] = count+1
+
+    def percentiles(self,name,q=(50,95,99)):
+        """
+        Returns percentiles of the recent measurements of a phase.
+
+        :param name: The name of the phase
+        :type name:  ``str``, one of :attr:`phases`
+
+        :param q: The percentiles to compute
+        :type q:  sequence of numbers in 0..100
+
+        :return: The percentiles, in seconds
+        :rtype:  ``tuple`` of ``float``
+        """
+        assert name in self._samples, '%s is not a phase' % repr(name)
+        count = min(self._counts[name],self._window)
+        return tuple(float(p) for p in np.percentile(self._samples[name][:count],q))
+
+    def stats(self):
+        """
+        Returns the statistics of every phase.
+
+        Each phase has the number of times it was measured (``count``), and the mean
+        and the 50th, 95th and 99th percentiles of its recent measurements in seconds
+        (``mean``, ``p50``, ``p95`` and ``p99``).
+
+        :return: The statistics of each phase, in the order of :attr:`phases`
+        :rtype:  ``dict`` of ``str`` to ``dict``
+        """
+        result = {}
+        for name in self._samples:
+            count = min(self._counts[name],self._window)
+            p50, p95, p99 = self.percentiles(name)
+            result[name] = {'count': self._counts[name],
+                            'mean': float(self._samples[name][:count].mean()),
+                            'p50': p50, 'p95': p95, 'p99': p99}
+        return result
+
+    def dump(self,file,**info):
+        """
+        Appends the statistics of every phase to a file, as one line of JSON.
+
+        :param file: The file to write to
+        :type file:  a text file open for writing
+
+        :param info: Other values to write in the line, such as a level number
+        :type info:  values that can be converted to JSON
+        """
+        info['phases'] = self.stats()
+        file.write(json.dumps(info)+'\n')
+
+    def reset(self):
+        """
+        Forgets every measurement.
+        """
+        self._samples = {}
+        self._counts = {}
+        self._start = self._last = None
@@ -8,6 +8,8 @@ read the documentation on how to use the provided objects.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+import os
+
 # Basic Kivy Modules
 from kivy.graphics import *
 from kivy.graphics.instructions import *
@@ -280,8 +282,12 @@ class GInput(object):
         :param keycode: the key released as a pair of int (keycode) and a name
         :type keycode:  (``int``, ``str``)
         """
-        self._keystate[keycode[1]] = False
-        self._keycount -= 1
+        k = keycode[1]
+        # Ignore keys that were pressed before the keyboard was ours, so that
+        # key_count is always the number of keys down (as when it is replayed)
+        if k in self._keystate and self._keystate[k]:
+            self._keystate[k] = False
+            self._keycount -= 1
         return True
 
     def _capture_touch(self,view,touch):
@@ -310,6 +316,183 @@ class GInput(object):
         self._touch = None
 
 
+# #mark -
+class GLayer(object):
+    """
+    A class representing a layer of a :class:`GView`.
+
+    A layer has the same :meth:`draw` and :meth:`clear` methods as the view, so any
+    :class:`GObject` can be drawn to it instead of to the view.  The layers of a view
+    are drawn in the order of their :attr:`depth`; the shapes drawn to the view itself
+    are at depth 0, under the other layers at that depth.
+
+    A static layer is for shapes that rarely change, like a score caption or a
+    backdrop.  It is drawn into a texture (a Kivy ``Fbo``), and the screen shows that
+    texture.  The texture is only drawn again when a shape in the layer changes, or
+    the shapes drawn to the layer are not the same as in the last frame.  Setting the
+    environment variable ``GAME2D_STATIC_LAYERS`` to ``0`` draws static layers straight
+    to the screen instead, like any other layer.
+
+    **You should never construct an object of this class**.  Use the method
+    :meth:`GView.layer` instead.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def name(self):
+        """
+        The name of this layer.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a ``str``, or None for the shapes drawn to the view.
+        """
+        return self._name
+
+    @property
+    def depth(self):
+        """
+        The position of this layer in the view; deeper layers are drawn first.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an ``int``.
+        """
+        return self._depth
+
+    @property
+    def static(self):
+        """
+        Whether this layer is drawn into a texture that is kept between frames.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._static
+
+
+    # BUILT-IN METHODS
+    def __init__(self,name,depth=0,static=False,size=(1,1)):
+        """
+        Creates a new, empty layer.
+
+        :param name: The name of the layer
+        :type name:  ``str`` or ``None``
+
+        :param depth: The position of the layer in the view
+        :type depth:  ``int``
+
+        :param static: Whether the layer is drawn into a texture
+        :type static:  ``bool``
+
+        :param size: The size of the view, in pixels
+        :type size:  2-element sequence of numbers > 0
+        """
+        self._name  = name
+        self._depth = depth
+        self._static = static
+        self._group = InstructionGroup()
+        self._contents = set()
+        self._drawn = []
+        self._shown = []
+        if static:
+            self._fbo = Fbo(size=(max(int(size[0]),1),max(int(size[1]),1)))
+            self._fbo.add(ClearColor(0,0,0,0))
+            self._fbo.add(ClearBuffers())
+            self._fbo.add(Scale(dp(1),dp(1),dp(1)))
+            self._fbo.add(self._group)
+            self._rect = Rectangle(pos=(0,0),size=(size[0]/dp(1),size[1]/dp(1)),
+                                   texture=self._fbo.texture)
+            # The Fbo must be on the canvas to draw into its texture
+            self._canvas = InstructionGroup()
+            self._canvas.add(self._fbo)
+            self._canvas.add(Color(1,1,1,1))
+            self._canvas.add(self._rect)
+        else:
+            self._fbo = None
+            self._canvas = self._group
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this layer.
+        :rtype:  ``str``
+        """
+        return '[name=%s,depth=%d,static=%s]' % (repr(self._name),self._depth,self._static)
+
+
+    # PUBLIC METHODS
+    def draw(self,cmd):
+        """
+        Draws the given Kivy graphics command to this layer.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
+
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        if not cmd in self._contents:
+            self._drawn.append(cmd)
+            self._contents.add(cmd)
+
+    def clear(self):
+        """
+        Clears the contents of this layer.
+
+        What is on screen only changes at the end of the frame, and only where the new
+        frame differs from the last.
+        """
+        self._drawn = []
+        self._contents.clear()
+
+    def invalidate(self):
+        """
+        Draws a static layer into its texture again at the next frame.
+
+        This is only needed after a change that Kivy does not notice, as any change
+        to a shape in the layer already draws the layer again.
+        """
+        if not self._fbo is None:
+            self._fbo.ask_update()
+
+
+    # HIDDEN METHODS
+    def _commit(self):
+        """
+        Puts the commands drawn in this frame in the layer, changing only what differs
+        from the last frame.
+
+        The commands shared with the start of the last frame stay where they are; the
+        ones after them are replaced.
+        """
+        drawn = self._drawn
+        shown = self._shown
+        size = min(len(drawn),len(shown))
+        same = 0
+        while same < size and drawn[same] is shown[same]:
+            same += 1
+        if same == len(drawn) and same == len(shown):
+            return
+        for cmd in shown[same:]:
+            self._group.remove(cmd)
+        for cmd in drawn[same:]:
+            self._group.add(cmd)
+        self._shown = list(drawn)
+
+    def _resize(self,size):
+        """
+        Resizes the texture of a static layer to the size of the view.
+
+        :param size: The size of the view, in pixels
+        :type size:  2-element sequence of numbers > 0
+        """
+        if not self._fbo is None:
+            self._fbo.size = (max(int(size[0]),1),max(int(size[1]),1))
+            self._rect.texture = self._fbo.texture
+            self._rect.size = (size[0]/dp(1),size[1]/dp(1))
+
+
 # #mark -
 class GView(FloatLayout):
     """
@@ -319,11 +502,23 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    The view is retained: clearing it does not tear down what is on screen.  At the end
+    of each frame, the shapes drawn in the frame are compared with those of the frame
+    before, and only the shapes that were added, removed or reordered are changed on
+    the canvas.  A frame that draws the same shapes as the last one costs nothing,
+    however much the shapes moved.  Shapes that are always on screen can instead be
+    attached once with :meth:`attach`, and removed with :meth:`detach`.
+
+    Shapes can also be drawn to the layers of the view (see :meth:`layer`), to control
+    what is drawn over what, and to keep the shapes that rarely change in a texture.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
+    # Class attribute for static layers: False to draw them like any other layer
+    STATIC_LAYERS = os.environ.get('GAME2D_STATIC_LAYERS','1') != '0'
 
     # BUILT-IN METHODS
     def __init__(self):
@@ -336,11 +531,14 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
-        self._frame = InstructionGroup()
+        self._frame = GLayer(None)
+        self._layers = [self._frame]
+        self._named = {}
+        self._retained = InstructionGroup()
+        self._attached = set()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
 
 
     # PUBLIC METHODS
@@ -354,21 +552,94 @@ class GView(FloatLayout):
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
-            self._contents.add(cmd)
+        self._frame.draw(cmd)
 
     def clear(self):
         """
-        Clears the contents of the view.
+        Clears the contents of the view, and of all of its layers.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  What is on 
+        screen only changes at the end of the frame, and only where the new frame 
+        differs from the last.
         """
-        self._frame.clear()
-        self._contents.clear()
+        for layer in self._layers:
+            layer.clear()
+
+    def layer(self,name,static=False,depth=1):
+        """
+        Returns the layer of this view with the given name, creating it if needed.
+
+        A layer can be given to the `draw` method of :class:`GObject` in place of the
+        view.  The layers are drawn in the order of their depth, and in the order they
+        were created for the same depth.  The shapes drawn to the view itself are at 
+        depth 0, under the layers created with that depth.  See :class:`GLayer` for 
+        static layers.  When :attr:`STATIC_LAYERS` is False, every layer is created
+        as if ``static`` were False.
+
+        The arguments ``static`` and ``depth`` only matter when the layer is created.
+
+        :param name: The name of the layer
+        :type name:  ``str``
+
+        :param static: Whether the layer is drawn into a texture kept between frames
+        :type static:  ``bool``
+
+        :param depth: The position of the layer in the view
+        :type depth:  ``int``
+
+        :return: The layer
+        :rtype:  :class:`GLayer`
+        """
+        layer = self._named.get(name)
+        if layer is None:
+            assert type(name) == str, '%s is not a valid layer name' % repr(name)
+            assert type(static) == bool, '%s is not a bool' % repr(static)
+            assert type(depth) == int, '%s is not an int' % repr(depth)
+            layer = GLayer(name,depth,static and self.STATIC_LAYERS,self.size)
+            self._named[name] = layer
+            self._layers.append(layer)
+            self._layers.sort(key=lambda layer: layer.depth)
+            self._reset()
+        return layer
+
+    def attach(self,cmd):
+        """
+        Attaches the given Kivy graphics command to this view, until it is detached.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `attach` method in :class:`GObject`.
+
+        :param cmd: the command to attach
+        :type cmd:  A Kivy graphics command
+        """
+        if not cmd in self._attached:
+            self._retained.add(cmd)
+            self._attached.add(cmd)
+
+    def detach(self,cmd):
+        """
+        Detaches the given Kivy graphics command from this view.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `detach` method in :class:`GObject`.
+
+        :param cmd: the command to detach
+        :type cmd:  A Kivy graphics command
+        """
+        if cmd in self._attached:
+            self._retained.remove(cmd)
+            self._attached.remove(cmd)
 
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Puts the commands drawn in this frame on the canvas, changing only what differs
+        from the last frame (see :class:`GLayer`).
+        """
+        for layer in self._layers:
+            layer._commit()
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -378,4 +649,7 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
-        self.canvas.add(self._frame)
+        self.canvas.add(self._retained)
+        for layer in self._layers:
+            layer._resize(self.size)
+            self.canvas.add(layer._canvas)
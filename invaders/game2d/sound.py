@@ -78,6 +78,10 @@ class Sound(object):
         from .app import GameApp
         assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
         self._source = source
+        if GameApp.is_null():
+            from .gnull import NullAudio
+            self._sound = NullAudio()
+            return
         self._sound  = SoundLoader.load(source)
         if self._sound is None:
             raise IOError('Module game2d cannot read the file %s' % repr(source))
@@ -9,8 +9,8 @@ Just because something is a model does not mean there has to be a special class
 for it. Unless you need something special for your extra gameplay features,
 Ship and Aliens could just be an instance of GImage that you move across the
 screen. You only need a new class when you add extra features to an object.
-So technically Bolt, which has a velocity, is really the only model that needs
-to have its own class.
+The laser bolts, which have a velocity, are the exception: they are kept
+together in BoltArray, which moves them all at once.
 
 With that said, we have included the subclasses for Ship and Aliens. That is
 because there are a lot of constants in consts.py for initializing the objects,
@@ -26,14 +26,157 @@ December 4th, 2018
 """
 from consts import *
 from game2d import *
+import numpy as np
+import math
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
 # than consts.py. If you need extra information from Gameplay, then it should be
 # a parameter in your method, and Wave should pass it as an argument when it
 # calls the method.
 
+class Body(object):
+    """
+    A class representing the geometry of a model on screen.
+
+    To play the game, Wave only needs the position, size and animation frame
+    of the ship, the aliens and the barriers. A Body keeps just those, as
+    plain Python attributes, so that a wave can be simulated without creating
+    any Kivy graphics, textures or window. A body is drawn by adding it to a
+    GSpriteBatch, so no GSprite is ever created for it.
+
+    The attributes have the same names and meaning as those of GSprite.
+
+    INSTANCE ATTRIBUTES:
+        _x: x of the center of the body [int or float]
+        _y: y of the center of the body [int or float]
+        _width: width of the body [int or float > 0]
+        _height: height of the body [int or float > 0]
+        _source: the image file of the filmstrip [str]
+        _format: the (rows, columns) of the filmstrip [pair of int > 0]
+        _frame: the animation frame [int, 0 <= frame < count]
+    """
+    def __init__(self,**keywords):
+        """
+        Initializer for class Body
+
+        Parameter keywords: dictionary of keyword arguments
+        Type keywords: keys are x, y, width, height, source, format and frame
+        """
+        self._x = keywords.pop('x', 0)
+        self._y = keywords.pop('y', 0)
+        self._width = keywords.pop('width', 0)
+        self._height = keywords.pop('height', 0)
+        self._source = keywords.pop('source', None)
+        self._format = keywords.pop('format', (1,1))
+        self._frame = keywords.pop('frame', 0)
+        assert len(keywords) == 0, '%s are not attributes' % repr(keywords)
+        assert type(self._x) in [int,float] and type(self._y) in [int,float]
+        assert type(self._width) in [int,float] and self._width > 0
+        assert type(self._height) in [int,float] and self._height > 0
+        assert type(self._source) == str
+        assert type(self._format) == tuple and len(self._format) == 2
+        assert 0 <= self._frame < self.count
+
+    @property
+    def x(self):
+        """
+        x of the center of the body
+        """
+        return self._x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float]
+        self._x = value
+
+    @property
+    def y(self):
+        """
+        y of the center of the body
+        """
+        return self._y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float]
+        self._y = value
+
+    @property
+    def width(self):
+        """
+        Width of the body
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        Height of the body
+        """
+        return self._height
+
+    @property
+    def left(self):
+        """
+        Left edge of the body
+        """
+        return self._x - self._width/2
+
+    @property
+    def right(self):
+        """
+        Right edge of the body
+        """
+        return self._x + self._width/2
+
+    @property
+    def bottom(self):
+        """
+        Bottom edge of the body
+        """
+        return self._y - self._height/2
+
+    @property
+    def top(self):
+        """
+        Top edge of the body
+        """
+        return self._y + self._height/2
+
+    @property
+    def count(self):
+        """
+        The number of frames in the filmstrip
+        """
+        return self._format[0] * self._format[1]
+
+    @property
+    def frame(self):
+        """
+        The animation frame of the body
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self,value):
+        assert type(value) == int, '%s is not an int' % repr(value)
+        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        self._frame = value
+
+    def addTo(self,batch):
+        """
+        Adds the body to a sprite batch
+
+        Parameter batch: the batch to draw the body with
+        Precondition batch: batch is a GSpriteBatch
+        Return: None
+        """
+        batch.add(self._x, self._y, self._width, self._height,
+                  self._source, self._format, self._frame)
+
+
 #<Extension: Animate the Aliens ...>
-class Ship(GSprite):
+class Ship(Body):
     """
     A class to represent the game ship.
 
@@ -79,7 +222,7 @@ class Ship(GSprite):
         Type **keywords:  keys are attribute names
         """
         #<Extension: Animate the Aliens>
-        GSprite.__init__(self,**keywords)
+        Body.__init__(self,**keywords)
         self._live = True
 
     @property
@@ -107,32 +250,9 @@ class Ship(GSprite):
         self._live = value
         self.frame = 0 if value else 1
 
-    # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
-    def collides(self,bolt):
-        """
-        Check if the ship and bolt collides
-
-        Parameter bolt: Bolt object
-        Precondition bolt: bolt is not None, type is Bolt
-        Return: 'True' if ship and bolt collide, 'False' if it did not collide
-        """
-        assert bolt != None and type(bolt) == Bolt
-
-        sx1 = self.x - self.width/2
-        sy1 = self.y - self.height/2
-        sx2 = self.x + self.width/2
-        sy2 = self.y + self.height/2
-
-        bx1 = bolt.x - bolt.width/2
-        by1 = bolt.y - bolt.height/2
-        bx2 = bolt.x + bolt.width/2
-        by2 = bolt.y + bolt.height/2
-
-        return (sx2 >= bx1 and sx1 <= bx2) and (sy2 >= by1 and sy1 <= by2)
-
 
 #<Extension : Animate the Aliens>
-class Alien(GSprite):
+class Alien(Body):
     """
     A class to represent a single alien.
 
@@ -153,6 +273,8 @@ class Alien(GSprite):
 
     INSTANCE ATTRIBUTES:
         _live: live of the aliens [bool]
+        _row: row of the alien in the wave, 0 is the bottom row [int >= 0]
+        _col: column of the alien in the wave, 0 is the left column [int >= 0]
     """
     # INITIALIZER TO CREATE AN ALIEN
     # BUILT-IN METHODS
@@ -171,9 +293,27 @@ class Alien(GSprite):
         Parameter keywords: dictionary of keyword arguments
         Type keywords: keys are attribute names
         """
-        GSprite.__init__(self,**keywords)
+        self._row = keywords.pop('row', 0)
+        self._col = keywords.pop('col', 0)
+        assert type(self._row) == int and self._row >= 0
+        assert type(self._col) == int and self._col >= 0
+        Body.__init__(self,**keywords)
         self._live = True
 
+    @property
+    def row(self):
+        """
+        Row of the alien in the wave, 0 is the bottom row
+        """
+        return self._row
+
+    @property
+    def col(self):
+        """
+        Column of the alien in the wave, 0 is the left column
+        """
+        return self._col
+
     @property
     def live(self):
         """
@@ -199,154 +339,896 @@ class Alien(GSprite):
         self._live = value
         self.frame = 0 if value else 2
 
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
-        """
-        Check if the alien and bolt collides
 
-        Parameter bolt: Bolt object
-        Precondition bolt: bolt is not None, type is Bolt
-        Return: 'True' if alien and bolt collide, 'False' if it did not collide
+#<=확장 : Defense Barriers ...>
+class DefenseBarriers(Body):
+    """
+    Barrier to protect the ship
+    DefenseBarriers weeken when they collide with either bolt or alien.
+    Strength is managed by DEFENSE_BARRIERS_FRAMES (using GSprite frame)
+    """
+    # INITIALIZER TO CREATE AN DefenseBarriers
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
         """
-        assert bolt != None and type(bolt) == Bolt
+        Initializer for class DefenseBarriers
 
-        sx1 = self.x - self.width/2
-        sy1 = self.y - self.height/2
-        sx2 = self.x + self.width/2
-        sy2 = self.y + self.height/2
+        You do not need to provide the keywords as a dictionary.
+        The ** in the parameter `keywords` does that automatically.
 
-        bx1 = bolt.x - bolt.width/2
-        by1 = bolt.y - bolt.height/2
-        bx2 = bolt.x + bolt.width/2
-        by2 = bolt.y + bolt.height/2
+        Any attribute of this class may be used as a keyword. The argument
+        must satisfy the invariants of that attribute. See the list of
+        attributes of this class for more information.
 
-        return (sx2 >= bx1 and sx1 <= bx2) and (sy2 >= by1 and sy1 <= by2)
+        Parameter keywords: dictionary of keyword arguments
+        Type keywords:  keys are attribute names
+        """
+        Body.__init__(self,**keywords)
 
 
-class Bolt(GRectangle):
+class Hud(object):
     """
-    A class representing a laser bolt.
+    A class representing the score and the number of lives on display
 
-    Laser bolts are often just thin, white rectangles.  The size of the bolt is
-    determined by constants in consts.py. We MUST subclass GRectangle, because
-    we need to add an extra attribute for the velocity of the bolt.
+    Setting the text of a GLabel renders the text again, which costs far more
+    than anything else in a frame. The hud remembers the numbers on display
+    and only sets their text when a number has changed, which is a few dozen
+    times a wave instead of every frame. The numbers are GText, drawn from a
+    glyph atlas, so even then nothing is rendered. The labels are only
+    created when the hud is first drawn.
 
-    The class Wave will need to look at these attributes, so you will need
-    getters for them.  However, it is possible to write this assignment with no
-    setters for the velocities.  That is because the velocity is fixed and
-    cannot change once the bolt is fired.
+    INSTANCE ATTRIBUTES:
+        _score: the score to display [int >= 0]
+        _lives: the number of lives to display [int >= 0]
+        _dirty: whether a number changed since the labels were last set [bool]
+        _text_score: GLabel for displaying the text "score"
+                     [GLabel, or None until the hud is drawn]
+        _text_score_num: GText for displaying score
+                         [GText, or None until the hud is drawn]
+        _text_lives: GLabel for displaying the text "lives"
+                     [GLabel, or None until the hud is drawn]
+        _text_lives_num: GText for displaying lives
+                         [GText, or None until the hud is drawn]
+    """
+
+    def __init__(self, score, lives):
+        """
+        Initializer for class Hud
+
+        Parameter score: the score to display
+        Precondition score: int >= 0
+
+        Parameter lives: the number of lives to display
+        Precondition lives: int >= 0
+        """
+        self._score = score
+        self._lives = lives
+        self._dirty = False
+        self._text_score = None
+        self._text_score_num = None
+        self._text_lives = None
+        self._text_lives_num = None
+
+    def update(self, score, lives):
+        """
+        Sets the numbers to display
 
-    In addition to the getters, you need to write the __init__ method to set
-    the starting velocity. This __init__ method will need to call the __init__
-    from GRectangle as a helper.
+        The labels change the next time the hud is drawn, and only if one of
+        the numbers is different.
 
-    You also MIGHT want to create a method to move the bolt. You move the bolt
-    by adding the velocity to the y-position.  However, the getter allows Wave
-    to do this on its own, so this method is not required.
+        Parameter score: the score to display
+        Precondition score: int >= 0
+
+        Parameter lives: the number of lives to display
+        Precondition lives: int >= 0
+        """
+        if score != self._score or lives != self._lives:
+            self._score = score
+            self._lives = lives
+            self._dirty = True
+
+    def draw(self, view):
+        """
+        Draws the labels to the view, after updating the numbers that changed
+
+        Parameter view: the view to draw to
+        Precondition view: view is a GView
+        """
+        if self._text_score == None:
+            self._initText()
+        elif self._dirty:
+            self._text_score_num.text = str(self._score)
+            self._text_lives_num.text = str(self._lives)
+        self._dirty = False
+
+        self._text_score.draw(view)
+        self._text_score_num.draw(view)
+        self._text_lives.draw(view)
+        self._text_lives_num.draw(view)
+
+    def _initText(self):
+        """
+        Helper function for initializing texts
+        """
+        self._text_score = GLabel(text=GAME_TEXT_SCORE,
+                    linecolor=GAME_TEXT_SCORE_COLOR,
+                    font_size=48, font_name='Arcade.ttf',
+                    left=ALIEN_H_SEP, bottom=GAME_HEIGHT-60)
+        self._text_score_num = GText(text=str(self._score),
+                    linecolor=GAME_TEXT_COLOR,
+                    font_size=48, font_name='Arcade.ttf',
+                    left=ALIEN_H_SEP + 140, bottom=GAME_HEIGHT-60)
+        self._text_lives = GLabel(text=GAME_TEXT_LIVES,
+                    linecolor=GAME_TEXT_LIVES_COLOR,
+                    font_size=48, font_name='Arcade.ttf',
+                    left=GAME_WIDTH - 170, bottom=GAME_HEIGHT-60)
+        self._text_lives_num = GText(text=str(self._lives),
+                    linecolor=GAME_TEXT_COLOR,
+                    font_size=48, font_name='Arcade.ttf',
+                    left=GAME_WIDTH - 40, bottom=GAME_HEIGHT-60)
+
+
+class Formation(object):
+    """
+    A class representing the aliens of a wave.
+
+    The aliens are arranged in a rigid lattice of ALIEN_ROWS rows and
+    ALIENS_IN_ROW columns. Row 0 is the bottom row and column 0 is the left
+    column. Every alien moves by the same amount, so the position of any alien
+    follows from the position of the bottom left alien (the origin) and the
+    lattice pitch. This lets Wave find the aliens under a bolt without
+    searching the whole formation.
+
+    As aliens are killed, the formation keeps track of the lowest living alien
+    of each column (the aliens that may fire) and of the number of living
+    aliens in each row. These give the edges of the formation without
+    scanning it.
 
     INSTANCE ATTRIBUTES:
-        _velocity: The velocity in y direction [int or float]
+        _aliens: the 2d list of aliens [rectangular 2d list of Alien or None]
+        _origin_x: x of the alien in the bottom row, left column [float]
+        _origin_y: y of the alien in the bottom row, left column [float]
+        _column_bottom: row of the lowest living alien in each column
+                        [list of int, -1 if the column has no living alien]
+        _fire_columns: the columns with a living alien, left to right
+                       [list of int]; its ends are the left and right
+                       edges of the formation
+        _row_count: the number of living aliens in each row [list of int]
+        _bottom_row: the lowest row with a living alien
+                     [int, ALIEN_ROWS if no alien is alive]
+        _dying: the cells of the killed aliens whose breaking animation is
+                not over, in the order they were killed [list of (row, col)]
     """
 
-    def __init__ (self,up,**keywords):
+    def __init__(self):
         """
-        Initializer for class Bolt
+        Initializer for class Formation
 
-        You do not need to provide the keywords as a dictionary.
-        The ** in the parameter `keywords` does that automatically.
+        Creates all the aliens, alive and in place below ALIEN_CEILING
 
-        Any attribute of this class may be used as a keyword. The argument
-        must satisfy the invariants of that attribute. See the list of
-        attributes of this class for more information.
+        Parameter: None
+        Precondition: None
+        """
+        sz = (ALIEN_HEIGHT + ALIEN_V_SEP) * (ALIEN_ROWS - 1)
+        sy = (GAME_HEIGHT - ALIEN_CEILING) - sz
+        self._origin_x = ALIEN_H_SEP + ALIEN_WIDTH/2
+        self._origin_y = sy + ALIEN_HEIGHT/2
+        self._column_bottom = [0] * ALIENS_IN_ROW
+        self._fire_columns = list(range(ALIENS_IN_ROW))
+        self._row_count = [ALIENS_IN_ROW] * ALIEN_ROWS
+        self._bottom_row = 0
+        self._dying = []
+
+        self._aliens = []
+        for i in range(ALIEN_ROWS):
+            self._aliens.append([])
+            alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])
+            for j in range(ALIENS_IN_ROW):
+                x, y = self.position(i, j)
+                #<Extension: Animate the Aliens>
+                alien = Alien(x=x,y=y,width=ALIEN_WIDTH,height=ALIEN_HEIGHT,
+                              source=ALIEN_IMAGES[alientype],
+                              format=(3,2),row=i,col=j)
+                self._aliens[i].append(alien)
 
-        Parameter keywords: dictionary of keyword arguments
-        Type keywords: keys are attribute names
+    @property
+    def living(self):
         """
-        assert type(up) == bool
-        GRectangle.__init__(self,**keywords,width=BOLT_WIDTH,height=BOLT_HEIGHT,
-        fillcolor=BOLT_COLOR)
-        self._velocity = BOLT_SPEED if up else -BOLT_SPEED
+        The number of living aliens
+        """
+        return sum(self._row_count)
+
+    @property
+    def left(self):
+        """
+        Left edge of the leftmost living alien, None if no alien is alive
+        """
+        if len(self._fire_columns) == 0:
+            return None
+        return self.position(0, self._fire_columns[0])[0] - ALIEN_WIDTH/2
 
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     @property
-    def velocity(self):
+    def right(self):
+        """
+        Right edge of the rightmost living alien, None if no alien is alive
+        """
+        if len(self._fire_columns) == 0:
+            return None
+        return self.position(0, self._fire_columns[-1])[0] + ALIEN_WIDTH/2
+
+    @property
+    def bottom(self):
+        """
+        Bottom edge of the lowest living alien, None if no alien is alive
+        """
+        if self._bottom_row >= ALIEN_ROWS:
+            return None
+        return self.position(self._bottom_row, 0)[1] - ALIEN_HEIGHT/2
+
+    @property
+    def columns(self):
+        """
+        The columns with a living alien, left to right
+        """
+        return tuple(self._fire_columns)
+
+    @property
+    def shooters(self):
+        """
+        The aliens that can fire, the lowest living alien of each column
+        (left to right)
+        """
+        return tuple(self.alien(self._column_bottom[j], j)
+                     for j in self._fire_columns)
+
+    def lowest(self, col):
+        """
+        Lowest living alien in a column
+
+        Parameter col: column of the formation
+        Precondition col: type is int, 0 <= col < ALIENS_IN_ROW
+        Return: Alien object, None if the column has no living alien
+        """
+        assert type(col) == int and col >= 0 and col < ALIENS_IN_ROW
+        i = self._column_bottom[col]
+        return None if i < 0 else self.alien(i, col)
+
+    def alien(self, row, col):
+        """
+        Alien at a cell of the formation
+
+        Parameter row, col: cell of the formation
+        Precondition: row and col are int inside the formation
+        Return: Alien object, None if the alien is gone
+        """
+        return self._aliens[row][col]
+
+    def isAlive(self, row, col):
+        """
+        Check whether the alien at a cell is alive
+
+        Parameter row, col: cell of the formation
+        Precondition: row and col are int inside the formation
+        Return: 'True' if the alien is alive, 'False' if not
+        """
+        alien = self._aliens[row][col]
+        return alien != None and alien.live
+
+    def position(self, row, col):
+        """
+        Position of the alien at a cell of the formation
+
+        Parameter row, col: cell of the formation
+        Precondition: row and col are int inside the formation
+        Return: (x, y) of the center of the alien
+        """
+        return (self._origin_x + col * (ALIEN_WIDTH + ALIEN_H_SEP),
+                self._origin_y + row * (ALIEN_HEIGHT + ALIEN_V_SEP))
+
+    def selectShooter(self, rng):
+        """
+        Chooses the alien that fires randomly
+        One of the aliens at the bottom line, kept in _column_bottom
+
+        Parameter rng: the random number generator
+        Precondition rng: has a method choice, like the module random
+        Return: (row, col) of the alien, None if no alien is alive
         """
-        Velocity of bolt, negative value for alien and positive value for ship
+        if len(self._fire_columns) == 0:
+            return None
+        j = rng.choice(self._fire_columns)
+        return (self._column_bottom[j], j)
+
+    def move(self, walk_horz):
         """
-        return self._velocity
+        Move the position of aliens
 
-    @velocity.setter
-    def velocity(self,value):
+        Parameter walk_horz: alien's horizontal, vertical movement
+        Precondition walk_horz: type is int or float,
+                0 is vertical down; if not 0, amount of horizontal movement
+        Return: None
         """
-        Setter for velocity
+        assert type(walk_horz) in [int,float]
+        self._moveOrigin(walk_horz)
+        for i in range(ALIEN_ROWS):
+            for j in range(ALIENS_IN_ROW):
+                alien = self._aliens[i][j]
+                if alien != None:
+                    if walk_horz != 0:
+                        alien.x = alien.x + walk_horz
+                    else:
+                        alien.y = alien.y - ALIEN_V_WALK
+                    if alien.live:
+                        alien.frame = (alien.frame+1) % 2
+
+    #<Extension: Animate the Aliens>
+    def animate(self):
+        """
+        Advance the breaking animation of the killed aliens
+        An alien is removed when its animation is over
 
-        Parameter value: Velocity of Bolt
-        Precondition bolt: value is int or float type, positive if bolt is
-            fired by ship, negative if bolt is fired by alien
+        Parameter: None
+        Precondition: None
         Return: None
         """
-        assert type(value) in [int,float]
-        assert value != 0
-        self._velocity = value
+        if len(self._dying) == 0:
+            return
+        dying = []
+        for i, j in self._dying:
+            alien = self._aliens[i][j]
+            if alien.frame < 5:
+                alien.frame += 1
+                dying.append((i, j))
+            else:
+                self._aliens[i][j] = None
+        self._dying = dying
+
+    def hit(self, left, bottom, right, top):
+        """
+        Find a living alien that overlaps a box
+        Only the cells of the lattice under the box are checked
 
-    # INITIALIZER TO SET THE VELOCITY
+        Parameter left, bottom, right, top: edges of the box
+        Precondition: all are int or float, left <= right and bottom <= top
+        Return: (row, col) of the alien, None if no alien overlaps the box
+        """
+        cells = self.hits(left, bottom, right, top)
+        return cells[0] if len(cells) > 0 else None
 
-    # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
-    def isPlayerBolt(self):
+    def hits(self, left, bottom, right, top):
         """
-        Distinguish bolts from the ship's shot and the alien.
+        Find all living aliens that overlap a box
+        Only the cells of the lattice under the box are checked
+
+        Parameter left, bottom, right, top: edges of the box
+        Precondition: all are int or float, left <= right and bottom <= top
+        Return: list of the (row, col) of the aliens, by row and then column
+        """
+        cells = []
+        i0, i1, j0, j1 = self._cells(left, bottom, right, top)
+        for i in range(i0, i1+1):
+            for j in range(j0, j1+1):
+                alien = self._aliens[i][j]
+                if (alien != None and alien.live and
+                    alien.x + ALIEN_WIDTH/2 >= left and
+                    alien.x - ALIEN_WIDTH/2 <= right and
+                    alien.y + ALIEN_HEIGHT/2 >= bottom and
+                    alien.y - ALIEN_HEIGHT/2 <= top):
+                    cells.append((i, j))
+        return cells
+
+    def kill(self, row, col):
+        """
+        Kill the alien at a cell and update the lowest living aliens
+        The alien stays in the formation until its breaking animation is over
+
+        Parameter row, col: cell of the formation
+        Precondition: row and col are int inside the formation,
+                the alien there is alive
+        Return: None
+        """
+        assert self.isAlive(row, col)
+        self._aliens[row][col].live = False
+        self._dying.append((row, col))
+
+        if self._column_bottom[col] == row:
+            self._column_bottom[col] = -1
+            for i in range(row+1, ALIEN_ROWS):
+                if self.isAlive(i, col):
+                    self._column_bottom[col] = i
+                    break
+            if self._column_bottom[col] < 0:
+                self._fire_columns.remove(col)
+        self._row_count[row] -= 1
+        while (self._bottom_row < ALIEN_ROWS and
+               self._row_count[self._bottom_row] == 0):
+            self._bottom_row += 1
+
+    def getState(self):
+        """
+        The state of the formation, to be restored later with setState
+        The aliens are always on the lattice, so only the origin is kept
 
         Parameter: None
         Precondition: None
-        Return: 'True' if ship fires bolt, 'False' is alien fires bolt
+        Return: (origin_x, origin_y, cells, frames, dying); cells holds 0
+                for a gone alien, 1 for a living one and 2 for a dying one,
+                and frames the animation frame of each alien (both are
+                uint8 arrays of ALIEN_ROWS x ALIENS_IN_ROW); dying is
+                the list of the cells of the dying aliens
+        """
+        cells = np.zeros((ALIEN_ROWS, ALIENS_IN_ROW), dtype=np.uint8)
+        frames = np.zeros((ALIEN_ROWS, ALIENS_IN_ROW), dtype=np.uint8)
+        for i in range(ALIEN_ROWS):
+            for j in range(ALIENS_IN_ROW):
+                alien = self._aliens[i][j]
+                if alien != None:
+                    cells[i, j] = 1 if alien.live else 2
+                    frames[i, j] = alien.frame
+        return (self._origin_x, self._origin_y, cells, frames,
+                list(self._dying))
+
+    def setState(self, origin_x, origin_y, cells, frames, dying):
         """
-        return self._velocity > 0
+        Restore a state of the formation from getState
+        Aliens that are gone are created again, if they are in the state
 
+        Parameter: the values returned by getState
+        Precondition: as returned by getState of a formation with the same
+                ALIEN_ROWS and ALIENS_IN_ROW
+        Return: None
+        """
+        assert cells.shape == (ALIEN_ROWS, ALIENS_IN_ROW)
+        self._origin_x = origin_x
+        self._origin_y = origin_y
+        for i in range(ALIEN_ROWS):
+            alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])
+            for j in range(ALIENS_IN_ROW):
+                if cells[i, j] == 0:
+                    self._aliens[i][j] = None
+                    continue
+                x, y = self.position(i, j)
+                alien = self._aliens[i][j]
+                if alien == None:
+                    alien = Alien(x=x,y=y,width=ALIEN_WIDTH,height=ALIEN_HEIGHT,
+                                  source=ALIEN_IMAGES[alientype],
+                                  format=(3,2),row=i,col=j)
+                    self._aliens[i][j] = alien
+                else:
+                    alien.x = x
+                    alien.y = y
+                alien.live = bool(cells[i, j] == 1)
+                alien.frame = int(frames[i, j])
+        self._dying = [(int(i), int(j)) for i, j in dying]
+        self._recount()
+
+    def addTo(self, batch):
+        """
+        Adds the aliens to a sprite batch.
 
-#<=확장 : Defense Barriers ...>
-class DefenseBarriers(GSprite):
+        Parameter batch: the batch to draw the aliens with
+        Precondition batch: batch is a GSpriteBatch
+        Return: None
+        """
+        for aliens in self._aliens:
+            for alien in aliens:
+                if alien != None:
+                    alien.addTo(batch)
+
+    def _recount(self):
+        """
+        Find the lowest living alien of each column, the living columns and
+        the number of living aliens of each row again, see kill()
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        self._column_bottom = [-1] * ALIENS_IN_ROW
+        self._row_count = [0] * ALIEN_ROWS
+        for i in range(ALIEN_ROWS-1, -1, -1):
+            for j in range(ALIENS_IN_ROW):
+                if self.isAlive(i, j):
+                    self._column_bottom[j] = i
+                    self._row_count[i] += 1
+        self._fire_columns = [j for j in range(ALIENS_IN_ROW)
+                              if self._column_bottom[j] >= 0]
+        self._bottom_row = 0
+        while (self._bottom_row < ALIEN_ROWS and
+               self._row_count[self._bottom_row] == 0):
+            self._bottom_row += 1
+
+    def _moveOrigin(self, walk_horz):
+        """
+        Move the origin of the lattice, see move()
+
+        Parameter walk_horz: alien's horizontal, vertical movement
+        Precondition walk_horz: type is int or float
+        Return: None
+        """
+        if walk_horz != 0:
+            self._origin_x = self._origin_x + walk_horz
+        else:
+            self._origin_y = self._origin_y - ALIEN_V_WALK
+
+    def _cells(self, left, bottom, right, top):
+        """
+        Range of the cells of the lattice whose alien may overlap a box
+
+        Parameter left, bottom, right, top: edges of the box
+        Precondition: all are int or float, left <= right and bottom <= top
+        Return: (i0, i1, j0, j1), the rows i0..i1 and the columns j0..j1;
+                the range is empty if i0 > i1 or j0 > j1
+        """
+        hw = ALIEN_WIDTH/2
+        hh = ALIEN_HEIGHT/2
+        px = ALIEN_WIDTH + ALIEN_H_SEP
+        py = ALIEN_HEIGHT + ALIEN_V_SEP
+        j0 = max(math.ceil((left - self._origin_x - hw) / px), 0)
+        j1 = min(math.floor((right - self._origin_x + hw) / px), ALIENS_IN_ROW-1)
+        i0 = max(math.ceil((bottom - self._origin_y - hh) / py), 0)
+        i1 = min(math.floor((top - self._origin_y + hh) / py), ALIEN_ROWS-1)
+        return (i0, i1, j0, j1)
+
+
+class BoltArray(object):
     """
-    Barrier to protect the ship
-    DefenseBarriers weeken when they collide with either bolt or alien.
-    Strength is managed by DEFENSE_BARRIERS_FRAMES (using GSprite frame)
+    A class representing the laser bolts on screen.
+
+    The bolts are kept as parallel NumPy arrays of position, velocity and
+    owner. Moving the bolts, removing the bolts that left the screen and
+    testing the bolts against a box are each a single vectorized operation,
+    however many bolts are live. The bolts are drawn by adding them to a
+    GSpriteBatch, so no object is created for a single bolt.
+
+    Bolts are identified by their index, 0..len-1, in the order they were
+    fired. Removing bolts keeps the order of the others.
+
+    Collision tests are swept: the box of a bolt covers every position it
+    took in the frames of the last move, not just where it ended. A bolt
+    cannot jump over an alien however far it moves at once, so the bolts can
+    be advanced several frames in a single move.
+
+    INSTANCE ATTRIBUTES:
+        _x: x of each bolt [float array]
+        _y: y of each bolt [float array]
+        _velocity: velocity of each bolt in y direction [float array]
+        _bottom: bottom of the path of each bolt over the frames of the last
+                 move [float array]
+        _top: top of the path of each bolt over the frames of the last move
+              [float array]
+        _player: whether each bolt was fired by the ship [bool array]
+        _count: the number of live bolts, the first _count entries of
+                each array [int >= 0]
+        _players: the number of live bolts fired by the ship [int >= 0]
+        _yrange: the lowest bottom and highest top of the live bolts
+                 [pair of float, or None if it must be recomputed]
+        _xorder: the indices of the live bolts sorted by x, and their sorted
+                 x [pair of arrays, or None if it must be recomputed]
     """
-    # INITIALIZER TO CREATE AN DefenseBarriers
-    # BUILT-IN METHODS
-    def __init__(self,**keywords):
+
+    def __init__(self, capacity=64):
         """
-        Initializer for class DefenseBarriers
+        Initializer for class BoltArray
 
-        You do not need to provide the keywords as a dictionary.
-        The ** in the parameter `keywords` does that automatically.
+        Parameter capacity: the number of bolts to allocate room for; the
+                arrays grow when more bolts are fired
+        Precondition capacity: type is int, capacity > 0
+        """
+        assert type(capacity) == int and capacity > 0
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._velocity = np.zeros(capacity)
+        self._bottom = np.zeros(capacity)
+        self._top = np.zeros(capacity)
+        self._player = np.zeros(capacity, dtype=bool)
+        self._count = 0
+        self._players = 0
+        self._yrange = None
+        self._xorder = None
+
+    def __len__(self):
+        """
+        Return: the number of live bolts
+        """
+        return self._count
 
-        Any attribute of this class may be used as a keyword. The argument
-        must satisfy the invariants of that attribute. See the list of
-        attributes of this class for more information.
+    def box(self, k):
+        """
+        Swept bounding box of a bolt, around its path in the last move
 
-        Parameter keywords: dictionary of keyword arguments
-        Type keywords:  keys are attribute names
+        Parameter k: index of the bolt
+        Precondition k: type is int, 0 <= k < len(self)
+        Return: (left, bottom, right, top) of the path of the bolt
+        """
+        x = float(self._x[k])
+        return (x - BOLT_WIDTH/2, float(self._bottom[k]),
+                x + BOLT_WIDTH/2, float(self._top[k]))
+
+    def isPlayerBolt(self, k):
+        """
+        Check whether a bolt was fired by the ship
+
+        Parameter k: index of the bolt
+        Precondition k: type is int, 0 <= k < len(self)
+        Return: 'True' if ship fires bolt, 'False' is alien fires bolt
         """
-        GSprite.__init__(self,**keywords)
+        return bool(self._player[k])
 
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,obj):
+    def hasPlayerBolt(self):
         """
-        Check if the alien and bolt collide with defense barriers
+        Check whether a bolt fired by the ship is on screen
 
-        Parameter obj: Alien or Bolt object
-        Precondition obj: obj is not None, type is Alien or Bolt
-        Return: 'True' if DefenseBarriers and obj collides, 'False' if not
+        Parameter: None
+        Precondition: None
+        Return: 'True' if there is a bolt fired by the ship, 'False' if not
+        """
+        return self._players > 0
+
+    def hasAlienBolt(self):
+        """
+        Check whether a bolt fired by an alien is on screen
+
+        Parameter: None
+        Precondition: None
+        Return: 'True' if there is a bolt fired by an alien, 'False' if not
+        """
+        return self._count > self._players
+
+    def playerBolts(self):
+        """
+        Indices of the bolts fired by the ship, in the order they were fired
+
+        Parameter: None
+        Precondition: None
+        Return: int array of indices
+        """
+        if self._players == 0:
+            return ()
+        return np.flatnonzero(self._player[:self._count])
+
+    def fire(self, up, x, y):
+        """
+        Add a new bolt
+
+        Parameter up: True if the ship fires the bolt, False if an alien does
+        Precondition up: type is bool
+
+        Parameter x, y: center of the new bolt
+        Precondition: x and y are int or float
+        Return: None
+        """
+        assert type(up) == bool
+        n = self._count
+        if n == len(self._x):
+            self._grow()
+        self._x[n] = x
+        self._y[n] = y
+        self._velocity[n] = BOLT_SPEED if up else -BOLT_SPEED
+        self._bottom[n] = y - BOLT_HEIGHT/2
+        self._top[n] = y + BOLT_HEIGHT/2
+        self._player[n] = up
+        self._count = n + 1
+        if up:
+            self._players += 1
+        if self._yrange != None:
+            self._yrange = (min(self._yrange[0], y - BOLT_HEIGHT/2),
+                            max(self._yrange[1], y + BOLT_HEIGHT/2))
+        self._xorder = None
+
+    def move(self, steps=1):
+        """
+        Move all bolts by their velocity, and sweep their boxes over the path
+        Bolts that leave the screen are kept until cull is called, so that
+        they are still tested against everything they passed
+
+        Parameter steps: the number of frames to move the bolts
+        Precondition steps: type is int, steps > 0
+        Return: None
+        """
+        assert type(steps) == int and steps > 0
+        n = self._count
+        y = self._y[:n]
+        if steps == 1:
+            y += self._velocity[:n]
+            np.subtract(y, BOLT_HEIGHT/2, out=self._bottom[:n])
+            np.add(y, BOLT_HEIGHT/2, out=self._top[:n])
+        else:
+            first = y + self._velocity[:n]
+            y += self._velocity[:n] * steps
+            np.minimum(first, y, out=self._bottom[:n])
+            np.maximum(first, y, out=self._top[:n])
+            self._bottom[:n] -= BOLT_HEIGHT/2
+            self._top[:n] += BOLT_HEIGHT/2
+        self._yrange = None
+
+    def cull(self):
+        """
+        Remove the bolts that left the screen
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        n = self._count
+        if n == 0:
+            return
+        y = self._y[:n]
+        if (float(y.max()) - BOLT_HEIGHT/2 > GAME_HEIGHT or
+            float(y.min()) + BOLT_HEIGHT/2 <= 0):
+            self.remove(np.where(self._player[:n],
+                                 (y - BOLT_HEIGHT/2) > GAME_HEIGHT,
+                                 (y + BOLT_HEIGHT/2) <= 0))
+
+    def hits(self, left, bottom, right, top, player=None):
+        """
+        Find the bolts whose swept boxes overlap a box
+
+        Parameter left, bottom, right, top: edges of the box
+        Precondition: all are int or float, left <= right and bottom <= top
+
+        Parameter player: only bolts fired by the ship if True, only bolts
+                fired by aliens if False, every bolt if None
+        Precondition player: type is bool or None
+        Return: int array of the indices of the bolts, in increasing order
+        """
+        n = self._count
+        if n == 0:
+            return ()
+        ymin, ymax = self._range()
+        if ymax < bottom or ymin > top:
+            return ()
+        x = self._x[:n]
+        mask = ((x + BOLT_WIDTH/2 >= left) & (x - BOLT_WIDTH/2 <= right) &
+                (self._top[:n] >= bottom) & (self._bottom[:n] <= top))
+        if player == True:
+            mask &= self._player[:n]
+        elif player == False:
+            mask &= ~self._player[:n]
+        return np.flatnonzero(mask)
+
+    def sweep(self, spans):
+        """
+        Find the bolts whose x-interval overlaps each of the given spans
+
+        This is the sweep and prune broadphase along x. The bolts are sorted
+        by x once (the order only changes when bolts are fired or removed),
+        and as all bolts have the same width, the bolts overlapping a span
+        are a contiguous run of that order, found by binary search.
+
+        Parameter spans: the x-intervals to test
+        Precondition spans: list of (left, right) pairs of int or float
+        Return: list with, for each span, an int array of the indices of the
+                bolts overlapping it, in increasing order
         """
-        assert obj != None and (type(obj) == Alien or type(obj) == Bolt)
+        if self._count == 0:
+            return [()] * len(spans)
+        if self._xorder == None:
+            order = np.argsort(self._x[:self._count], kind='stable')
+            self._xorder = (order, self._x[order])
+        order, xs = self._xorder
+        edges = np.array(spans, dtype=float).reshape(-1, 2)
+        lo = xs.searchsorted(edges[:, 0] - BOLT_WIDTH/2, 'left').tolist()
+        hi = xs.searchsorted(edges[:, 1] + BOLT_WIDTH/2, 'right').tolist()
+        return [np.sort(order[a:b]) if a < b else () for a, b in zip(lo, hi)]
+
+    def remove(self, mask):
+        """
+        Remove bolts, keeping the order of the others
+
+        Parameter mask: the bolts to remove
+        Precondition mask: bool array, one entry for each live bolt
+        Return: None
+        """
+        keep = np.flatnonzero(~mask)
+        m = len(keep)
+        for array in (self._x, self._y, self._velocity, self._bottom,
+                      self._top, self._player):
+            array[:m] = array[keep]
+        self._count = m
+        self._players = int(np.count_nonzero(self._player[:m]))
+        self._yrange = None
+        self._xorder = None
+
+    def delete(self, k):
+        """
+        Remove bolts by index, keeping the order of the others
+
+        Parameter k: index of the bolt, or a list of indices
+        Precondition k: type is int or list of int, 0 <= k < len(self)
+        Return: None
+        """
+        mask = np.zeros(self._count, dtype=bool)
+        mask[k] = True
+        self.remove(mask)
+
+    def getState(self):
+        """
+        The state of the live bolts, to be restored later with setState
 
-        sx1 = self.x - self.width/2
-        sy1 = self.y - self.height/2 - DEFENSE_BARRIERS_COLLIDES_GAP
-        sx2 = self.x + self.width/2
-        sy2 = self.y + self.height/2 - DEFENSE_BARRIERS_COLLIDES_GAP
+        Parameter: None
+        Precondition: None
+        Return: (x, y, velocity, bottom, top, player), copies of the arrays
+                of the live bolts, in the order they were fired
+        """
+        n = self._count
+        return (self._x[:n].copy(), self._y[:n].copy(),
+                self._velocity[:n].copy(), self._bottom[:n].copy(),
+                self._top[:n].copy(), self._player[:n].copy())
+
+    def setState(self, x, y, velocity, bottom, top, player):
+        """
+        Replace the bolts with a state from getState
 
-        bx1 = obj.x - obj.width/2
-        by1 = obj.y - obj.height/2
-        bx2 = obj.x + obj.width/2
-        by2 = obj.y + obj.height/2
+        Parameter: the values returned by getState
+        Precondition: arrays of the same length
+        Return: None
+        """
+        self.clear()
+        n = len(x)
+        while n > len(self._x):
+            self._grow()
+        self._x[:n] = x
+        self._y[:n] = y
+        self._velocity[:n] = velocity
+        self._bottom[:n] = bottom
+        self._top[:n] = top
+        self._player[:n] = player
+        self._count = n
+        self._players = int(np.count_nonzero(self._player[:n]))
+
+    def clear(self):
+        """
+        Remove all bolts
 
-        return (sx2 >= bx1 and sx1 <= bx2) and (sy2 >= by1 and sy1 <= by2)
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        self._count = 0
+        self._players = 0
+        self._yrange = None
+        self._xorder = None
+
+    def addTo(self, batch):
+        """
+        Adds the bolts to a sprite batch, one quad per bolt.
+
+        Parameter batch: the batch to draw the bolts with
+        Precondition batch: batch is a GSpriteBatch
+        Return: None
+        """
+        x = self._x.tolist()
+        y = self._y.tolist()
+        for k in range(self._count):
+            batch.add(x[k], y[k], BOLT_WIDTH, BOLT_HEIGHT, color=BOLT_COLOR)
+
+    def _range(self):
+        """
+        Lowest bottom and highest top of the swept boxes of the live bolts,
+        computed once after each move
+
+        Parameter: None
+        Precondition: there is at least one live bolt
+        Return: (ymin, ymax) of the swept boxes
+        """
+        if self._yrange == None:
+            n = self._count
+            self._yrange = (float(self._bottom[:n].min()),
+                            float(self._top[:n].max()))
+        return self._yrange
+
+    def _grow(self):
+        """
+        Double the room for bolts in the arrays
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        size = 2 * len(self._x)
+        for name in ('_x', '_y', '_velocity', '_bottom', '_top', '_player'):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
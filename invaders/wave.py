@@ -18,7 +18,9 @@ December 4th, 2018
 from game2d import *
 from consts import *
 from models import *
+import numpy as np
 import random
+import struct
 
 # PRIMARY RULE: Wave can only access attributes in models.py via get/setters
 # Wave is NOT allowed to access anything in app.py
@@ -44,11 +46,11 @@ class Wave(object):
     #UPDATE ME LATER
     INSTANCE ATTRIBUTES:
         _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave
-                 [rectangular 2d list of Alien or None]
+        _formation: the aliens in the wave [Formation]
         _bolts:  the laser bolts currently on screen
-                 [list of Bolt, possibly empty]
-        _dline:  the defensive line being protected [GPath]
+                 [BoltArray, possibly empty]
+        _dline:  the defensive line being protected
+                 [GPath, or None until the wave is drawn]
         _lives:  the number of lives left  [int >= 0]
         _time:   The amount of time since the last Alien "step" [number >= 0]
 
@@ -74,25 +76,74 @@ class Wave(object):
         _alien_speed: The speed of alien [float]
         _penalty_speed: The penalty speed proportional to the number of
                         alien destroyed [float]
-        _text_score: GLabel for displaying the text "score" [GLabel]
-        _text_score_num: GLabel for displaying score [GLabel]
-        _text_lives: GLabel for displaying the text "lives" [GLabel]
-        _text_lives_num: GLabel for displaying live [GLabel]
-        _fireboltSound: Sound for fireing bolt [Sound]
-        _breakingAlienSound: Sound for Alien destroying [Sound]
-        _breakingShipSound: Sound for Ship destroying [Sound]
+        _hud: The score and the number of lives on display [Hud]
+        _batch: The sprite batch that draws the aliens, the ship and the
+                bolts [GSpriteBatch, or None until the wave is drawn]
+        _barrier_batch: The sprite batch that draws the barriers, over the
+                bolts [GSpriteBatch, or None until the wave is drawn]
+        _fireboltSound: Sound for fireing bolt [Sound, None if headless]
+        _breakingAlienSound: Sound for Alien destroying [Sound, None if headless]
+        _breakingShipSound: Sound for Ship destroying [Sound, None if headless]
         _defense_barriers: Values for defense barriers [Sound]
+        _barrier_hash: Spatial hash of the defense barriers; the barriers
+                never move, so it only changes when one is created or
+                destroyed [GSpatialHash]
+        _headless: Whether the wave is only simulated, without sound [bool]
+        _seed: The seed of the random numbers of the wave
+               [int >= 0, or None until newwave]
+        _rng: The random number generator of the wave, used for the alien
+              bolts [random.Random]
+        _timer: The timer of the phases of update [GPhaseTimer, or None if
+                update is not timed]
+
+    The models are plain geometry (see Body), and the labels and the defense
+    line are only created when the wave is first drawn. A wave that is never
+    drawn therefore creates no Kivy graphics at all, and with headless set it
+    does not open any sound either.
+
+    Every wave draws its random numbers from its own generator, seeded by
+    newwave. Two waves with the same seed, level and player input play the
+    same game, whatever else is running in the program.
+
+    The whole state of a wave can be saved with snapshot and put back with
+    restore, see SNAPSHOT_VERSION.
     """
+    # The first bytes of a snapshot
+    SNAPSHOT_MAGIC = b'WAVE'
+    # The version of the snapshot format; increase it whenever it changes.
+    # A snapshot is: the header (magic, version, ALIEN_ROWS, ALIENS_IN_ROW,
+    # DEFENSE_BARRIERS_NUM), the wave, the ship and the formation scalars,
+    # the cells, frames and dying aliens of the formation, the frame of each
+    # barrier (-1 if gone), the bolts and the state of the generator.
+    SNAPSHOT_VERSION = 1
+    # struct formats of the parts of a snapshot with a fixed size
+    _SNAPSHOT_HEADER = struct.Struct('<4sHBBB')
+    _SNAPSHOT_WAVE = struct.Struct('<HIHBBHdddQ' 'ddB?' 'ddH')
+    _SNAPSHOT_RNG = struct.Struct('<B625I?d')
+
+    def __init__(self, headless=False):
+        """
+        Initializer for class Wave
 
-    def __init__(self):
+        Parameter headless: simulate the wave only; no sound is loaded or
+                played
+        Precondition headless: type is bool
+        """
+        assert type(headless) == bool
         self._ship = None
-        self._aliens = []   # 2D list
-        self._bolts = []    # 1D list
+        self._formation = None
+        self._headless = headless
+        self._bolts = BoltArray()
         self._dline = None
+        self._batch = None
+        self._barrier_batch = None
         self._lives = SHIP_LIVES # number of ships
         self._time = 0
 
         self._boltstep = 0
+        self._seed = None
+        self._rng = random.Random()
+        self._timer = None
 
         self._score = 0
         self._walk_dir = True
@@ -105,16 +156,23 @@ class Wave(object):
         #<Extension: Multiple Waves>
         self._penalty_speed = 0.0
 
-        self._initText()
+        self._hud = Hud(self._score, self._lives)
 
         #<Extension: Sound Effects>
-        self._fireboltSound = Sound('pew1.wav')
-        self._breakingAlienSound = Sound('pew1.wav')
-        self._breakingShipSound = Sound('pew2.wav')
+        self._fireboltSound = None
+        self._breakingAlienSound = None
+        self._breakingShipSound = None
+        if not headless:
+            self._fireboltSound = Sound('pew1.wav')
+            self._breakingAlienSound = Sound('pew1.wav')
+            self._breakingShipSound = Sound('pew2.wav')
 
         #<Extension: Defense Barriers>
         self._defense_barriers = []
 
+        # Broadphase for collision queries
+        self._barrier_hash = GSpatialHash(SPATIAL_CELL_SIZE)
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     @property
     #<Extension: Multiple Waves>
@@ -155,6 +213,55 @@ class Wave(object):
         assert type(value) in [int,float]
         self._time = value
 
+    @property
+    def timer(self):
+        """
+        The timer of the phases of update, None if update is not timed
+
+        The phases are 'aliens' (stepping and firing), 'bolts' (moving),
+        'bolt collisions' (with the aliens and the ship), 'barrier
+        collisions' (with the aliens and the bolts), 'animation' and 'hud'.
+        """
+        return self._timer
+
+    @timer.setter
+    def timer(self,value):
+        """
+        Setter for timer
+
+        Parameter value: The timer to use
+        Precondition value: type of value is GPhaseTimer, or None to stop timing
+        Return: None
+        """
+        assert value == None or isinstance(value, GPhaseTimer)
+        self._timer = value
+
+    @property
+    def seed(self):
+        """
+        The seed of the random numbers of the wave, None until newwave
+        """
+        return self._seed
+
+    @property
+    def shooters(self):
+        """
+        The aliens that can fire, the lowest living alien of each column
+        (left to right)
+        """
+        return self._formation.shooters
+
+    def lowestAlien(self, col):
+        """
+        Lowest living alien in a column, the one that fires for that column
+
+        Parameter col: column of the wave
+        Precondition col: type is int, 0 <= col < ALIENS_IN_ROW
+        Return: Alien object, None if the column has no living alien
+        """
+        assert type(col) == int and col >= 0 and col < ALIENS_IN_ROW
+        return self._formation.lowest(col)
+
     @property
     def gamestate(self):
         """
@@ -178,26 +285,32 @@ class Wave(object):
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
     #<Extension: Multiple Waves>
-    def newwave(self,level):
+    def newwave(self,level,seed=None):
         """
         States of wave: initial, clear, game over
 
         Parameter level: Game level
         Precondition level: type of value is int, value >= 1
+
+        Parameter seed: The seed of the random numbers of the wave, or None
+                to choose one at random (it can be read back from seed)
+        Precondition seed: type of value is int,
+                0 <= value < GAME_SEED_LIMIT, or None
         Return: None
         """
         assert(ALIEN_ROWS >= 1 and ALIEN_ROWS <= ALIEN_ROWS_MAX)
         assert(ALIENS_IN_ROW >= 1 and ALIENS_IN_ROW <= ALIENS_IN_ROW_MAX)
         assert(len(ALIEN_TYPE_MAP) == ALIEN_ROWS_MAX)
         assert(type(level) == int and level >= 1)
+        assert(seed == None or
+               (type(seed) == int and seed >= 0 and seed < GAME_SEED_LIMIT))
 
         self._defined = False
+        self._seed = random.getrandbits(32) if seed == None else seed
+        self._rng = random.Random(self._seed)
         self._walk_dir = True
-        self._boltstep = random.randrange(1, BOLT_RATE+1)
+        self._boltstep = self._rng.randrange(1, BOLT_RATE+1)
         self._newgamestate()
-        # create DEFENSE LINE
-        self._dline = GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
-                            linewidth=1,linecolor=DEFENSE_LINE_COLOR)
         # create ship
         self._newship()
         #<Extension: Speed Up the Aliens>
@@ -210,39 +323,161 @@ class Wave(object):
         self._defined = True
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
-    def update(self):
+    def update(self, steps=1, dt=0):
         """
         Animates a single frame in the game.
 
-        Parameter: None
-        Precondition: None
+        The wave can also be advanced several frames at once, for
+        fast-forward or when updates are rare, and plays exactly as it would
+        with one update per frame. Each frame adds dt to time, and the aliens
+        step (and fire) in every frame where their time is up. Between two
+        alien steps the aliens stand still, so the frames where no bolt can
+        hit anything and no alien touches a barrier are played at once, by
+        moving the bolts all those frames in one move; every other frame is
+        played on its own, with all of its collisions. The update stops at
+        the end of a frame that changes the game state.
+
+        If the wave has a timer, each phase of the update is timed. Without
+        one, the only cost is a test per phase.
+
+        Parameter steps: the number of frames to advance
+        Precondition steps: type is int, steps > 0
+
+        Parameter dt: the time of a frame, added to time at the start of
+                every frame; leave it 0 when time was already advanced (as
+                Invaders does for a single frame)
+        Precondition dt: type is int or float, dt >= 0
         Return: None
         """
-
-        if self._time >= self._alien_speed:
-            #<Extension: Speed Up the Aliens>.
-            walk_horz = 0
-            if self._is_horizontal_end():
-                self._change_walk_dir()
+        assert type(steps) == int and steps > 0
+        assert type(dt) in [int,float] and dt >= 0
+        timer = self._timer
+        if timer != None:
+            timer.start()
+
+        gamestate = self._gamestate
+        frame = 0
+        while frame < steps and self._gamestate == gamestate:
+            self._time = self._time + dt
+            if self._time >= self._alien_speed:
+                #<Extension: Speed Up the Aliens>.
+                walk_horz = 0
+                if self._is_horizontal_end():
+                    self._change_walk_dir()
+                else:
+                    walk_horz = ALIEN_H_WALK
+                    if self._walk_dir == False:
+                        walk_horz = -ALIEN_H_WALK
+                if walk_horz != 0:
+                    if self._collision_defense_line():
+                        self._gamestate = WAVE_STATE_GAMEOVER
+                self._moveAliens(walk_horz)
+                self._fireAlienBolt()
+                self._time = 0
+            if timer != None:
+                timer.lap('aliens')
+
+            # the frames until the next alien step, halved until quiet; the
+            # frame stands alone if the aliens ended the game
+            quiet = 1
+            time = self._time
+            while (frame + quiet < steps and self._gamestate == gamestate and
+                   time + dt < self._alien_speed):
+                time = time + dt
+                quiet += 1
+            while quiet > 1 and not self._skipQuietFrames(quiet):
+                quiet = quiet // 2
+            if quiet > 1:
+                for step in range(quiet-1):
+                    self._time = self._time + dt
+                if timer != None:
+                    timer.lap('bolts')
             else:
-                walk_horz = ALIEN_H_WALK
-                if self._walk_dir == False:
-                    walk_horz = -ALIEN_H_WALK
-            if walk_horz != 0:
-                if self._collision_defense_line():
-                    self._gamestate = WAVE_STATE_GAMEOVER
-            self._moveAliens(walk_horz)
-            self._fireAlienBolt()
-            self._time = 0
+                self._playFrame()
+            for step in range(quiet):
+                self._breakinAnimation()
+            if timer != None:
+                timer.lap('animation')
+            frame += quiet
+
+        self._hud.update(self._score, self._lives)
+        if timer != None:
+            timer.lap('hud')
+            timer.stop()
+
+    def _playFrame(self):
+        """
+        Move the bolts by a frame, and apply all collisions of the frame
 
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        timer = self._timer
         if len(self._bolts) > 0:
-            self._moveBolts()
+            self._moveBolts(1)
+            if timer != None:
+                timer.lap('bolts')
             self._collisionBolts()
+            if timer != None:
+                timer.lap('bolt collisions')
         #<Extension: Defense Barriers>
         self._collisionDefenseBarriers()
-        self._breakinAnimation()
-        self._text_score_num.text = str(self._score)
-        self._text_lives_num.text = str(self._lives)
+        if len(self._bolts) > 0:
+            self._bolt_collision_barrier()
+            self._bolts.cull()
+        if timer != None:
+            timer.lap('barrier collisions')
+
+    def _skipQuietFrames(self, steps):
+        """
+        Move the bolts by several frames at once, if nothing happens in them
+        The aliens must stand still in these frames
+
+        The frames are quiet if the ship is not breaking, no living alien
+        touches a barrier, and the path of every bolt over the frames misses
+        the aliens, the ship and the barriers. The bolts are then left where
+        they would be after playing the frames one by one; otherwise they
+        are not moved.
+
+        Parameter steps: the number of frames
+        Precondition steps: type is int, steps > 1
+        Return: 'True' if the frames are quiet and the bolts were moved,
+                'False' if not
+        """
+        ship = self._ship
+        if ship != None and not ship.live:
+            return False
+        gap = DEFENSE_BARRIERS_COLLIDES_GAP
+        if self._breakin_alien_count < ALIEN_ROWS * ALIENS_IN_ROW:
+            for defense in self._defense_barriers:
+                if defense != None and self._formation.hit(defense.left,
+                        defense.bottom - gap, defense.right,
+                        defense.top - gap) != None:
+                    return False
+        bolts = self._bolts
+        if len(bolts) == 0:
+            return True
+
+        state = bolts.getState()
+        bolts.move(steps)
+        quiet = not (ship != None and len(bolts.hits(ship.left, ship.bottom,
+                                                     ship.right, ship.top,
+                                                     player=False)) > 0)
+        for defense in self._defense_barriers:
+            if quiet and defense != None:
+                quiet = len(bolts.hits(defense.left, defense.bottom - gap,
+                                       defense.right, defense.top - gap)) == 0
+        for k in bolts.playerBolts():
+            if quiet:
+                quiet = len(self._bolt_collision_alien(int(k))) == 0
+        bolts.setState(*state)
+        if quiet:
+            # the same boxes as the last of the frames played one by one
+            bolts.move(steps-1)
+            bolts.move(1)
+            bolts.cull()
+        return quiet
 
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
@@ -250,60 +485,161 @@ class Wave(object):
         """
         Draws the game objects to the view.
 
+        The labels, the defense line and the sprite batches are created the
+        first time the wave is drawn. The aliens, the ship and the bolts are
+        drawn by one batch, as one mesh for each texture (a single one with a
+        texture atlas) and one for the bolts. The barriers are drawn by a
+        second batch, after the first, so that they are drawn over the bolts
+        even when they share the texture atlas with the aliens. The
+        defense line and the labels rarely change, so they are drawn to the
+        static layers GAME_LAYER_BACKDROP (under the batches) and
+        GAME_LAYER_HUD (over them), which are only drawn again when they
+        change.
+
         Parameter: None
         Precondition: None
         Return: None
         """
+        if self._dline == None:
+            self._dline = GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
+                                linewidth=1,linecolor=DEFENSE_LINE_COLOR)
+        if self._batch == None:
+            self._batch = GSpriteBatch()
+            self._barrier_batch = GSpriteBatch()
 
-        self._text_score.draw(view)
-        self._text_score_num.draw(view)
-        self._text_lives.draw(view)
-        self._text_lives_num.draw(view)
+        self._hud.draw(view.layer(GAME_LAYER_HUD, static=True, depth=1))
 
-        self._dline.draw(view)
+        self._dline.draw(view.layer(GAME_LAYER_BACKDROP, static=True, depth=-1))
 
-        for aliens in self._aliens:
-            for alien in aliens:
-                if alien != None:
-                    alien.draw(view)
+        batch = self._batch
+        batch.begin()
+        self._formation.addTo(batch)
 
         if self._ship:
-            self._ship.draw(view)
+            self._ship.addTo(batch)
 
-        for bolt in self._bolts:
-            bolt.draw(view)
+        self._bolts.addTo(batch)
+        batch.draw(view)
 
         #<Extension: Defense Barriers>
+        batch = self._barrier_batch
+        batch.begin()
         for i in range(DEFENSE_BARRIERS_NUM):
             if self._defense_barriers[i] != None:
-                self._defense_barriers[i].draw(view)
+                self._defense_barriers[i].addTo(batch)
+        batch.draw(view)
 
 
-    # HELPER METHODS FOR COLLISION DETECTION
-    #<Extension: Defense Barriers>
-    def _initText(self):
+    # SNAPSHOTS OF THE STATE OF THE WAVE
+    def snapshot(self):
         """
-        Helper function for initializing texts
+        Saves the complete state of the wave
+
+        The formation, the ship, the bolts, the barriers, the lives, the
+        score, the timers and the random number generator are packed into a
+        compact binary string. Nothing that is only drawn (the sprites and
+        the labels) is saved.
 
         Parameter: None
-        Precondition: None
+        Precondition: newwave was called
+        Return: the snapshot [bytes]
+        """
+        assert self._ship != None
+        origin_x, origin_y, cells, frames, dying = self._formation.getState()
+        x, y, velocity, bottom, top, player = self._bolts.getState()
+        version, rng, gauss = self._rng.getstate()
+        barriers = np.array([-1 if d == None else d.frame
+                             for d in self._defense_barriers], dtype=np.int8)
+        parts = [self._SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC,
+                    self.SNAPSHOT_VERSION, ALIEN_ROWS, ALIENS_IN_ROW,
+                    DEFENSE_BARRIERS_NUM),
+                 self._SNAPSHOT_WAVE.pack(self._lives, self._score,
+                    self._boltstep, self._walk_dir, self._gamestate,
+                    self._breakin_alien_count, self._time, self._alien_speed,
+                    self._penalty_speed, self._seed,
+                    self._ship.x, self._ship.y, self._ship.frame,
+                    self._ship.live, origin_x, origin_y, len(dying)),
+                 cells.tobytes(), frames.tobytes(),
+                 np.array(dying, dtype=np.uint8).tobytes(),
+                 barriers.tobytes(),
+                 struct.pack('<H', len(x)),
+                 np.concatenate([x, y, velocity, bottom, top]).tobytes(),
+                 player.tobytes(),
+                 self._SNAPSHOT_RNG.pack(version, *rng, gauss != None,
+                                         0.0 if gauss == None else gauss)]
+        return b''.join(parts)
+
+    def restore(self, data):
+        """
+        Puts back a state of the wave saved with snapshot
+
+        The wave keeps its ship, aliens and barriers, and only changes their
+        state, so restoring is much faster than starting a new wave. If the
+        wave was never started with newwave, the models are created first.
+
+        Parameter data: the snapshot
+        Precondition data: bytes from snapshot, of this SNAPSHOT_VERSION,
+                with the same ALIEN_ROWS, ALIENS_IN_ROW and DEFENSE_BARRIERS_NUM
         Return: None
         """
-        self._text_score = GLabel(text=GAME_TEXT_SCORE,
-                    linecolor=GAME_TEXT_SCORE_COLOR,
-                    font_size=48, font_name='Arcade.ttf',
-                    left=ALIEN_H_SEP, bottom=GAME_HEIGHT-60)
-        self._text_score_num = GLabel(text="0", linecolor=GAME_TEXT_COLOR,
-                    font_size=48, font_name='Arcade.ttf',
-                    left=ALIEN_H_SEP + 140, bottom=GAME_HEIGHT-60)
-        self._text_lives = GLabel(text=GAME_TEXT_LIVES,
-                    linecolor=GAME_TEXT_LIVES_COLOR,
-                    font_size=48, font_name='Arcade.ttf',
-                    left=GAME_WIDTH - 170, bottom=GAME_HEIGHT-60)
-        self._text_lives_num = GLabel(text="0", linecolor=GAME_TEXT_COLOR,
-                    font_size=48, font_name='Arcade.ttf',
-                    left=GAME_WIDTH - 40, bottom=GAME_HEIGHT-60)
+        assert type(data) == bytes
+        magic, version, rows, cols, num = self._SNAPSHOT_HEADER.unpack_from(data)
+        assert magic == self.SNAPSHOT_MAGIC, 'not a snapshot of a wave'
+        assert version == self.SNAPSHOT_VERSION, \
+            'snapshot version %d is not %d' % (version, self.SNAPSHOT_VERSION)
+        assert (rows, cols, num) == (ALIEN_ROWS, ALIENS_IN_ROW,
+                                     DEFENSE_BARRIERS_NUM)
+        at = self._SNAPSHOT_HEADER.size
+        (lives, score, boltstep, walk_dir, gamestate, count, time, speed,
+         penalty, seed, ship_x, ship_y, ship_frame, ship_live, origin_x,
+         origin_y, ndying) = self._SNAPSHOT_WAVE.unpack_from(data, at)
+        at += self._SNAPSHOT_WAVE.size
+        size = ALIEN_ROWS * ALIENS_IN_ROW
+        shape = (ALIEN_ROWS, ALIENS_IN_ROW)
+        cells = np.frombuffer(data, np.uint8, size, at).reshape(shape)
+        frames = np.frombuffer(data, np.uint8, size, at + size).reshape(shape)
+        at += 2 * size
+        dying = np.frombuffer(data, np.uint8, 2 * ndying, at).reshape(-1, 2)
+        at += 2 * ndying
+        barriers = np.frombuffer(data, np.int8, DEFENSE_BARRIERS_NUM, at)
+        at += DEFENSE_BARRIERS_NUM
+        n = struct.unpack_from('<H', data, at)[0]
+        at += 2
+        bolts = np.frombuffer(data, np.float64, 5 * n, at).reshape(5, n)
+        at += 40 * n
+        player = np.frombuffer(data, np.bool_, n, at)
+        at += n
+        rng = self._SNAPSHOT_RNG.unpack_from(data, at)
+        assert at + self._SNAPSHOT_RNG.size == len(data)
+
+        if self._ship == None:
+            self._newgamestate()
+            self._newship()
+            self._newpenaltyspeed(1)
+        self._lives = lives
+        self._score = score
+        self._boltstep = boltstep
+        self._walk_dir = bool(walk_dir)
+        self._gamestate = gamestate
+        self._breakin_alien_count = count
+        self._time = time
+        self._alien_speed = speed
+        self._penalty_speed = penalty
+        self._seed = seed
+        self._rng.setstate((rng[0], rng[1:626], rng[627] if rng[626] else None))
+        self._ship.x = ship_x
+        self._ship.y = ship_y
+        self._ship.live = ship_live
+        self._ship.frame = ship_frame
+        self._formation.setState(origin_x, origin_y, cells, frames, dying)
+        self._bolts.setState(*bolts, player)
+        for d in range(DEFENSE_BARRIERS_NUM):
+            self._setBarrier(d, int(barriers[d]))
+        self._defined = True
+        self._hud.update(self._score, self._lives)
 
+    # HELPER METHODS FOR COLLISION DETECTION
+    #<Extension: Defense Barriers>
     def _newgamestate(self):
         """
         Helper function for gamestate in method newwave
@@ -314,22 +650,8 @@ class Wave(object):
         """
         self._gamestate = WAVE_STATE_INIT
 
-        sz = (ALIEN_HEIGHT + ALIEN_V_SEP) * (ALIEN_ROWS - 1)
-        sy = (GAME_HEIGHT - ALIEN_CEILING) - sz
-        for i in range(ALIEN_ROWS):
-            self._aliens.append([])
-            sx = ALIEN_H_SEP
-            alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])
-            for j in range(ALIENS_IN_ROW):
-
-    #<Extension: Animate the Aliens>
-                alien = Alien(x=sx + ALIEN_WIDTH/2,y=sy + ALIEN_HEIGHT/2,
-                              width=ALIEN_WIDTH,height=ALIEN_HEIGHT,
-                              source=ALIEN_IMAGES[alientype],
-                              format=(3,2))
-                self._aliens[i].append(alien)
-                sx = sx + (ALIEN_WIDTH + ALIEN_H_SEP)
-            sy = sy + (ALIEN_HEIGHT + ALIEN_V_SEP)
+        #<Extension: Animate the Aliens>
+        self._formation = Formation()
 
     def _newship(self):
         """
@@ -359,21 +681,55 @@ class Wave(object):
         self._penalty_speed = 0.0 if level == 1 else penalty
 
         #<Extension: Defense Barriers>
-        sx = DEFENSE_BARRIERS_SEP
         for i in range(DEFENSE_BARRIERS_NUM):
-            defensebarriers = DefenseBarriers(x=sx + DEFENSE_BARRIERS_WIDTH/2,
+            defensebarriers = self._newDefenseBarrier(i)
+            self._defense_barriers.append(defensebarriers)
+            self._barrier_hash.insert(defensebarriers)
+
+    #<Extension: Defense Barriers>
+    def _newDefenseBarrier(self, d):
+        """
+        Helper function for creating a defense barrier at full strength
+
+        Parameter d: index of the barrier, from the left
+        Precondition d: type is int, 0 <= d < DEFENSE_BARRIERS_NUM
+        Return: the new barrier [DefenseBarriers]
+        """
+        sx = DEFENSE_BARRIERS_SEP + d * (DEFENSE_BARRIERS_WIDTH + DEFENSE_BARRIERS_SEP)
+        return DefenseBarriers(x=sx + DEFENSE_BARRIERS_WIDTH/2,
                           y=DEFENSE_BARRIERS_LINE,
                           width=DEFENSE_BARRIERS_WIDTH,
                           height=DEFENSE_BARRIERS_HEIGHT,
                           source='defense-strip.png',
                           format=(5,2))
-            self._defense_barriers.append(defensebarriers)
-            sx += DEFENSE_BARRIERS_WIDTH + DEFENSE_BARRIERS_SEP
+
+    def _setBarrier(self, d, frame):
+        """
+        Helper function for restoring a defense barrier, see restore
+
+        Parameter d: index of the barrier, from the left
+        Precondition d: type is int, 0 <= d < DEFENSE_BARRIERS_NUM
+
+        Parameter frame: the frame of the barrier, -1 if it is gone
+        Precondition frame: type is int, -1 <= frame <= DEFENSE_BARRIERS_FRAMES
+        Return: None
+        """
+        defense = self._defense_barriers[d]
+        if frame < 0:
+            if defense != None:
+                self._barrier_hash.remove(defense)
+                self._defense_barriers[d] = None
+            return
+        if defense == None:
+            defense = self._newDefenseBarrier(d)
+            self._defense_barriers[d] = defense
+            self._barrier_hash.insert(defense)
+        defense.frame = frame
 
     def _collisionDefenseBarriers(self):
         """
-        Check for collision between bolt and barrier
-        DefenseBarriers weeken if collide with bolt
+        Check for collision between alien and barrier
+        DefenseBarriers weeken if collide with alien
 
         Parameter: None
         Precondition: None
@@ -384,28 +740,63 @@ class Wave(object):
                 defense = self._defense_barriers[d]
                 if defense != None:
                     if self._defenseBarriers_collision_alien(defense):
-                        if defense.frame < DEFENSE_BARRIERS_FRAMES:
-                            defense.frame += 1
-                        else:
-                            del defense
-                            self._defense_barriers[d] = None
+                        self._weakenBarrier(defense)
 
-        if len(self._bolts) > 0:
-            for d in range(DEFENSE_BARRIERS_NUM):
-                defense = self._defense_barriers[d]
-                if defense != None:
-                    i = 0
-                    while i < len(self._bolts):
-                        if defense.collides(self._bolts[i]):
-                            del self._bolts[i]
-                            if defense.frame < DEFENSE_BARRIERS_FRAMES:
-                                defense.frame += 1
-                            else:
-                                del defense
-                                self._defense_barriers[d] = None
-                            break
-                        else:
-                            i += 1
+    def _bolt_collision_barrier(self):
+        """
+        Check for collision between bolts and defense barriers
+        Each barrier absorbs at most one bolt a frame, the first one fired
+        that hits it, and weakens; the barriers are taken from the left
+        This is checked after the bolts are tested against the aliens and
+        the ship, so a bolt that hits both an alien and a barrier in the same
+        frame still kills the alien
+
+        The collision box of a barrier sits DEFENSE_BARRIERS_COLLIDES_GAP below
+        the barrier, so each bolt is raised by the same amount for the query.
+
+        Parameter: None
+        Precondition: None
+        Return: None
+        """
+        gap = DEFENSE_BARRIERS_COLLIDES_GAP
+        hits = {}
+        for k in range(len(self._bolts)):
+            left, bottom, right, top = self._bolts.box(k)
+            for defense in self._barrier_hash.query(left, bottom + gap,
+                                                    right, top + gap):
+                if (defense.right >= left and defense.left <= right and
+                    defense.top - gap >= bottom and
+                    defense.bottom - gap <= top):
+                    hits.setdefault(defense, []).append(k)
+        if len(hits) == 0:
+            return
+
+        absorbed = []
+        for defense in list(self._defense_barriers):
+            if defense in hits:
+                for k in hits[defense]:
+                    if not k in absorbed:
+                        absorbed.append(k)
+                        self._weakenBarrier(defense)
+                        break
+        self._bolts.delete(absorbed)
+
+    def _weakenBarrier(self, defense):
+        """
+        Weaken a defense barrier, removing it when it has no strength left
+
+        Parameter defense: defense is barrier object
+        Precondition defense: defense is not None, type is DefenseBarriers
+        Return: None
+        """
+        assert defense != None and type(defense) == DefenseBarriers
+
+        if defense.frame < DEFENSE_BARRIERS_FRAMES:
+            defense.frame += 1
+        else:
+            self._barrier_hash.remove(defense)
+            d = self._defense_barriers.index(defense)
+            self._defense_barriers[d] = None
 
     def _defenseBarriers_collision_alien(self, defense):
         """
@@ -417,17 +808,29 @@ class Wave(object):
         """
         assert defense != None and type(defense) == DefenseBarriers
 
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                alien = self._aliens[i][j]
-                if alien != None and alien.live and defense.collides(alien):
-                    alien.live = False
-                    alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])
-                    self._score += ALIEN_SCORE[alientype]
-                    self._breakin_alien_count += 1
-                    return True
+        gap = DEFENSE_BARRIERS_COLLIDES_GAP
+        cell = self._formation.hit(defense.left, defense.bottom - gap,
+                                   defense.right, defense.top - gap)
+        if cell != None:
+            self._killAlien(cell[0], cell[1])
+            return True
         return False
 
+    def _killAlien(self, row, col):
+        """
+        Destroy an alien and add its score
+        The alien stays in the wave until its breaking animation is over
+
+        Parameter row, col: cell of the alien in the formation
+        Precondition: row and col are int inside the formation,
+                the alien there is alive
+        Return: None
+        """
+        self._formation.kill(row, col)
+        alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][row])
+        self._score += ALIEN_SCORE[alientype]
+        self._breakin_alien_count += 1
+
     #<Extension: Animate the Aliens>
     def _breakinAnimation(self):
         """
@@ -437,15 +840,7 @@ class Wave(object):
         Precondition: None
         Return: None
         """
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                alien = self._aliens[i][j]
-                if alien != None and alien.live == False:
-                    if alien.frame < 5:
-                        alien.frame += 1
-                    else:
-                        del alien
-                        self._aliens[i][j] = None
+        self._formation.animate()
         if self._ship:
             if self._ship.live == False:
                 if self._ship.frame < 5:
@@ -463,39 +858,17 @@ class Wave(object):
         Return: None
         """
         assert type(walk_horz) in [int,float]
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                alien = self._aliens[i][j]
-                if alien != None:
-                    if walk_horz != 0:
-                        alien.x = alien.x + walk_horz
-                    else:
-                        alien.y = alien.y - ALIEN_V_WALK
-                    if alien.live:
-                        alien.frame = (alien.frame+1) % 2
-
-    def _moveBolts(self):
+        self._formation.move(walk_horz)
+
+    def _moveBolts(self, steps):
         """
         Move the position of bolts
 
-        Parameter: None
-        Precondition: None
+        Parameter steps: the number of frames to move the bolts
+        Precondition steps: type is int, steps > 0
         Return: None
         """
-        for bolt in self._bolts:
-            bolt.y = bolt.y + bolt.velocity
-        i = 0
-        while i < len(self._bolts):
-            if self._bolts[i].isPlayerBolt():
-                if (self._bolts[i].y - BOLT_HEIGHT/2) > GAME_HEIGHT:
-                    del self._bolts[i]
-                else:
-                    i += 1
-            else:
-                if (self._bolts[i].y + BOLT_HEIGHT/2) <= 0:
-                    del self._bolts[i]
-                else:
-                    i += 1
+        self._bolts.move(steps)
 
     def _breakingShip(self):
         """
@@ -542,88 +915,114 @@ class Wave(object):
         Player bolt checks collision with alien
         Alien bolt checks collision with ship
 
+        Every contact of the frame is collected first. The ship and each
+        living column of aliens are x-intervals, and a sweep along x finds
+        the bolts over each of them. The contacts are then resolved in the
+        order the bolts were fired: a bolt is spent on its first contact
+        with an alien that is still alive, so a bolt whose first alien was
+        killed earlier in the frame goes on to the next one, an alien dies
+        at most once, and the kills and sounds are applied together, so all
+        bolts that hit in the same frame are handled in that frame.
+        An alien bolt that hits a breaking ship is spent too, and starts
+        the breaking animation over.
+
         Parameter: None
         Precondition: None
         Return: None
         """
-
-        i = 0
-        while i < len(self._bolts):
-            if self._bolts[i].isPlayerBolt():
-                if self._bolt_collision_alien(self._bolts[i]):
-                    del self._bolts[i]
-                    self._checkClearAlien()
+        if len(self._bolts) == 0:
+            return
+        ship = self._ship
+        armed = ship != None and self._bolts.hasAlienBolt()
+        spans = []
+        if armed:
+            spans.append((ship.left, ship.right))
+        if self._bolts.hasPlayerBolt():
+            for j in self._formation.columns:
+                x = self._formation.position(0, j)[0]
+                spans.append((x - ALIEN_WIDTH/2, x + ALIEN_WIDTH/2))
+        candidates = self._bolts.sweep(spans)
+
+        contacts = []
+        if armed:
+            for k in candidates.pop(0):
+                if self._bolt_collision_ship(int(k)):
+                    contacts.append((int(k), None))
+        for bolts in candidates:
+            for k in bolts:
+                if self._bolts.isPlayerBolt(int(k)):
+                    for cell in self._bolt_collision_alien(int(k)):
+                        contacts.append((int(k), cell))
+        if len(contacts) == 0:
+            return
+        contacts.sort()
+
+        spent = []
+        killed = []
+        ship_hit = False
+        for k, cell in contacts:
+            if len(spent) > 0 and spent[-1] == k:
+                continue
+            if cell == None:
+                ship_hit = True
+                spent.append(k)
+            elif self._formation.isAlive(cell[0], cell[1]):
+                self._killAlien(cell[0], cell[1])
+                killed.append(cell)
+                spent.append(k)
+        self._bolts.delete(spent)
+
+        if len(killed) > 0:
+            self._checkClearAlien()
         #<Extension: Sound Effects>
-                    self._breakingAlienSound.play()
-                    return
-                else:
-                    i += 1
-            else:
-                if self._bolt_collision_ship(self._bolts[i]):
-                    del self._bolts[i]
+            self._playSound(self._breakingAlienSound)
+        if ship_hit:
         #<Extension: Animate the Aliens>
-                    self._ship.live = False
-
+            self._ship.live = False
         #<Extension: Sound Effects>
-                    self._breakingShipSound.play()
-                    return
-                else:
-                    i += 1
+            self._playSound(self._breakingShipSound)
 
-    def _bolt_collision_alien(self, bolt):
+    def _bolt_collision_alien(self, k):
         """
         Check for collision between player's bolt and alien
 
-        Parameter bolt: Bolt object
-        Precondition bolt: bolt is not None, type is Bolt,
-            bolt is bolt fired by ship
-        Return: 'True' if bolt and aline collide, 'False' if not
-        """
-        assert bolt != None and type(bolt) == Bolt and bolt.isPlayerBolt()
-
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                alien = self._aliens[i][j]
-                if alien != None and alien.collides(bolt):
-                    alien.live = False
-                    alientype = int(ALIEN_TYPE_MAP[ALIEN_ROWS-1][i])
-                    self._score += ALIEN_SCORE[alientype]
-                    self._breakin_alien_count += 1
-                    return True
-        return False
+        Parameter k: index of the bolt in _bolts
+        Precondition k: type is int, the bolt is fired by ship
+        Return: list of the (row, col) of the aliens hit by the bolt,
+                in the order they are tested
+        """
+        assert self._bolts.isPlayerBolt(k)
+
+        left, bottom, right, top = self._bolts.box(k)
+        return self._formation.hits(left, bottom, right, top)
 
-    def _bolt_collision_ship(self, bolt):
+    def _bolt_collision_ship(self, k):
         """
         Check for collision between alien bolt and ship
 
-        Parameter bolt: Bolt object
-        Precondition bolt: bolt is not None, type is Bolt,
-            bolt is bolt fired by alien
-        Return: 'True' if bolt and aline collide, 'False' if not
+        Parameter k: index of the bolt in _bolts
+        Precondition k: type is int
+        Return: 'True' if the bolt is fired by alien and hits the ship,
+                'False' if not
         """
-        assert bolt != None and not bolt.isPlayerBolt()
-
-        if self._ship != None and self._ship.collides(bolt):
-            return True
-        return False
+        if self._ship == None or self._bolts.isPlayerBolt(k):
+            return False
+        left, bottom, right, top = self._bolts.box(k)
+        return (self._ship.right >= left and self._ship.left <= right and
+                self._ship.top >= bottom and self._ship.bottom <= top)
 
     def _collision_defense_line(self):
         """
         Check if alien crossed the defense_line
         _is_horizontal_end() meets the condition
+        Only the lowest living alien of the formation is checked
 
         Parameter: None
         Precondition: None
-        Return: None
+        Return: 'True' if an alien crossed the defense line, 'False' if not
         """
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                alien = self._aliens[i][j]
-                if alien != None:
-                    if (alien.y - ALIEN_HEIGHT/2) <= DEFENSE_LINE:
-                        return True
-                    break;
-        return False
+        bottom = self._formation.bottom
+        return bottom != None and bottom <= DEFENSE_LINE
 
     def _existPlayerBolt(self):
         """
@@ -633,10 +1032,7 @@ class Wave(object):
         Precondition: None
         Return: None
         """
-        for bolt in self._bolts:
-            if bolt.isPlayerBolt():
-                return True
-        return False
+        return self._bolts.hasPlayerBolt()
 
     def firePlayerBolt(self):
         """
@@ -648,11 +1044,21 @@ class Wave(object):
         """
         assert self._ship != None
         if not self._existPlayerBolt():
-            bolt = Bolt(True, x=self._ship.x, y=self._ship.y+SHIP_HEIGHT/2)
-
-            self._bolts.append(bolt)
+            self._bolts.fire(True, self._ship.x, self._ship.y+SHIP_HEIGHT/2)
     #<Extension: Sound Effect>
-            self._fireboltSound.play()
+            self._playSound(self._fireboltSound)
+
+    #<Extension: Sound Effects>
+    def _playSound(self, sound):
+        """
+        Play a sound effect, unless the wave is headless
+
+        Parameter sound: the sound to play
+        Precondition sound: type is Sound, or None if the wave is headless
+        Return: None
+        """
+        if sound != None:
+            sound.play()
 
     def _selectFireBoltAlien(self):
         """
@@ -661,18 +1067,9 @@ class Wave(object):
 
         Parameter: None
         Precondition: None
-        Return: None
+        Return: (row, col) of the alien, None if no alien is alive
         """
-        aliens = []
-        for j in range(ALIENS_IN_ROW):
-            for i in range(ALIEN_ROWS):
-                if self._aliens[i][j] != None:
-                    aliens.append(self._aliens[i][j])
-                    break
-
-        if len(aliens) == 0:
-            return None
-        return random.choice(aliens)
+        return self._formation.selectShooter(self._rng)
 
     def _fireAlienBolt(self):
         """
@@ -687,11 +1084,11 @@ class Wave(object):
         assert self._boltstep > 0
         self._boltstep -= 1
         if self._boltstep == 0:
-            alien = self._selectFireBoltAlien()
-            if alien != None:
-                bolt = Bolt(False, x=alien.x, y=alien.y-ALIEN_HEIGHT/2)
-                self._bolts.append(bolt)
-            self._boltstep = random.randrange(1,BOLT_RATE+1)
+            cell = self._selectFireBoltAlien()
+            if cell != None:
+                x, y = self._formation.position(cell[0], cell[1])
+                self._bolts.fire(False, x, y-ALIEN_HEIGHT/2)
+            self._boltstep = self._rng.randrange(1,BOLT_RATE+1)
 
     def moveShip(self, right):
         """
@@ -713,36 +1110,19 @@ class Wave(object):
         Check whether alien is at the sides of game screen
         _walk_dir is True when it checks the right side
         _walk_dir is False when it checks the left side
+        Only the outermost living aliens of the formation are checked
 
         Parameter: None
         Precondition: None
-        Return: None
+        Return: 'True' if the aliens are at the side, 'False' if not
         """
-        horizontal_end = False
+        if self._formation.living == 0:
+            return False
 
         if self._walk_dir:
-            for i in range(ALIEN_ROWS):
-                for j in range(ALIENS_IN_ROW):
-                    alien = self._aliens[i][ALIENS_IN_ROW - 1 - j]
-                    if alien != None:
-                        ad = (GAME_WIDTH - ALIEN_WIDTH/2 - ALIEN_H_SEP)
-                        if (alien.x + ALIEN_H_WALK) > ad:
-                            horizontal_end = True
-                        break;
-                if horizontal_end == True:
-                    break
+            return (self._formation.right + ALIEN_H_WALK) > GAME_WIDTH - ALIEN_H_SEP
         else:
-            for i in range(ALIEN_ROWS):
-                for j in range(ALIENS_IN_ROW):
-                    alien = self._aliens[i][j]
-                    if alien != None:
-                        ah = (ALIEN_WIDTH/2 + ALIEN_H_SEP)
-                        if (alien.x - ALIEN_H_WALK) < ah:
-                            horizontal_end = True
-                        break;
-                if horizontal_end == True:
-                    break
-        return horizontal_end
+            return (self._formation.left - ALIEN_H_WALK) < ALIEN_H_SEP
 
     def _change_walk_dir(self):
         """